@@ -4,15 +4,34 @@ SSD性能测试工具
 """
 
 import os
+import re
+import glob
 import sys
+import copy
 import subprocess
 import json
 import time
 import argparse
 import csv
 import statistics
+import threading
+import hashlib
+import random
+import math
+import signal
+import queue
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Set, Any
+
+try:
+    import yaml  # 可选依赖: 支持YAML格式的测试计划
+except ImportError:
+    yaml = None
+
+try:
+    import sqlite3  # 部分精简Python构建不含sqlite3, 此时关闭结果库
+except ImportError:
+    sqlite3 = None
 
 
 # 全局配置
@@ -25,9 +44,174 @@ SCRIPT_VERSION = "2.5.0"
 DATA_VALIDATION_SAMPLES = 3
 TEST_RETRY_COUNT = 2
 
+# 自适应采样配置: 主要指标均值的95%置信区间相对宽度达到目标即停止采样
+ADAPTIVE_CI_WIDTH = 0.05        # 目标相对宽度 (区间全宽/均值)
+ADAPTIVE_MIN_SAMPLES = 2
+ADAPTIVE_MAX_SAMPLES = 10
+ADAPTIVE_STOP_REASONS = {"fixed": "固定次数", "converged": "已收敛", "max_samples": "达到最大采样数",
+                         "budget": "达到时间预算"}
+# 95%双侧t分布临界值, 下标为自由度, 自由度超过30时取正态近似
+T_CRITICAL_95 = [None, 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+                 2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+                 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+# 默认测试计划 - 按照1)顺序写 2)顺序读 3)随机写 4)随机读的顺序, 顺序/随机写前各预热一次
+DEFAULT_TEST_PLAN = {
+    "name": "default",
+    "description": "六阶段标准测试流程",
+    "stages": [
+        {"name": "seq_warmup", "kind": "precondition", "rw": "write", "block_size": "128k",
+         "iodepth": 128, "numjobs": 1, "label": "第一阶段：顺序写预热"},
+        {"name": "seq_write", "test_type": "sequential", "rw": "write", "rw_pattern": "write", "block_size": "128k",
+         "iodepth": 128, "numjobs": 1, "label": "第二阶段：128K顺序写入/QD128/Job1"},
+        {"name": "seq_read", "test_type": "sequential", "rw": "read", "rw_pattern": "read", "block_size": "128k",
+         "iodepth": 128, "numjobs": 1, "label": "第三阶段：128K顺序读取/QD128/Job1"},
+        {"name": "rand_warmup", "kind": "precondition", "rw": "randwrite", "block_size": "4k",
+         "iodepth": 32, "numjobs": 8, "label": "第四阶段：随机写预热"},
+        {"name": "rand_write", "test_type": "random", "rw": "randwrite", "rw_pattern": "write", "block_size": "4k",
+         "iodepth": 32, "numjobs": 8, "label": "第五阶段：4K随机写入/QD32/Job8"},
+        {"name": "rand_read", "test_type": "random", "rw": "randread", "rw_pattern": "read", "block_size": "4k",
+         "iodepth": 32, "numjobs": 8, "label": "第六阶段：4K随机读取/QD32/Job8"}
+    ]
+}
+
+# 测试计划阶段允许的字段
+PLAN_STAGE_KINDS = ["precondition", "measure"]
+PLAN_STAGE_FIELDS = ["name", "kind", "label", "test_type", "rw", "rw_pattern", "rwmixread", "block_size",
+                     "iodepth", "numjobs", "distribution", "duration", "samples", "priority", "fio_options"]
+
+# 时间预算规划配置
+PLANNER_DEFAULT_OVERHEAD = 10       # 无历史数据时每次FIO进程的启动/落盘开销(秒)
+PLANNER_MIN_RUNTIME = 30            # 测量阶段单次采样的最短时长(秒)
+PLANNER_MIN_WARMUP = 30             # 预处理阶段的最短时长(秒)
+PLANNER_MIN_SAMPLES = 2
+PLANNER_RAMP_RATIO = 0.5            # 与默认ramp_time一致: 取最短测量时长的一半
+PLANNER_HISTORY_LIMIT = 200         # 估计开销和写入量时读取的历史结果数
+
+# 预处理配置: 先将设备恢复到已知状态(purge), 再以多个并行顺序作业填满全部LBA
+PURGE_METHODS = ["none", "discard", "format", "sanitize"]
+DEFAULT_FILL_JOBS = 8
+FILL_ALIGN_BYTES = 1024 * 1024      # 每个作业的分区按1MiB对齐
+FILL_PROGRESS_STEP = 0.1            # 每完成10%输出一次填充进度
+SANITIZE_POLL_INTERVAL = 10         # sanitize进度轮询间隔(秒)
+SANITIZE_TIMEOUT = 4 * 3600         # sanitize最长等待时间(秒)
+
+# 多设备并行调度配置
+MULTI_DEVICE_GROUP_BY = ["switch", "controller", "numa", "none"]
+DEFAULT_PER_GROUP_LIMIT = 1     # 同一PCIe交换/控制器/NUMA节点下同时测试的设备数
+
+# SLC缓存断崖测试配置
+SLC_BLOCK_SIZE = "128k"
+SLC_IODEPTH = 32
+SLC_CLIFF_RATIO = 0.7           # 平滑带宽持续低于前一段中位数的70%视为断崖
+SLC_SMOOTH_WINDOW = 5           # 滑动中位数平滑窗口(区间数)
+SLC_CLIFF_HOLD = 10             # 需持续低于阈值的区间数, 过滤GC造成的短暂抖动
+SLC_BASELINE_WINDOW = 60        # 断崖判定基线取最近60个区间的中位数
+SLC_DEFAULT_IDLE = "60,300"     # 恢复测试的空闲时间(秒)
+
+# 随机写饱和(WSAT)测试配置, 断崖判定沿用SLC的平滑窗口和阈值
+WSAT_DEFAULT_STAGE = "rand_warmup"
+WSAT_MIN_DRIVE_FILLS = 1.0      # 稳态检测在检测到GC介入或写满该倍数容量后才启用, 避免把FOB平台判为稳态
+WSAT_CLIFF_CHECK_INTERVAL = 30  # 启用稳态检测前每隔多少个区间检查一次GC断崖
+
+# I/O引擎预设: 名称 -> FIO引擎参数
+IO_ENGINE_PRESETS = {
+    "libaio": {"ioengine": "libaio"},
+    "io_uring": {"ioengine": "io_uring"},
+    "io_uring_fixedbufs": {"ioengine": "io_uring", "fixedbufs": 1, "registerfiles": 1},
+    "io_uring_sqpoll": {"ioengine": "io_uring", "sqthread_poll": 1, "registerfiles": 1},
+    "io_uring_hipri": {"ioengine": "io_uring", "hipri": 1},   # 需要nvme驱动开启poll_queues
+    "psync": {"ioengine": "psync"},
+    "pvsync2": {"ioengine": "pvsync2"}
+}
+SYNC_IO_ENGINES = ["psync", "pvsync2"]      # 同步引擎每个任务只有1个在途I/O, iodepth不生效
+DEFAULT_IO_ENGINE = "libaio"
+ENGINES_DEFAULT_LIST = "libaio,io_uring,io_uring_fixedbufs,io_uring_sqpoll,psync,pvsync2"
+ENGINES_DEFAULT_STAGE = {"name": "engines_rand_read", "rw": "randread", "block_size": "4k", "iodepth": 32, "numjobs": 4}
+
+# NUMA绑定配置
+NUMA_MODES = ["auto", "local", "remote", "off"]
+NUMA_DEFAULT_STAGE = {"name": "numa_rand_read", "rw": "randread", "block_size": "4k", "iodepth": 32, "numjobs": 4}
+
+# 多盘聚合扩展测试配置
+SCALING_DEFAULT_STAGE = {"name": "scaling_seq_read", "rw": "read", "block_size": "128k", "iodepth": 128, "numjobs": 1}
+SCALING_MARGINAL_RATIO = 0.25   # 新增每块盘带来的增量低于单盘性能的25%视为不再扩展
+
+# 主机遥测采样间隔(秒)
+TELEMETRY_INTERVAL = 1
+
+# 热降速检测配置
+THERMAL_POLL_INTERVAL = 5           # 温度/降速状态轮询间隔(秒)
+THERMAL_DEFAULT_LIMIT_C = 70        # 无法读取设备告警温度时的默认阈值(°C)
+THERMAL_COOLDOWN_TIME = 300         # 重跑前最长冷却时间(秒)
+THERMAL_COOLDOWN_MARGIN_C = 10      # 冷却到阈值以下多少度再重跑
+THERMAL_MAX_RERUNS = 1              # 每次采样因降速重跑的最多次数
+THERMAL_SMART_MAX_FAILURES = 3      # nvme smart-log连续失败多少次后不再用于降速检测
+
+# FIO卡死看门狗配置
+WATCHDOG_STALL_TIMEOUT = 300        # 设备I/O计数和FIO状态输出均无进展超过该时长(秒)即判定卡死
+WATCHDOG_POLL_INTERVAL = 5          # 进度轮询间隔(秒)
+WATCHDOG_KILL_WAIT = 30             # 终止进程组后等待其退出的最长时间(秒)
+WATCHDOG_DMESG_LINES = 20           # 卡死事件记录的内核日志行数
+
+# 设备健康数据单位
+NVME_DATA_UNIT_BYTES = 512 * 1000       # NVMe data units: 1000个512字节
+INTEL_NAND_UNIT_BYTES = 32 * 1024 ** 2  # Intel smart-log-add nand_bytes_written: 32MiB
+
+# 结果库配置
+DEFAULT_RESULTS_DB = "ssd_results.db"
+RESULTS_DB_QUERY_FIELDS = ["serial", "model", "firmware", "device", "mode", "plan", "stage", "test_type",
+                           "block_size", "rw_pattern", "queue_depth", "numjobs", "config_hash"]
+
+# 断点续测配置
+CHECKPOINT_FILE = "checkpoint.json"     # 结果目录中的断点文件, 每个阶段完成后更新
+
+# 回归对比配置
+COMPARE_BOOTSTRAP_ITERATIONS = 10000
+COMPARE_BOOTSTRAP_MIN_SAMPLES = 10  # 两侧采样数都达到该值才用自助法, 否则用Welch t区间(小样本下百分位自助法区间过窄)
+COMPARE_CONFIDENCE = 0.95
+COMPARE_MIN_EFFECT = 0.02           # 差异的点估计至少2%才判为回归/提升, 过滤统计显著但无实际意义的差异
+COMPARE_PERCENTILES = [99, 99.9]    # 参与对比的尾延迟百分位
+COMPARE_REGRESSION_EXIT_CODE = 2    # 检测到显著回归时的退出码(参数或运行错误为1)
+
 # 单位转换常数
 MIB_TO_MBS = 1.048576  # 1 MiB/s = 1.048576 MB/s
 
+# 尾延迟百分位(完成延迟clat)
+LATENCY_PERCENTILES = [50, 90, 99, 99.9, 99.99]
+
+# 队列深度/任务数扫描配置
+SWEEP_QUEUE_DEPTHS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+SWEEP_NUMJOBS = [1, 2, 4, 8]
+SWEEP_RW_PATTERNS = ["read", "write", "randread", "randwrite", "rw", "randrw"]
+SWEEP_GAIN_THRESHOLD = 0.03     # 自适应扫描: 增益低于3%视为饱和
+SWEEP_KNEE_RATIO = 0.95         # 拐点: 达到峰值95%的最低并发
+
+# 延迟SLO搜索配置
+SLO_DEFAULT_TARGET_US = 1000            # 默认延迟目标(us)
+SLO_DEFAULT_PERCENTILE = 99             # 默认考核百分位
+SLO_DEFAULT_PATTERNS = "randread,randwrite,randrw70"
+SLO_SEARCH_RESOLUTION = 0.02            # 二分搜索精度(相对峰值IOPS)
+SLO_SEARCH_MAX_STEPS = 8                # 最大二分次数
+RATE_SUSTAINED_RATIO = 0.95             # 实际IOPS≥限速目标的95%才视为持续满足
+
+# 开环(泊松到达)负载配置
+OPENLOOP_DEFAULT_LOADS = "10%,30%,50%,70%,80%,90%,95%"   # 百分比表示相对闭环峰值, 否则为绝对IOPS
+OPENLOOP_IODEPTH = 256                  # 开环模式的在途上限, 足够大以免退化为闭环
+
+# 实时数据采集配置
+FIO_STATUS_INTERVAL = 1            # FIO状态输出间隔(秒)
+LIVE_PROGRESS_INTERVAL = 30        # 实时模式下进度日志间隔(秒)
+
+# 稳态检测配置(参考SNIA PTS: 滑动窗口内极差≤20%均值, 拟合斜率变化≤10%均值)
+STEADY_STATE_ROUND_TIME = 30       # 每轮统计时长(秒)
+STEADY_STATE_WINDOW = 5            # 滑动窗口轮数
+STEADY_STATE_EXCURSION = 0.20      # 窗口内最大极差/均值
+STEADY_STATE_SLOPE = 0.10          # 窗口内拟合直线首尾差/均值
+
+
+# 多线程日志输出锁
+LOG_LOCK = threading.Lock()
 
 # 颜色输出
 class Colors:
@@ -39,11 +223,16 @@ class Colors:
     END = '\033[0m'
 
 
+class FioStallError(Exception):
+    """FIO长时间无I/O进展, 已被看门狗终止"""
+
+
 # 测试结果数据类
 class TestResult:
     def __init__(self, test_type: str, block_size: str, rw_pattern: str, 
                  data_points: List, statistics: Dict, evaluation: Dict,
-                 execution_time: float, retry_count: int):
+                 execution_time: float, retry_count: int,
+                 queue_depth: int = None, numjobs: int = None, stage: str = None):
         self.test_type = test_type
         self.block_size = block_size
         self.rw_pattern = rw_pattern
@@ -52,10 +241,827 @@ class TestResult:
         self.evaluation = evaluation
         self.execution_time = execution_time
         self.retry_count = retry_count
+        self.queue_depth = queue_depth
+        self.numjobs = numjobs
+        self.stage = stage
+        self.config_hash = None     # 有效FIO参数的哈希, 用于结果库检索和复用
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可写入JSON的字典"""
+        return {
+            "stage": self.stage,
+            "test_type": self.test_type,
+            "block_size": self.block_size,
+            "rw_pattern": self.rw_pattern,
+            "queue_depth": self.queue_depth,
+            "numjobs": self.numjobs,
+            "config_hash": self.config_hash,
+            "statistics": self.statistics,
+            "evaluation": self.evaluation,
+            "execution_time": self.execution_time,
+            "retry_count": self.retry_count,
+            "data_points": self.data_points
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TestResult":
+        """由to_dict的输出(或结果库记录)还原"""
+        statistics_data = dict(data.get("statistics") or {})
+        if "latency_bins" in statistics_data:
+            # JSON中直方图的键为字符串, 还原为纳秒整数
+            statistics_data["latency_bins"] = {direction: {int(k): v for k, v in bins.items()}
+                                               for direction, bins in statistics_data["latency_bins"].items()}
+        result = cls(data["test_type"], data["block_size"], data["rw_pattern"], data.get("data_points") or [],
+                     statistics_data, data.get("evaluation") or {}, data.get("execution_time", 0),
+                     data.get("retry_count", 0), data.get("queue_depth"), data.get("numjobs"), data.get("stage"))
+        result.config_hash = data.get("config_hash")
+        return result
+
+
+class SteadyStateDetector:
+    """稳态检测器
+
+    将逐秒性能数据聚合为固定时长的"轮", 当最近 window 轮的极差和
+    最小二乘拟合斜率同时落在容差范围内时判定为稳态。
+    """
+
+    def __init__(self, round_time: float = STEADY_STATE_ROUND_TIME, window: int = STEADY_STATE_WINDOW,
+                 excursion: float = STEADY_STATE_EXCURSION, slope: float = STEADY_STATE_SLOPE):
+        self.round_time = round_time
+        self.window = window
+        self.excursion = excursion
+        self.slope = slope
+        self.rounds = []            # 每轮均值
+        self.steady_time = None     # 达到稳态的时间点(秒)
+        self._round_values = []
+        self._round_start = None
+
+    def add_sample(self, timestamp: float, value: float) -> bool:
+        """加入一个区间采样值, 返回是否已达到稳态"""
+        if self.steady_time is not None:
+            return True
+        if self._round_start is None:
+            self._round_start = timestamp
+        self._round_values.append(value)
+
+        if timestamp - self._round_start >= self.round_time:
+            self.rounds.append(statistics.mean(self._round_values))
+            self._round_values = []
+            self._round_start = timestamp
+            if self.window_stats().get("steady"):
+                self.steady_time = timestamp
+        return self.steady_time is not None
+
+    def window_stats(self) -> Dict[str, Any]:
+        """计算最近窗口的极差和斜率"""
+        if len(self.rounds) < self.window:
+            return {"steady": False, "rounds": len(self.rounds)}
+
+        values = self.rounds[-self.window:]
+        avg = statistics.mean(values)
+        if avg <= 0:
+            return {"steady": False, "rounds": len(self.rounds), "average": avg}
+
+        # 最小二乘拟合 y = a*x + b
+        xs = list(range(len(values)))
+        x_mean = statistics.mean(xs)
+        denominator = sum((x - x_mean) ** 2 for x in xs)
+        slope = sum((x - x_mean) * (y - avg) for x, y in zip(xs, values)) / denominator
+
+        range_ratio = (max(values) - min(values)) / avg
+        slope_ratio = abs(slope * (len(values) - 1)) / avg
+        return {
+            "steady": range_ratio <= self.excursion and slope_ratio <= self.slope,
+            "rounds": len(self.rounds),
+            "average": avg,
+            "range_ratio": range_ratio,
+            "slope_ratio": slope_ratio
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """输出检测结果摘要"""
+        stats = self.window_stats()
+        return {
+            "steady": self.steady_time is not None,
+            "steady_time": self.steady_time,
+            "rounds": self.rounds,
+            "window_average": stats.get("average"),
+            "range_ratio": stats.get("range_ratio"),
+            "slope_ratio": stats.get("slope_ratio")
+        }
+
+
+class HostTelemetrySampler:
+    """主机侧遥测采样器
+
+    在FIO运行期间由后台线程定期读取/proc/stat、/sys/block/<dev>/stat和
+    /proc/interrupts, 结束时按首尾差值计算CPU利用率、设备繁忙度和中断数。
+    每次采样只读取三个proc/sysfs文件, 对测试本身的干扰可忽略。
+    """
+
+    def __init__(self, devices: List[str], interval: float = TELEMETRY_INTERVAL):
+        self.devices = devices
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._first = None
+        self._last = None
+        self._inflight = {device: [] for device in devices}
+
+    @staticmethod
+    def read_cpu_times(text: str) -> Dict[str, List[int]]:
+        """解析/proc/stat的cpu行: {cpuN: [user, nice, system, idle, iowait, irq, softirq, steal]}"""
+        times = {}
+        for line in text.splitlines():
+            fields = line.split()
+            if fields and fields[0].startswith("cpu") and fields[0] != "cpu":
+                times[fields[0]] = [int(v) for v in fields[1:9]]
+        return times
+
+    @staticmethod
+    def read_block_stat(text: str) -> Dict[str, int]:
+        """解析/sys/block/<dev>/stat"""
+        fields = [int(v) for v in text.split()]
+        keys = ["read_ios", "read_merges", "read_sectors", "read_ticks", "write_ios", "write_merges",
+                "write_sectors", "write_ticks", "in_flight", "io_ticks", "time_in_queue"]
+        return dict(zip(keys, fields))
+
+    @staticmethod
+    def read_interrupts(text: str, prefix: str) -> Dict[str, int]:
+        """汇总/proc/interrupts中名称以prefix开头的中断(如nvme0q), 返回 {队列名: 各CPU中断数之和}"""
+        lines = text.splitlines()
+        if not lines:
+            return {}
+        cpu_count = len(lines[0].split())
+        counts = {}
+        for line in lines[1:]:
+            fields = line.split()
+            if len(fields) > cpu_count + 1 and fields[-1].startswith(prefix):
+                counts[fields[-1]] = sum(int(v) for v in fields[1:cpu_count + 1] if v.isdigit())
+        return counts
+
+    @staticmethod
+    def irq_prefix(device: str) -> Optional[str]:
+        """设备队列的中断名前缀, 目前只识别NVMe (nvme0n1 -> nvme0q)"""
+        match = re.match(r"(nvme\d+)", device)
+        return f"{match.group(1)}q" if match else None
+
+    def _read(self, path: str) -> str:
+        try:
+            with open(path, "r") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def _snapshot(self) -> Dict[str, Any]:
+        interrupts_text = self._read("/proc/interrupts")
+        snapshot = {"time": time.time(), "cpu": self.read_cpu_times(self._read("/proc/stat")), "block": {}, "irq": {}}
+        for device in self.devices:
+            stat_text = self._read(f"/sys/class/block/{device}/stat")
+            if stat_text:
+                snapshot["block"][device] = self.read_block_stat(stat_text)
+            prefix = self.irq_prefix(device)
+            if prefix and interrupts_text:
+                snapshot["irq"][device] = self.read_interrupts(interrupts_text, prefix)
+        return snapshot
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._last = self._snapshot()
+            for device, stat in self._last["block"].items():
+                self._inflight[device].append(stat.get("in_flight", 0))
+
+    def start(self):
+        """开始后台采样"""
+        self._first = self._snapshot()
+        self._thread = threading.Thread(target=self._loop, name=threading.current_thread().name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Any]:
+        """停止采样并返回摘要"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._last = self._snapshot()
+        return self.summarize(self._first, self._last, self._inflight)
+
+    @classmethod
+    def summarize(cls, first: Dict[str, Any], last: Dict[str, Any],
+                  inflight: Dict[str, List[int]] = None) -> Dict[str, Any]:
+        """由首尾两次快照计算遥测摘要"""
+        elapsed = last["time"] - first["time"]
+        summary = {"elapsed": elapsed, "cpu": {}, "devices": {}}
+        if elapsed <= 0:
+            return summary
+
+        # CPU: 繁忙 = 总时间 - idle - iowait
+        per_cpu = []
+        totals = [0] * 8
+        for cpu, end in last["cpu"].items():
+            start = first["cpu"].get(cpu)
+            if not start:
+                continue
+            delta = [e - s for e, s in zip(end, start)]
+            total = sum(delta)
+            if total <= 0:
+                continue
+            per_cpu.append((total - delta[3] - delta[4]) / total)
+            totals = [t + d for t, d in zip(totals, delta)]
+        grand_total = sum(totals)
+        if per_cpu and grand_total > 0:
+            summary["cpu"] = {
+                "count": len(per_cpu),
+                "util": (grand_total - totals[3] - totals[4]) / grand_total * 100,
+                "usr": (totals[0] + totals[1]) / grand_total * 100,
+                "sys": totals[2] / grand_total * 100,
+                "irq": (totals[5] + totals[6]) / grand_total * 100,
+                "iowait": totals[4] / grand_total * 100,
+                "busy_cores": sum(per_cpu),
+                "max_cpu_util": max(per_cpu) * 100,
+                "per_cpu": [round(u * 100, 1) for u in per_cpu]
+            }
+
+        for device, end in last["block"].items():
+            start = first["block"].get(device)
+            if not start:
+                continue
+            samples = (inflight or {}).get(device) or [end.get("in_flight", 0)]
+            info = {
+                "busy_pct": min(100.0, (end["io_ticks"] - start["io_ticks"]) / (elapsed * 1000) * 100),
+                "avg_inflight": statistics.mean(samples),
+                "ios": (end["read_ios"] - start["read_ios"]) + (end["write_ios"] - start["write_ios"]),
+                "read_merges": end["read_merges"] - start["read_merges"],
+                "write_merges": end["write_merges"] - start["write_merges"]
+            }
+            end_irq = last["irq"].get(device)
+            if end_irq:
+                start_irq = first["irq"].get(device, {})
+                queues = {name: count - start_irq.get(name, 0) for name, count in end_irq.items()}
+                total_irq = sum(queues.values())
+                info["interrupts"] = {
+                    "total": total_irq,
+                    "per_sec": total_irq / elapsed,
+                    "queues": len(queues),
+                    "active_queues": sum(1 for count in queues.values() if count > 0)
+                }
+            summary["devices"][device] = info
+        return summary
+
+
+class DeviceHealthParser:
+    """设备健康数据解析
+
+    解析 nvme smart-log / nvme厂商扩展日志 / smartctl -j 的命令输出,
+    统一为以下字段 (不支持的字段缺省):
+    temperature_c, percentage_used, host_bytes_written, nand_bytes_written,
+    host_program_pages, ftl_program_pages, warning_temp_minutes,
+    critical_temp_minutes, throttle_events, throttle_time_s, media_errors
+    """
+
+    NVME_TEXT_KEYS = {
+        "temperature": "temperature",
+        "percentage_used": "percent_used",
+        "percent_used": "percent_used",
+        "data_units_written": "data_units_written",
+        "warning_temperature_time": "warning_temp_time",
+        "critical_composite_temperature_time": "critical_comp_time",
+        "media_errors": "media_errors",
+        "thermal management t1 trans count": "thm_temp1_trans_count",
+        "thermal management t2 trans count": "thm_temp2_trans_count",
+        "thermal management t1 total time": "thm_temp1_total_time",
+        "thermal management t2 total time": "thm_temp2_total_time"
+    }
+
+    @staticmethod
+    def _number(value) -> Optional[float]:
+        """从数值或 "1,234 (5.6 TB)" / "35 °C" 之类的字符串中取第一个数"""
+        if isinstance(value, (int, float)):
+            return value
+        match = re.search(r"-?\d[\d,]*\.?\d*", str(value))
+        return float(match.group(0).replace(",", "")) if match else None
+
+    @classmethod
+    def _temperature_c(cls, value) -> Optional[float]:
+        """nvme-cli JSON的温度为开尔文, 文本输出为摄氏度"""
+        number = cls._number(value)
+        if number is None:
+            return None
+        return number - 273 if number > 200 else number
+
+    @classmethod
+    def parse_nvme_smart_log(cls, text: str) -> Dict[str, Any]:
+        """解析 nvme smart-log 输出 (-o json 或文本格式)"""
+        try:
+            raw = json.loads(text)
+        except ValueError:
+            raw = {}
+            for line in text.splitlines():
+                key, sep, value = line.partition(":")
+                key = cls.NVME_TEXT_KEYS.get(key.strip().lower())
+                if sep and key:
+                    raw[key] = value.strip()
+        if not isinstance(raw, dict) or "data_units_written" not in raw:
+            return {}
+
+        # 无法解析的字段直接省略, 避免阶段前后差值计算时遇到None
+        units = cls._number(raw["data_units_written"])
+        if units is None:
+            return {}
+        health = {"host_bytes_written": units * NVME_DATA_UNIT_BYTES}
+        temperature = cls._temperature_c(raw["temperature"]) if "temperature" in raw else None
+        if temperature is not None:
+            health["temperature_c"] = temperature
+        used = cls._number(raw.get("percent_used", raw.get("percentage_used")))
+        if used is not None:
+            health["percentage_used"] = used
+        for key, field in (("warning_temp_time", "warning_temp_minutes"),
+                           ("critical_comp_time", "critical_temp_minutes"),
+                           ("media_errors", "media_errors")):
+            value = cls._number(raw[key]) if key in raw else None
+            if value is not None:
+                health[field] = value
+        # 热管理温度阈值1/2的切换次数和累计时长(秒)即降速事件
+        if "thm_temp1_trans_count" in raw:
+            counts = [cls._number(raw.get(f"thm_temp{i}_trans_count", 0)) for i in (1, 2)]
+            times = [cls._number(raw.get(f"thm_temp{i}_total_time", 0)) for i in (1, 2)]
+            if None not in counts and None not in times:
+                health["throttle_events"] = sum(counts)
+                health["throttle_time_s"] = sum(times)
+        return health
+
+    @classmethod
+    def parse_nvme_vendor_log(cls, text: str) -> Dict[str, Any]:
+        """解析厂商扩展日志中的NAND写入量 (OCP smart-add-log 或 Intel smart-log-add, -o json)"""
+        try:
+            raw = json.loads(text)
+        except ValueError:
+            return {}
+        if not isinstance(raw, dict):
+            return {}
+
+        # OCP C0: Physical media units written, 128位字节数拆为hi/lo
+        media = raw.get("Physical media units written", raw.get("physical_media_units_written"))
+        if isinstance(media, dict):
+            hi, lo = cls._number(media.get("hi", 0)), cls._number(media.get("lo", 0))
+            if hi is None or lo is None:
+                return {}
+            return {"nand_bytes_written": hi * 2 ** 64 + lo}
+        if isinstance(media, (int, float)):
+            return {"nand_bytes_written": media}
+
+        # Intel: nand_bytes_written原始值以32MiB为单位
+        nand = raw.get("nand_bytes_written")
+        if isinstance(nand, dict) and "raw" in nand:
+            units = cls._number(nand["raw"])
+            if units is None:
+                return {}
+            return {"nand_bytes_written": units * INTEL_NAND_UNIT_BYTES}
+        return {}
+
+    @classmethod
+    def parse_smartctl(cls, text: str) -> Dict[str, Any]:
+        """解析 smartctl -a -j 输出 (NVMe健康日志或ATA SMART属性)"""
+        try:
+            raw = json.loads(text)
+        except ValueError:
+            return {}
+        if not isinstance(raw, dict):
+            return {}
+
+        health = {}
+        if "current" in raw.get("temperature", {}):
+            health["temperature_c"] = raw["temperature"]["current"]
+
+        nvme_log = raw.get("nvme_smart_health_information_log")
+        if nvme_log:
+            health["host_bytes_written"] = nvme_log.get("data_units_written", 0) * NVME_DATA_UNIT_BYTES
+            for key, field in (("percentage_used", "percentage_used"), ("warning_temp_time", "warning_temp_minutes"),
+                               ("critical_comp_time", "critical_temp_minutes"), ("media_errors", "media_errors")):
+                if key in nvme_log:
+                    health[field] = nvme_log[key]
+            return health
+
+        # ATA属性按名称判断单位: LBAs为逻辑块, 32MiB/GiB为对应单位
+        block_size = raw.get("logical_block_size", 512)
+        for attr in raw.get("ata_smart_attributes", {}).get("table", []):
+            name = attr.get("name", "")
+            value = attr.get("raw", {}).get("value", 0)
+            if "32MiB" in name:
+                unit = 32 * 1024 ** 2
+            elif "GiB" in name or "GB" in name:
+                unit = 1024 ** 3
+            else:
+                unit = block_size
+            if attr.get("id") == 247 and "Program_Page" in name:
+                health["host_program_pages"] = value
+            elif attr.get("id") == 248 and "Program_Page" in name:
+                health["ftl_program_pages"] = value
+            elif "NAND" in name and "Writ" in name:
+                health["nand_bytes_written"] = value * unit
+            elif attr.get("id") == 241 or ("Host" in name and "Writ" in name):
+                health.setdefault("host_bytes_written", value * unit)
+
+        for page in raw.get("ata_device_statistics", {}).get("pages", []):
+            for entry in page.get("table", []):
+                if "Percentage Used" in entry.get("name", ""):
+                    health["percentage_used"] = entry.get("value")
+        return health
+
+    @staticmethod
+    def delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+        """计算阶段前后的写入量、WAF、降速次数和时长"""
+        result = {
+            "temperature_before": before.get("temperature_c"),
+            "temperature_after": after.get("temperature_c"),
+            "percentage_used": after.get("percentage_used")
+        }
+        for key, field in (("host_bytes_written", "host_bytes"), ("nand_bytes_written", "nand_bytes"),
+                           ("throttle_events", "throttle_events"), ("throttle_time_s", "throttle_time_s"),
+                           ("warning_temp_minutes", "warning_temp_minutes"), ("media_errors", "media_errors")):
+            if key in before and key in after:
+                result[field] = after[key] - before[key]
+
+        # WAF = NAND写入 / 主机写入; Micron等通过主机/FTL编程页数计算
+        host_pages = after.get("host_program_pages", 0) - before.get("host_program_pages", 0)
+        if "host_program_pages" in after and host_pages > 0:
+            ftl_pages = after.get("ftl_program_pages", 0) - before.get("ftl_program_pages", 0)
+            result["waf"] = (host_pages + ftl_pages) / host_pages
+        elif result.get("nand_bytes") is not None and result.get("host_bytes", 0) > 0:
+            result["waf"] = result["nand_bytes"] / result["host_bytes"]
+        return result
+
+
+class ThermalMonitor:
+    """热降速监测
+
+    后台线程定期调用read_state读取 {"temp_c", "throttle_events"},
+    温度达到阈值或降速计数增加的轮询点标记为降速。
+    """
+
+    def __init__(self, read_state, limit_c: float, interval: float = THERMAL_POLL_INTERVAL):
+        self.read_state = read_state
+        self.limit_c = limit_c
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_time = None
+        self._last_events = None
+
+    def _poll(self):
+        state = self.read_state() or {}
+        temp = state.get("temp_c")
+        events = state.get("throttle_events")
+        throttled = temp is not None and temp >= self.limit_c
+        if events is not None:
+            if self._last_events is not None and events > self._last_events:
+                throttled = True
+            self._last_events = events
+        self.samples.append({"t": time.time() - self._start_time, "temp_c": temp, "throttled": throttled})
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._poll()
+
+    def start(self):
+        """开始轮询"""
+        self._start_time = time.time()
+        self._poll()
+        self._thread = threading.Thread(target=self._loop, name=threading.current_thread().name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> List[Dict[str, Any]]:
+        """停止轮询并返回全部轮询点"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._poll()
+        return self.samples
+
+    @staticmethod
+    def annotate(data_points: List[Dict[str, Any]], samples: List[Dict[str, Any]]):
+        """为逐区间性能数据标注最近一次轮询的温度和降速状态"""
+        if not samples:
+            return
+        for point in data_points:
+            nearest = min(samples, key=lambda sample: abs(sample["t"] - point["t"]))
+            point["temp_c"] = nearest["temp_c"]
+            point["throttled"] = nearest["throttled"]
+
+    @staticmethod
+    def summarize(samples: List[Dict[str, Any]], data_points: List[Dict[str, Any]], limit_c: float,
+                  interval: float = THERMAL_POLL_INTERVAL) -> Dict[str, Any]:
+        """汇总降速时长, 以及降速/正常区间的平均带宽和IOPS"""
+        temps = [sample["temp_c"] for sample in samples if sample["temp_c"] is not None]
+        throttled_polls = sum(1 for sample in samples if sample["throttled"])
+        summary = {
+            "limit_c": limit_c,
+            "max_temp_c": max(temps) if temps else None,
+            "throttled": throttled_polls > 0,
+            "throttled_seconds": throttled_polls * interval,
+            "throttled_intervals": sum(1 for point in data_points if point.get("throttled")),
+            "samples": samples
+        }
+        hot = [point for point in data_points if point.get("throttled")]
+        normal = [point for point in data_points if not point.get("throttled")]
+        if hot and normal:
+            for key in ("bw", "iops"):
+                hot_mean = statistics.mean(point[key] for point in hot)
+                normal_mean = statistics.mean(point[key] for point in normal)
+                summary[f"throttled_{key}"] = hot_mean
+                summary[f"normal_{key}"] = normal_mean
+            summary["throttle_drop"] = (1 - summary["throttled_iops"] / summary["normal_iops"]
+                                        if summary["normal_iops"] > 0 else 0)
+        return summary
+
+
+class FioWatchdog:
+    """FIO卡死看门狗
+
+    后台线程定期读取/sys/block/<dev>/stat的完成I/O计数, 流式运行时FIO状态输出中
+    有新完成的I/O也由调用方touch()。两者均超过timeout秒无进展时, 记录在途I/O数和
+    内核日志并终止整个FIO进程组。无法读取设备计数且没有状态输出时不做判定。
+    """
+
+    def __init__(self, process: subprocess.Popen, devices: List[str], timeout: float,
+                 interval: float = WATCHDOG_POLL_INTERVAL):
+        self.process = process
+        self.devices = devices
+        self.timeout = timeout
+        self.interval = interval
+        self.stall = None           # 卡死事件, 未卡死时为None
+        self.killed_at = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_time = None
+        self._last_progress = None
+        self._last_ios = None
+        self._has_signal = False
+
+    @staticmethod
+    def kill_tree(process: subprocess.Popen, wait: float = WATCHDOG_KILL_WAIT):
+        """终止FIO进程组(含各作业子进程), 最多等待wait秒"""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=wait)
+        except subprocess.TimeoutExpired:
+            pass
+
+    @staticmethod
+    def dmesg_tail(lines: int = WATCHDOG_DMESG_LINES) -> List[str]:
+        """内核日志的最后若干行, 无权限或无dmesg时返回空列表"""
+        try:
+            result = subprocess.run(["dmesg"], capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            return []
+        return result.stdout.splitlines()[-lines:] if result.returncode == 0 else []
+
+    def _read_stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {}
+        for device in self.devices:
+            try:
+                with open(f"/sys/class/block/{device}/stat", "r") as f:
+                    stats[device] = HostTelemetrySampler.read_block_stat(f.read())
+            except (OSError, ValueError):
+                continue
+        return stats
+
+    def touch(self):
+        """FIO状态输出显示有新完成的I/O"""
+        self._has_signal = True
+        self._last_progress = time.time()
+
+    def _poll(self) -> bool:
+        """检查一次进度, 判定卡死时终止进程并返回True"""
+        stats = self._read_stats()
+        now = time.time()
+        if stats:
+            self._has_signal = True
+            ios = sum(stat.get("read_ios", 0) + stat.get("write_ios", 0) for stat in stats.values())
+            if ios != self._last_ios:
+                self._last_ios = ios
+                self._last_progress = now
+        if not self._has_signal or now - self._last_progress < self.timeout or self.process.poll() is not None:
+            return False
+
+        self.stall = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "elapsed": now - self._start_time,
+            "idle_seconds": now - self._last_progress,
+            "in_flight": {device: stat.get("in_flight", 0) for device, stat in stats.items()},
+            "dmesg": self.dmesg_tail()
+        }
+        self.killed_at = time.time()
+        self.kill_tree(self.process, wait=0)
+        return True
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            if self._poll():
+                return
+
+    def start(self):
+        """开始监控"""
+        self._start_time = time.time()
+        self._last_progress = self._start_time
+        stats = self._read_stats()
+        if stats:
+            self._has_signal = True
+            self._last_ios = sum(stat.get("read_ios", 0) + stat.get("write_ios", 0) for stat in stats.values())
+        self._thread = threading.Thread(target=self._loop, name=threading.current_thread().name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Optional[Dict[str, Any]]:
+        """停止监控, 返回卡死事件(未卡死为None)"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.stall
+
+
+class ResultStore:
+    """本地SQLite结果库
+
+    每次运行写入一行runs(含系统信息), 每个测试结果一行results, 逐区间数据写入intervals。
+    results按型号/固件/块大小/读写模式和序列号/配置哈希建索引, 无需服务端;
+    多设备并行时各线程分别打开连接, 由SQLite文件锁串行化写入。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created TEXT NOT NULL,
+            device TEXT, serial TEXT, model TEXT, firmware TEXT,
+            mode TEXT, plan TEXT, result_dir TEXT, system_info TEXT
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER NOT NULL REFERENCES runs(id),
+            created TEXT NOT NULL,
+            device TEXT, serial TEXT, model TEXT, firmware TEXT, mode TEXT, plan TEXT,
+            config_hash TEXT, stage TEXT, test_type TEXT, block_size TEXT, rw_pattern TEXT,
+            queue_depth INTEGER, numjobs INTEGER,
+            mean REAL, stdev REAL, cv REAL, p99 REAL, status TEXT, execution_time REAL,
+            statistics TEXT, evaluation TEXT
+        );
+        CREATE TABLE IF NOT EXISTS intervals (
+            result_id INTEGER NOT NULL REFERENCES results(id),
+            t REAL, bw REAL, iops REAL, lat REAL, p99 REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_results_model ON results(model, firmware, block_size, rw_pattern);
+        CREATE INDEX IF NOT EXISTS idx_results_config ON results(serial, config_hash, created);
+        CREATE INDEX IF NOT EXISTS idx_intervals_result ON intervals(result_id);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=60)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    def save_run(self, system_info: Dict[str, Any], results: List[TestResult], result_dir: str) -> int:
+        """写入一次运行的全部结果, 返回run_id"""
+        identity = system_info.get("identity", {})
+        config = system_info.get("test_config", {})
+        created = datetime.now().isoformat(timespec="seconds")
+        common = (system_info.get("device"), identity.get("serial"), identity.get("model"),
+                  identity.get("firmware"), config.get("mode"), config.get("plan"))
+
+        conn = self._connect()
+        try:
+            with conn:
+                run_id = conn.execute(
+                    "INSERT INTO runs (created, device, serial, model, firmware, mode, plan, result_dir, system_info) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (created,) + common + (result_dir, json.dumps(system_info, ensure_ascii=False, default=str))
+                ).lastrowid
+                for result in results:
+                    stats = result.statistics
+                    result_id = conn.execute(
+                        "INSERT INTO results (run_id, created, device, serial, model, firmware, mode, plan, "
+                        "config_hash, stage, test_type, block_size, rw_pattern, queue_depth, numjobs, "
+                        "mean, stdev, cv, p99, status, execution_time, statistics, evaluation) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (run_id, created) + common + (
+                            result.config_hash, result.stage, result.test_type, result.block_size,
+                            result.rw_pattern, result.queue_depth, result.numjobs,
+                            stats.get("mean"), stats.get("stdev"), stats.get("cv"),
+                            stats.get("latency", {}).get("all", {}).get("p99"),
+                            result.evaluation.get("status"), result.execution_time,
+                            json.dumps(stats, ensure_ascii=False, default=str),
+                            json.dumps(result.evaluation, ensure_ascii=False, default=str))
+                    ).lastrowid
+                    conn.executemany(
+                        "INSERT INTO intervals (result_id, t, bw, iops, lat, p99) VALUES (?, ?, ?, ?, ?, ?)",
+                        [(result_id, point.get("t"), point.get("bw"), point.get("iops"), point.get("lat"),
+                          point.get("p99")) for point in result.data_points if isinstance(point, dict)]
+                    )
+        finally:
+            conn.close()
+        return run_id
+
+    def find_fresh(self, serial: str, config_hash: str, max_age_hours: float) -> Optional[Dict[str, Any]]:
+        """查找同一设备相同配置在max_age_hours小时内的最新成功结果(含逐区间数据)"""
+        since = datetime.fromtimestamp(time.time() - max_age_hours * 3600).isoformat(timespec="seconds")
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM results WHERE serial = ? AND config_hash = ? AND created >= ? AND status != 'FAILED' "
+                "ORDER BY created DESC LIMIT 1", (serial, config_hash, since)
+            ).fetchone()
+            if row is None:
+                return None
+            record = dict(row)
+            record["data_points"] = [dict(point) for point in conn.execute(
+                "SELECT t, bw, iops, lat, p99 FROM intervals WHERE result_id = ? ORDER BY rowid", (row["id"],))]
+        finally:
+            conn.close()
+        return record
+
+    def recent_results(self, serial: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        """最近的成功结果(statistics已解析); serial为None时不限设备"""
+        where, params = ("serial = ? AND ", [serial]) if serial else ("", [])
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT test_type, block_size, rw_pattern, queue_depth, numjobs, mean, statistics FROM results "
+                f"WHERE {where}status != 'FAILED' ORDER BY created DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row, statistics=json.loads(row["statistics"])) for row in rows]
+
+    def load_run(self, run_id: int) -> List[Dict[str, Any]]:
+        """读取一次运行的全部结果(statistics已解析)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT stage, test_type, block_size, rw_pattern, queue_depth, numjobs, statistics, evaluation "
+                "FROM results WHERE run_id = ? ORDER BY id", (run_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row, statistics=json.loads(row["statistics"]), evaluation=json.loads(row["evaluation"]))
+                for row in rows]
+
+    def query(self, filters: Dict[str, str]) -> List[Dict[str, Any]]:
+        """按字段等值过滤查询结果, 按时间倒序"""
+        where = " AND ".join(f"{key} = ?" for key in filters) or "1"
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT id, created, device, serial, model, firmware, mode, stage, test_type, block_size, rw_pattern, "
+                f"queue_depth, numjobs, mean, cv, p99, status, config_hash FROM results WHERE {where} "
+                f"ORDER BY created DESC", list(filters.values())
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+
+class FioStatusParser:
+    """增量解析FIO --status-interval 输出的JSON快照"""
+
+    def __init__(self):
+        self.messages = []      # 非JSON输出(警告/错误信息)
+        self._buffer = []
+
+    def feed(self, line: str) -> Optional[Dict]:
+        """输入一行输出, 若凑齐一个完整JSON快照则返回该快照"""
+        if not self._buffer:
+            if line.startswith("{"):
+                self._buffer.append(line)
+            elif line.strip():
+                self.messages.append(line.rstrip())
+            return None
+
+        self._buffer.append(line)
+        # FIO的JSON为缩进格式, 顶层结束括号单独成行
+        if line.rstrip() != "}":
+            return None
+
+        text = "".join(self._buffer)
+        self._buffer = []
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            self.messages.append(text[:200])
+            return None
 
 
 class SSDPerformanceTester:
     """SSD性能测试主类"""
+
+    # 每次运行独立的状态, 多设备复制测试器时取新实例的初始值而不是复制
+    RUN_STATE_ATTRIBUTES = ("result_dir", "warmup_records", "analysis", "results", "system_info",
+                            "_health_unsupported", "checkpoint", "resume_dir", "exit_code",
+                            "_fio_processes", "_fio_lock", "_aborted", "_thermal_smart_failures")
     
     def __init__(self):
         self.device = ""
@@ -70,25 +1076,114 @@ class SSDPerformanceTester:
         self.stable_data_start_time = 5
         self.stable_data_end_time = 25
         self.sampling_interval = 5
+        # 稳态检测参数
+        self.steady_state_mode = False
+        self.steady_state_round_time = STEADY_STATE_ROUND_TIME
+        self.warmup_records = []
+        # 结果库参数
+        self.db_path = DEFAULT_RESULTS_DB   # 为None时不写入结果库
+        self.skip_fresh = 0                 # 大于0时复用该小时数内相同配置的结果
+        self.db_query = None
+        # 回归对比参数
+        self.compare_runs = None            # [基线, 候选]: 结果目录/JSON报告路径或结果库run_id
+        self.compare_min_effect = COMPARE_MIN_EFFECT
+        self.compare_confidence = COMPARE_CONFIDENCE
+        self.exit_code = 1
+        self.purge_method = "none"
+        self.fill_passes = 0            # 大于0时预处理阶段改为全盘填充指定遍数
+        self.fill_jobs = DEFAULT_FILL_JOBS
+        self.stall_timeout = WATCHDOG_STALL_TIMEOUT     # 0为关闭FIO卡死看门狗
+        self._fio_processes = set()     # 运行中的FIO进程, 中断时统一终止
+        self._fio_lock = threading.Lock()
+        self._aborted = False
+        # 断点续测参数
+        self.resume_dir = None
+        self.resume_precondition = 0    # 续测前重新执行的短预处理时长(秒), 0为不执行
+        self.checkpoint = None          # 从--resume目录加载的断点
+        # 实时数据采集参数
+        self.live_mode = False
+        self.status_interval = FIO_STATUS_INTERVAL
+        self.sampling_mode = "runs"
+        self.adaptive_sampling = False
+        self.ci_width_target = ADAPTIVE_CI_WIDTH
+        self.max_samples = ADAPTIVE_MAX_SAMPLES
+        self.sample_budget = 0          # 每个测试的采样总时长上限(秒), 0为不限
+        self.time_budget = 0            # 整个测试计划的时间预算(秒), 0为不规划
+        self.jobfile_mode = False
+        # 主机遥测
+        self.telemetry_mode = True
+        # SLC缓存断崖测试参数
+        self.slc_idle_times = [int(v) for v in SLC_DEFAULT_IDLE.split(",")]
+        # 随机写饱和测试参数
+        self.wsat_stage = None
+        # 热降速检测
+        self.thermal_mode = False
+        self.thermal_action = "flag"
+        self.thermal_limit = None
+        self._thermal_smart_failures = 0
+        # 设备健康快照
+        self.health_mode = True
+        self._health_unsupported = set()
+        # NUMA绑定参数
+        self.numa_mode = "auto"
+        self.numa_stage = None
+        self._numa_cache = {}
+        self._fio_option_support = {}
+        # I/O引擎参数
+        self.ioengine = DEFAULT_IO_ENGINE
+        self.engines_list = ENGINES_DEFAULT_LIST.split(",")
+        self.engine_stage = None
+        # 多盘聚合扩展测试参数
+        self.scaling_stage = None
+        self.scaling_counts = None
+        # 多设备调度参数
+        self.devices = []
+        self.max_parallel = 1
+        self.group_by = "switch"
+        self.per_group_limit = DEFAULT_PER_GROUP_LIMIT
+        self.show_device_summary = True
+        self.results = []
+        self.system_info = {}
+        # 测试模式及各模式的分析结果(写入JSON报告的analysis字段)
+        self.mode = "standard"
+        self.analysis = {}
+        self.sweep_rw = "randread"
+        self.sweep_block_size = "4k"
+        self.sweep_queue_depths = SWEEP_QUEUE_DEPTHS
+        self.sweep_numjobs = SWEEP_NUMJOBS
+        self.sweep_search = "adaptive"
+        self.slo_target_us = SLO_DEFAULT_TARGET_US
+        self.slo_percentile = SLO_DEFAULT_PERCENTILE
+        self.slo_patterns = SLO_DEFAULT_PATTERNS.split(",")
+        self.openloop_pattern = "randread"
+        self.openloop_loads = OPENLOOP_DEFAULT_LOADS.split(",")
+        # 测试计划(默认六阶段流程, 可通过--plan加载)
+        self.test_plan = self._normalize_test_plan(DEFAULT_TEST_PLAN)
         
     def log(self, level: str, message: str):
         """简单日志输出"""
         timestamp = datetime.now().strftime('%H:%M:%S')
         color = Colors.CYAN if level == "INFO" else Colors.GREEN if level == "SUCCESS" else Colors.YELLOW if level == "WARNING" else Colors.RED
         
+        line = f"[{color}{level}{Colors.END}][{threading.current_thread().name}] {timestamp} {message}"
+        
         # 在关键步骤之间添加空行以提高可读性
         if level == "INFO" and any(keyword in message for keyword in ["开始执行", "阶段：", "收集系统信息", "测试设备"]):
-            print()  # 关键步骤前添加空行
-        
-        print(f"[{color}{level}{Colors.END}][MainThread] {timestamp} {message}")
+            line = "\n" + line  # 关键步骤前添加空行
         
         # 在错误信息后添加空行
         if level == "ERROR":
-            print()  # 仅ERROR级别后添加空行
+            line += "\n"  # 仅ERROR级别后添加空行
+        
+        # 多设备并行时整行输出, 避免不同线程的日志交错
+        with LOG_LOCK:
+            print(line, flush=True)
 
-    def check_device_access(self) -> bool:
+    def check_device_access(self, device: str = None) -> bool:
         """检查设备访问权限"""
-        device_path = f'/dev/{self.device}'
+        if device is None:
+            device = self.device
+        device_path = f'/dev/{device}'
         
         if not os.path.exists(device_path):
             self.log("ERROR", f"设备不存在: {device_path}")
@@ -98,7 +1193,7 @@ class SSDPerformanceTester:
             # 简单的FIO测试
             subprocess.run([
                 'fio', f'--filename={device_path}', '--rw=read', '--bs=4k',
-                '--ioengine=libaio', '--direct=1', '--size=1M', '--runtime=1',
+                f"--ioengine={self._engine_options()['ioengine']}", '--direct=1', '--size=1M', '--runtime=1',
                 '--time_based', '--name=test', '--output-format=json'
             ], capture_output=True, timeout=5, check=True)
             return True
@@ -135,6 +1230,156 @@ class SSDPerformanceTester:
         except Exception:
             return "unknown"
 
+    def _get_device_topology(self, device: str = None) -> Dict[str, Any]:
+        """从sysfs解析设备的PCIe路径、所属控制器/交换芯片和NUMA节点"""
+        if device is None:
+            device = self.device
+
+        topology = {"pci_path": [], "controller": None, "switch": None, "numa_node": -1}
+        try:
+            sys_path = os.path.realpath(f"/sys/block/{device}")
+        except OSError:
+            return topology
+
+        # 如 /sys/devices/pci0000:00/0000:00:01.1/0000:02:00.0/0000:03:01.0/0000:05:00.0/nvme/nvme0/nvme0n1
+        pci_path = re.findall(r"[0-9a-f]{4}:[0-9a-f]{2}:[0-9a-f]{2}\.[0-9a-f]", sys_path)
+        topology["pci_path"] = pci_path
+        if not pci_path:
+            return topology
+
+        # 最后一级为设备所在控制器(NVMe/HBA); 经过PCIe交换芯片时, 倒数第三级为交换芯片上行端口,
+        # 直连根端口时倒数第二级为根端口
+        topology["controller"] = pci_path[-1]
+        if len(pci_path) >= 3:
+            topology["switch"] = pci_path[-3]
+        elif len(pci_path) == 2:
+            topology["switch"] = pci_path[-2]
+        else:
+            topology["switch"] = sys_path.split("/")[3] if sys_path.startswith("/sys/devices/pci") else pci_path[-1]
+
+        try:
+            with open(f"/sys/bus/pci/devices/{pci_path[-1]}/numa_node", "r") as f:
+                topology["numa_node"] = int(f.read().strip())
+        except (OSError, ValueError):
+            pass
+        return topology
+
+    def _parse_cpulist(self, text: str) -> List[int]:
+        """解析sysfs的CPU列表格式 (如 0-3,8,10-11)"""
+        cpus = []
+        for part in text.strip().split(","):
+            if not part:
+                continue
+            start, _, end = part.partition("-")
+            cpus.extend(range(int(start), int(end or start) + 1))
+        return cpus
+
+    def _get_numa_nodes(self) -> Dict[int, str]:
+        """读取系统NUMA节点及其CPU列表: {节点号: cpulist}"""
+        nodes = {}
+        node_root = "/sys/devices/system/node"
+        try:
+            entries = os.listdir(node_root)
+        except OSError:
+            return nodes
+        for entry in entries:
+            if not re.match(r"node\d+$", entry):
+                continue
+            try:
+                with open(os.path.join(node_root, entry, "cpulist"), "r") as f:
+                    cpulist = f.read().strip()
+            except OSError:
+                continue
+            if cpulist:
+                nodes[int(entry[4:])] = cpulist
+        return dict(sorted(nodes.items()))
+
+    def _get_device_numa(self, device: str = None) -> Dict[str, Any]:
+        """从sysfs获取设备所在NUMA节点和本地CPU列表
+
+        nvme: /sys/block/nvmeXnY/device 为NVMe控制器, 其device为PCI设备;
+        sd:   /sys/block/sdX/device 为SCSI设备, 沿父目录向上找到HBA所在PCI设备。
+        """
+        if device is None:
+            device = self.device
+        if device in self._numa_cache:
+            return self._numa_cache[device]
+
+        device_dir = f"/sys/block/{device}/device"
+        if device.startswith("nvme"):
+            candidates = [os.path.join(device_dir, "device"), device_dir]
+        else:
+            candidates = []
+            path = os.path.realpath(device_dir)
+            while path.startswith("/sys/devices/") and path != "/sys/devices":
+                candidates.append(path)
+                path = os.path.dirname(path)
+
+        info = {"numa_node": -1, "local_cpus": "", "source": None}
+        for candidate in candidates:
+            try:
+                with open(os.path.join(candidate, "numa_node"), "r") as f:
+                    info["numa_node"] = int(f.read().strip())
+            except (OSError, ValueError):
+                continue
+            info["source"] = os.path.realpath(candidate)
+            try:
+                with open(os.path.join(candidate, "local_cpulist"), "r") as f:
+                    info["local_cpus"] = f.read().strip()
+            except OSError:
+                pass
+            break
+
+        # 没有local_cpulist时使用节点的CPU列表
+        if info["numa_node"] >= 0 and not info["local_cpus"]:
+            info["local_cpus"] = self._get_numa_nodes().get(info["numa_node"], "")
+        self._numa_cache[device] = info
+        return info
+
+    def _fio_supports_option(self, option: str) -> bool:
+        """检查FIO是否支持某个参数 (numa_*参数需要编译时启用libnuma)"""
+        if option not in self._fio_option_support:
+            try:
+                result = subprocess.run(["fio", f"--cmdhelp={option}"], capture_output=True, text=True, timeout=10)
+                output = (result.stdout + result.stderr).lower()
+                self._fio_option_support[option] = result.returncode == 0 and "unsupported" not in output
+            except (OSError, subprocess.SubprocessError):
+                self._fio_option_support[option] = False
+        return self._fio_option_support[option]
+
+    def _numa_placement(self, device: str = None, mode: str = None) -> Dict[str, Any]:
+        """确定FIO任务的NUMA绑定策略
+
+        local绑定到设备所在节点, remote绑定到另一个节点(用于A/B对比),
+        auto在多节点且能识别设备节点时等同local, off不绑定。
+        """
+        mode = mode or self.numa_mode
+        numa = self._get_device_numa(device)
+        nodes = self._get_numa_nodes()
+        placement = {"mode": mode, "device_node": numa["numa_node"], "node": None, "cpus": "", "fio_options": {}}
+        if mode == "off" or numa["numa_node"] < 0 or len(nodes) < 2:
+            placement["mode"] = "off"
+            return placement
+
+        if mode == "remote":
+            node = next(n for n in nodes if n != numa["numa_node"])
+            cpus = nodes[node]
+        else:
+            node = numa["numa_node"]
+            cpus = numa["local_cpus"] or nodes.get(node, "")
+        placement.update({"node": node, "cpus": cpus})
+
+        # 有libnuma时按节点绑定CPU和内存, 否则退化为cpus_allowed
+        if self._fio_supports_option("numa_cpu_nodes"):
+            placement["fio_options"] = {"numa_cpu_nodes": node, "numa_mem_policy": f"bind:{node}"}
+        elif cpus:
+            placement["fio_options"] = {"cpus_allowed": cpus, "cpus_allowed_policy": "shared"}
+        return placement
+
+    def _numa_options(self, device: str = None) -> Dict[str, Any]:
+        """当前NUMA绑定策略对应的FIO参数"""
+        return dict(self._numa_placement(device)["fio_options"])
+
     def collect_system_info(self) -> Dict[str, Any]:
         """收集系统信息"""
         # 获取设备型号和容量信息
@@ -147,12 +1392,38 @@ class SSDPerformanceTester:
             "device_type": self.get_device_type(),
             "device_model": device_model,
             "device_capacity_gb": device_capacity_gb,
+            "identity": self._get_device_identity(),
+            "topology": self._get_device_topology(),
+            "numa": dict(self._get_device_numa(), nodes=self._get_numa_nodes(), placement=self._numa_placement()),
                 "test_config": {
                 "duration": self.test_duration,
                 "ramp_time": self.ramp_time,
                 "queue_depth": self.queue_depth,
                 "threads": self.threads,
-                "test_size": self.custom_test_size or "100%"
+                "test_size": self.custom_test_size or "100%",
+                "steady_state": self.steady_state_mode,
+                "purge": self.purge_method,
+                "fill_passes": self.fill_passes,
+                "fill_jobs": self.fill_jobs,
+                "live": self.live_mode,
+                "status_interval": self.status_interval,
+                "sampling": self.sampling_mode,
+                "samples": DATA_VALIDATION_SAMPLES,
+                "adaptive": {"ci_width": self.ci_width_target, "max_samples": self.max_samples,
+                             "budget": self.sample_budget} if self.adaptive_sampling else None,
+                "mode": self.mode,
+                "plan": self.test_plan["name"],
+                "jobfile": self.jobfile_mode,
+                "ioengine": self.ioengine,
+                "telemetry": self.telemetry_mode,
+                "numa": self.numa_mode,
+                "health": self.health_mode,
+                "thermal": self.thermal_mode,
+                "thermal_action": self.thermal_action,
+                "results_db": self.db_path,
+                "skip_fresh": self.skip_fresh,
+                "time_budget": self.time_budget,
+                "devices": self.devices
             },
             "system": {
                 "python_version": sys.version,
@@ -160,6 +1431,37 @@ class SSDPerformanceTester:
             }
         }
 
+    def _get_device_identity(self) -> Dict[str, Optional[str]]:
+        """获取设备序列号、型号和固件版本(sysfs优先, 其次smartctl)"""
+        identity = {"serial": None, "model": None, "firmware": None}
+        # NVMe: device/serial; virtio: serial; SCSI/SATA: device/vpd_pg80
+        sysfs_files = {"serial": ["device/serial", "serial", "device/vpd_pg80"], "model": ["device/model"],
+                       "firmware": ["device/firmware_rev", "device/rev"]}
+        for key, names in sysfs_files.items():
+            for name in names:
+                try:
+                    with open(f"/sys/block/{self.device}/{name}", "rb") as f:
+                        # vpd_pg80为二进制VPD页, 前4字节为页头
+                        raw = f.read()[4:] if name.endswith("vpd_pg80") else f.read()
+                    value = raw.decode("ascii", "ignore").strip(" \n\x00")
+                except OSError:
+                    continue
+                if value:
+                    identity[key] = value
+                    break
+
+        if None in identity.values():
+            try:
+                result = subprocess.run(["smartctl", "-i", "-j", f"/dev/{self.device}"],
+                                        capture_output=True, text=True, timeout=10)
+                info = json.loads(result.stdout)
+                identity["serial"] = identity["serial"] or info.get("serial_number")
+                identity["model"] = identity["model"] or info.get("model_name")
+                identity["firmware"] = identity["firmware"] or info.get("firmware_version")
+            except (OSError, subprocess.SubprocessError, ValueError):
+                pass
+        return identity
+
     def _get_device_model(self) -> str:
         """获取设备型号信息"""
         try:
@@ -231,6 +1533,136 @@ class SSDPerformanceTester:
             
         return "Unknown"
     
+    def _capture_health_snapshot(self, label: str) -> Optional[Dict[str, Any]]:
+        """采集设备健康快照, 原始命令输出保存到结果目录的health/下以便复查"""
+        if not self.health_mode:
+            return None
+
+        device_path = f"/dev/{self.device}"
+        commands = []
+        if self.device.startswith("nvme"):
+            commands = [
+                ("nvme_smart", ["nvme", "smart-log", device_path, "-o", "json"], DeviceHealthParser.parse_nvme_smart_log),
+                ("nvme_ocp", ["nvme", "ocp", "smart-add-log", device_path, "-o", "json"],
+                 DeviceHealthParser.parse_nvme_vendor_log),
+                ("nvme_intel", ["nvme", "intel", "smart-log-add", device_path, "-o", "json"],
+                 DeviceHealthParser.parse_nvme_vendor_log)
+            ]
+        commands.append(("smartctl", ["smartctl", "-a", "-j", device_path], DeviceHealthParser.parse_smartctl))
+
+        health = {}
+        health_dir = os.path.join(self.result_dir, "health")
+        for name, cmd, parser in commands:
+            # 已有主机写入量时smartctl只作补充, 不支持的命令不再重复调用
+            if name in self._health_unsupported or (name == "smartctl" and "host_bytes_written" in health):
+                continue
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            except (OSError, subprocess.SubprocessError):
+                self._health_unsupported.add(name)
+                continue
+            try:
+                parsed = parser(result.stdout) if result.stdout else {}
+            except Exception as e:
+                # 输出格式异常只放弃该数据源, 不影响测试流程
+                self.log("WARNING", f"解析 {name} 输出失败, 不再使用该数据源: {str(e)}")
+                parsed = {}
+            if not parsed:
+                self._health_unsupported.add(name)
+                continue
+            os.makedirs(health_dir, exist_ok=True)
+            with open(os.path.join(health_dir, f"{label}_{name}.txt"), "w") as f:
+                f.write(result.stdout)
+            for key, value in parsed.items():
+                health.setdefault(key, value)
+
+        if not health:
+            return None
+        health["timestamp"] = time.time()
+        return health
+
+    def _stage_health(self, name: str, before: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """采集阶段结束后的健康快照并计算阶段内写入量/WAF/降速"""
+        if not before:
+            return None
+        after = self._capture_health_snapshot(f"{name}_after")
+        if not after:
+            return None
+
+        health = DeviceHealthParser.delta(before, after)
+        parts = []
+        if health.get("host_bytes") is not None:
+            parts.append(f"主机写入 {health['host_bytes'] / 1e9:.2f} GB")
+        if health.get("nand_bytes") is not None:
+            parts.append(f"NAND写入 {health['nand_bytes'] / 1e9:.2f} GB")
+        if health.get("waf") is not None:
+            parts.append(f"WAF {health['waf']:.2f}")
+        if health.get("temperature_before") is not None and health.get("temperature_after") is not None:
+            parts.append(f"温度 {health['temperature_before']:.0f}→{health['temperature_after']:.0f}°C")
+        if health.get("throttle_events"):
+            parts.append(f"降速 {health['throttle_events']:.0f}次/{health['throttle_time_s']:.0f}秒")
+        if parts:
+            self.log("WARNING" if health.get("throttle_events") else "INFO", f"{name} 设备健康: {', '.join(parts)}")
+        return health
+
+    def _hwmon_files(self, name: str) -> List[str]:
+        """设备hwmon温度文件 (nvme控制器的hwmon, 或SATA盘drivetemp的hwmon)"""
+        device_dir = f"/sys/block/{self.device}/device"
+        return sorted(glob.glob(f"{device_dir}/hwmon*/{name}") + glob.glob(f"{device_dir}/hwmon/hwmon*/{name}"))
+
+    def _read_thermal_state(self) -> Dict[str, Any]:
+        """读取当前温度(hwmon优先)和热管理降速计数(nvme smart-log)"""
+        state = {}
+        for path in self._hwmon_files("temp1_input"):
+            try:
+                with open(path, "r") as f:
+                    state["temp_c"] = int(f.read().strip()) / 1000
+                break
+            except (OSError, ValueError):
+                continue
+
+        # 在监测线程中轮询, 只记录本方法自己的失败次数, 不影响健康快照的数据源判断;
+        # 满载时单次超时很常见, 连续失败多次或nvme命令不存在才放弃
+        if self.device.startswith("nvme") and self._thermal_smart_failures < THERMAL_SMART_MAX_FAILURES:
+            try:
+                result = subprocess.run(["nvme", "smart-log", f"/dev/{self.device}", "-o", "json"],
+                                        capture_output=True, text=True, timeout=5)
+                health = DeviceHealthParser.parse_nvme_smart_log(result.stdout) if result.stdout else {}
+                self._thermal_smart_failures = 0 if health else self._thermal_smart_failures + 1
+            except OSError:
+                self._thermal_smart_failures = THERMAL_SMART_MAX_FAILURES
+                health = {}
+            except subprocess.SubprocessError:
+                self._thermal_smart_failures += 1
+                health = {}
+            state.setdefault("temp_c", health.get("temperature_c"))
+            if "throttle_events" in health:
+                state["throttle_events"] = health["throttle_events"]
+        return state
+
+    def _get_thermal_limit(self) -> float:
+        """降速判定温度: --thermal_limit, 否则取设备hwmon告警温度(temp1_max), 再否则使用默认值"""
+        if self.thermal_limit is not None:
+            return self.thermal_limit
+        for path in self._hwmon_files("temp1_max"):
+            try:
+                with open(path, "r") as f:
+                    return int(f.read().strip()) / 1000
+            except (OSError, ValueError):
+                continue
+        return THERMAL_DEFAULT_LIMIT_C
+
+    def _thermal_cooldown(self):
+        """等待设备冷却到阈值以下再继续测试, 最长THERMAL_COOLDOWN_TIME秒"""
+        target = self._get_thermal_limit() - THERMAL_COOLDOWN_MARGIN_C
+        deadline = time.time() + THERMAL_COOLDOWN_TIME
+        self.log("INFO", f"等待设备冷却到 {target:.0f}°C 以下 (最长{THERMAL_COOLDOWN_TIME}秒)")
+        while time.time() < deadline:
+            temp = self._read_thermal_state().get("temp_c")
+            if temp is None or temp < target:
+                break
+            time.sleep(THERMAL_POLL_INTERVAL)
+
     def _get_device_capacity_gb(self) -> float:
         """获取设备容量(GB)"""
         try:
@@ -291,9 +1723,19 @@ class SSDPerformanceTester:
         return 0.0
     
     def _execute_single_test(self, test_type: str, block_size: str, rw_pattern: str, 
-                           queue_depth: int = None, numjobs: int = None, sample_id: int = 0) -> TestResult:
-        """执行单次测试"""
-        output_prefix = f"{test_type}_{block_size}_{rw_pattern}"
+                           queue_depth: int = None, numjobs: int = None, sample_id: int = 0,
+                           stream: bool = None, tag: str = "",
+                           fio_options: Dict[str, Any] = None, runtime: int = None) -> TestResult:
+        """执行单次测试
+
+        stream为None时按--live设置决定是否实时解析; tag用于区分输出文件;
+        fio_options为额外的FIO参数(如rate_iops), 其中rw可覆盖rw_pattern;
+        runtime为None时使用-t指定的测试时间。
+        """
+        test_runtime = runtime if runtime is not None else self.test_duration
+        base_options = dict(self._engine_options(), **self._numa_options())
+        fio_options = dict(base_options, **(fio_options or {}))
+        output_prefix = f"{test_type}_{block_size}_{rw_pattern}{tag}"
         if sample_id > 0:
             output_prefix += f"_sample{sample_id}"
             
@@ -310,13 +1752,13 @@ class SSDPerformanceTester:
             "fio",
             f"--name={output_prefix}",
             f"--filename=/dev/{self.device}",
-            "--ioengine=libaio",
+            f"--ioengine={fio_options.pop('ioengine')}",
             "--direct=1",
             f"--numjobs={test_numjobs}",
             f"--iodepth={test_queue_depth}",
-            f"--rw={rw_pattern}",
+            f"--rw={fio_options.pop('rw', rw_pattern)}",
             f"--bs={block_size}",
-            f"--runtime={self.test_duration}",
+            f"--runtime={test_runtime}",
             f"--ramp_time={self.ramp_time}",
             "--time_based=1",
             f"--size={fio_size}",
@@ -325,9 +1767,10 @@ class SSDPerformanceTester:
             "--norandommap=1",
             "--randrepeat=0",
             "--group_reporting",
-            "--output-format=json",
+            f"--percentile_list={':'.join(f'{p:g}' for p in LATENCY_PERCENTILES)}",
+            "--output-format=json+",
             f"--output={output_json}"
-        ]
+        ] + [f"--{key}={value}" for key, value in fio_options.items()]
         
         # 只在第一次采样时打印完整命令
         if sample_id == 0:
@@ -335,15 +1778,46 @@ class SSDPerformanceTester:
             self.log("INFO", f"FIO命令: {cmd_str}")
         
         # 执行命令
-        start_time = time.time()
-        result = subprocess.run(fio_cmd, capture_output=True, text=True)
-        execution_time = time.time() - start_time
+        data_points = []
+        if stream is None:
+            # 热降速检测需要逐区间数据与温度对齐
+            stream = self.live_mode or self.thermal_mode
+        sampler = HostTelemetrySampler([self.device]) if self.telemetry_mode else None
+        thermal_limit = self._get_thermal_limit() if self.thermal_mode else None
+        monitor = None
+        if sampler:
+            sampler.start()
+        try:
+            if self.thermal_mode:
+                monitor = ThermalMonitor(self._read_thermal_state, thermal_limit)
+                monitor.start()
+            start_time = time.time()
+            if stream:
+                streamed = self._run_fio_streaming(fio_cmd, self._make_progress_callback(output_prefix, test_runtime))
+                data_points = streamed["data_points"]
+                returncode = streamed["returncode"]
+                stderr_text = "\n".join(streamed["messages"])
+                stdout_text = ""
+                stall = streamed["stall"]
+            else:
+                result = self._run_fio(fio_cmd)
+                returncode = result["returncode"]
+                stderr_text = result["stderr"]
+                stdout_text = result["stdout"]
+                stall = result["stall"]
+            execution_time = time.time() - start_time
+        finally:
+            # FIO启动失败或被中断时也要停止后台轮询线程, 否则每次重试都会多泄漏一个
+            telemetry = sampler.stop() if sampler else None
+            thermal_samples = monitor.stop() if monitor else None
+        if stall:
+            raise FioStallError(f"FIO在{stall['idle_seconds']:.0f}秒内无I/O进展, 已终止")
         
-        if result.returncode != 0:
-            error_msg = f"命令执行失败 (返回码: {result.returncode})"
+        if returncode != 0:
+            error_msg = f"命令执行失败 (返回码: {returncode})"
             # 尽可能把 FIO 的 stderr/stdout 关键信息打到日志里，方便排查问题
-            stderr_preview = (result.stderr or "").strip()
-            stdout_preview = (result.stdout or "").strip()
+            stderr_preview = (stderr_text or "").strip()
+            stdout_preview = (stdout_text or "").strip()
             if stderr_preview:
                 self.log("ERROR", f"FIO stderr: {stderr_preview[:800]}")
             if stdout_preview:
@@ -368,22 +1842,71 @@ class SSDPerformanceTester:
             "execution_time": execution_time
         })
         
-        # 创建测试结果
+        test_result = self._build_test_result(test_type, block_size, rw_pattern, metrics, execution_time,
+                                              data_points, test_queue_depth, test_numjobs)
+        if telemetry:
+            self._attach_telemetry(test_result, telemetry)
+        if thermal_samples is not None:
+            ThermalMonitor.annotate(test_result.data_points, thermal_samples)
+            thermal = ThermalMonitor.summarize(thermal_samples, test_result.data_points, thermal_limit)
+            test_result.statistics["thermal"] = thermal
+            if thermal["throttled"]:
+                drop = f", 降速区间性能下降{thermal['throttle_drop']:.1%}" if "throttle_drop" in thermal else ""
+                self.log("WARNING", f"{output_prefix} 检测到热降速: 最高{thermal['max_temp_c']:.1f}°C "
+                                    f"(阈值{thermal_limit:.0f}°C), 约{thermal['throttled_seconds']:.0f}秒{drop}")
+        return test_result
+
+    def _attach_telemetry(self, result: TestResult, telemetry: Dict[str, Any]):
+        """将主机遥测摘要写入测试结果, 并按整机繁忙核数计算每核IOPS"""
+        busy_cores = telemetry.get("cpu", {}).get("busy_cores", 0)
+        telemetry["iops_per_core"] = result.statistics.get("iops", 0) / busy_cores if busy_cores > 0 else 0
+        result.statistics["telemetry"] = telemetry
+
+    def _merge_telemetry(self, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """多次采样的遥测摘要逐项取平均"""
+        merged = {}
+        for key, value in samples[0].items():
+            values = [sample[key] for sample in samples if key in sample]
+            if isinstance(value, dict):
+                merged[key] = self._merge_telemetry(values)
+            elif isinstance(value, list):
+                lists = [v for v in values if len(v) == len(value)]
+                merged[key] = [round(statistics.mean(column), 1) for column in zip(*lists)]
+            elif isinstance(value, (int, float)):
+                merged[key] = statistics.mean(values)
+            else:
+                merged[key] = value
+        return merged
+
+    def _build_test_result(self, test_type: str, block_size: str, rw_pattern: str, metrics: Dict[str, Any],
+                           execution_time: float, data_points: List, queue_depth: int, numjobs: int) -> TestResult:
+        """由提取的性能指标创建单次测试结果"""
         test_result = TestResult(
             test_type=test_type,
             block_size=block_size,
             rw_pattern=rw_pattern,
-            data_points=[],
+            data_points=data_points,
             statistics={},
             evaluation={},
             execution_time=execution_time,
-            retry_count=0
+            retry_count=0,
+            queue_depth=queue_depth,
+            numjobs=numjobs
         )
         
         # 填充统计数据
+        total_iops = metrics.get("read_iops", 0) + metrics.get("write_iops", 0)
         test_result.statistics = {
             "mean": metrics.get("primary_metric", 0),
-            "execution_time": execution_time
+            "execution_time": execution_time,
+            "iops": total_iops,
+            "bw": metrics.get("read_bw", 0) + metrics.get("write_bw", 0),
+            "lat_mean": ((metrics.get("read_lat", 0) * metrics.get("read_iops", 0) +
+                          metrics.get("write_lat", 0) * metrics.get("write_iops", 0)) / total_iops
+                         if total_iops > 0 else 0),
+            "latency": metrics.get("latency", {}),
+            "latency_bins": metrics.get("latency_bins", {}),
+            "cpu": self._cpu_cost(metrics, total_iops, numjobs)
         }
         
         # 数据质量评估
@@ -391,6 +1914,30 @@ class SSDPerformanceTester:
         
         return test_result
     
+    def _cpu_cost(self, metrics: Dict[str, Any], iops: float, numjobs: int) -> Dict[str, float]:
+        """FIO进程的CPU开销: 占用核数=(usr+sys)%×任务数, 以及每核IOPS"""
+        cores = (metrics.get("usr_cpu", 0) + metrics.get("sys_cpu", 0)) / 100 * (numjobs or 1)
+        return {
+            "usr": metrics.get("usr_cpu", 0),
+            "sys": metrics.get("sys_cpu", 0),
+            "ctx": metrics.get("ctx", 0),
+            "cores": cores,
+            "iops_per_core": iops / cores if cores > 0 else 0
+        }
+
+    def _make_progress_callback(self, job_name: str, runtime: int):
+        """生成实时模式下的进度日志回调"""
+        state = {"next_report": LIVE_PROGRESS_INTERVAL}
+
+        def on_point(point: Dict[str, float]) -> bool:
+            if point["t"] >= state["next_report"]:
+                state["next_report"] += LIVE_PROGRESS_INTERVAL
+                self.log("INFO", f"{job_name} 进度 {point['t']:.0f}/{runtime}秒: "
+                                 f"{point['bw']:.2f} MB/s, {point['iops']:.0f} IOPS, 延迟 {point['lat']:.1f}us")
+            return False
+
+        return on_point
+
     def _load_and_validate_json(self, json_file: str) -> Optional[Dict]:
         """加载并验证JSON文件"""
         if not os.path.exists(json_file) or os.path.getsize(json_file) < 100:
@@ -407,11 +1954,241 @@ class SSDPerformanceTester:
         except json.JSONDecodeError:
             return None
     
-    def _extract_performance_metrics(self, test_result: Dict) -> Dict[str, float]:
-        """提取性能指标"""
-        json_data = test_result["json_data"]
-        
-        if not json_data or "jobs" not in json_data or not json_data["jobs"]:
+    def _compute_interval_point(self, prev_job: Optional[Dict], job: Dict,
+                                elapsed: float, interval: float) -> Optional[Dict[str, float]]:
+        """根据相邻两次状态快照计算区间性能(带宽MB/s, IOPS, 平均延迟us; json+输出时另有P99延迟us)"""
+        if interval <= 0:
+            return None
+
+        delta_bytes = 0
+        delta_ios = 0
+        delta_lat_ns = 0.0
+        delta_bins = {}
+        for direction in ("read", "write"):
+            current = job.get(direction, {})
+            previous = (prev_job or {}).get(direction, {})
+            current_ios = current.get("lat_ns", {}).get("N", current.get("total_ios", 0))
+            previous_ios = previous.get("lat_ns", {}).get("N", previous.get("total_ios", 0))
+
+            bytes_diff = current.get("io_bytes", 0) - previous.get("io_bytes", 0)
+            ios_diff = current_ios - previous_ios
+            if bytes_diff < 0 or ios_diff < 0:
+                # ramp_time结束时FIO会清零统计, 该区间无效
+                return None
+
+            delta_bytes += bytes_diff
+            delta_ios += ios_diff
+            delta_lat_ns += (current.get("lat_ns", {}).get("mean", 0) * current_ios -
+                             previous.get("lat_ns", {}).get("mean", 0) * previous_ios)
+
+            # json+快照中的直方图是累计值, 逐桶相减得到本区间的分布
+            previous_bins = previous.get("clat_ns", {}).get("bins", {})
+            for latency_ns, count in current.get("clat_ns", {}).get("bins", {}).items():
+                diff = count - previous_bins.get(latency_ns, 0)
+                if diff > 0:
+                    delta_bins[int(latency_ns)] = delta_bins.get(int(latency_ns), 0) + diff
+
+        point = {
+            "t": round(elapsed, 1),
+            "bw": delta_bytes / (1024 * 1024) / interval * MIB_TO_MBS,
+            "iops": delta_ios / interval,
+            "lat": delta_lat_ns / delta_ios / 1000 if delta_ios > 0 else 0
+        }
+        if delta_bins:
+            point["p99"] = self._percentiles_from_bins(delta_bins, [99]).get("p99", 0)
+        return point
+
+    def _run_fio_streaming(self, fio_cmd: List[str], on_point=None,
+                           status_interval: int = None) -> Dict[str, Any]:
+        """以 --status-interval 方式运行FIO, 逐个解析输出快照
+
+        on_point 回调接收每个区间数据点(下一个快照到达时才计入, 因此滞后一个区间), 返回True时提前终止FIO。
+        最终快照会写入原命令中 --output 指定的文件。
+        """
+        output_file = None
+        cmd = []
+        for arg in fio_cmd:
+            if arg.startswith("--output="):
+                output_file = arg.split("=", 1)[1]
+            else:
+                cmd.append(arg)
+        cmd.append(f"--status-interval={status_interval or self.status_interval}")
+
+        parser = FioStatusParser()
+        data_points = []
+        last_snapshot = None
+        prev_job = None
+        origin = None
+        prev_time = None
+        stopped = False
+
+        start_time = time.time()
+        process = self._start_fio(cmd, stderr=subprocess.STDOUT, bufsize=1)
+        watchdog = self._start_watchdog(process)
+        # 由读取线程转发输出行: 进程阻塞在设备I/O上无法退出时, 主线程仍能按超时放弃等待
+        lines = queue.Queue()
+
+        def read_output():
+            for output_line in process.stdout:
+                lines.put(output_line)
+            lines.put(None)
+
+        threading.Thread(target=read_output, name=threading.current_thread().name, daemon=True).start()
+        returncode = None
+        try:
+            while True:
+                try:
+                    line = lines.get(timeout=WATCHDOG_POLL_INTERVAL)
+                except queue.Empty:
+                    if self._fio_abandoned(watchdog, process):
+                        returncode = -signal.SIGKILL
+                        break
+                    continue
+                if line is None:
+                    break
+                snapshot = parser.feed(line)
+                if not snapshot or not snapshot.get("jobs"):
+                    continue
+                # 时间基准取FIO自己的快照时间戳, 不受管道缓冲影响; 旧版FIO没有时才用接收时间
+                snapshot.setdefault("timestamp_ms", int(time.time() * 1000))
+
+                # 退出前的最终报告覆盖整个运行期间(含end_fsync), 不能作为区间数据点;
+                # 后面又到达新快照时才能确认上一个是周期快照, 再计入序列
+                previous, last_snapshot = last_snapshot, snapshot
+                if previous is None:
+                    continue
+                job = previous["jobs"][0]
+                timestamp = previous["timestamp_ms"] / 1000
+                if origin is None:
+                    origin = timestamp - job["elapsed"] if "elapsed" in job else start_time
+                    prev_time = origin
+                point = self._compute_interval_point(prev_job, job, timestamp - origin, timestamp - prev_time)
+                prev_job = job
+                prev_time = timestamp
+                if point is None:
+                    continue
+
+                data_points.append(point)
+                if watchdog and point["iops"] > 0:
+                    watchdog.touch()
+                if on_point is not None and not stopped and on_point(point):
+                    # SIGTERM让FIO正常收尾并输出最终结果
+                    process.terminate()
+                    stopped = True
+            while returncode is None:
+                try:
+                    returncode = process.wait(timeout=WATCHDOG_POLL_INTERVAL)
+                except subprocess.TimeoutExpired:
+                    if self._fio_abandoned(watchdog, process):
+                        returncode = -signal.SIGKILL
+        except BaseException:
+            FioWatchdog.kill_tree(process)
+            raise
+        finally:
+            stall = self._stop_watchdog(watchdog, fio_cmd)
+            self._fio_processes.discard(process)
+        if self._aborted:
+            raise KeyboardInterrupt
+
+        if output_file and last_snapshot:
+            with open(output_file, "w") as f:
+                json.dump(last_snapshot, f)
+
+        return {
+            "returncode": returncode,
+            "json_data": last_snapshot,
+            "data_points": data_points,
+            "messages": parser.messages,
+            "stopped": stopped,
+            "stall": stall,
+            "elapsed": time.time() - start_time
+        }
+
+    def _start_watchdog(self, process: subprocess.Popen, devices: List[str] = None) -> Optional[FioWatchdog]:
+        """为FIO进程启动卡死看门狗, --stall_timeout 0时不启动"""
+        if not self.stall_timeout:
+            return None
+        watchdog = FioWatchdog(process, devices or [self.device], self.stall_timeout)
+        watchdog.start()
+        return watchdog
+
+    def _stop_watchdog(self, watchdog: Optional[FioWatchdog], fio_cmd: List[str]) -> Optional[Dict[str, Any]]:
+        """停止看门狗; 发生卡死时输出诊断信息并记录到analysis["stalls"]"""
+        stall = watchdog.stop() if watchdog else None
+        if not stall:
+            return None
+        names = [arg.split("=", 1)[1] for arg in fio_cmd if arg.startswith("--name=")]
+        jobfiles = [os.path.basename(arg) for arg in fio_cmd if arg.endswith(".fio")]
+        stall["name"] = (names or jobfiles or ["fio"])[0]
+        stall["devices"] = watchdog.devices
+        self.analysis.setdefault("stalls", []).append(stall)
+
+        in_flight = ", ".join(f"{device}={count}" for device, count in stall["in_flight"].items()) or "未知"
+        self.log("ERROR", f"{stall['name']} 卡死: 运行{stall['elapsed']:.0f}秒后{stall['idle_seconds']:.0f}秒无I/O进展, "
+                          f"已终止FIO进程组 (在途I/O: {in_flight})")
+        for line in stall["dmesg"][-3:]:
+            self.log("ERROR", f"  dmesg: {line}")
+        return stall
+
+    def _start_fio(self, fio_cmd: List[str], stderr=subprocess.PIPE, bufsize: int = -1) -> subprocess.Popen:
+        """在独立进程组中启动FIO并登记; 测试已被中止时不再启动"""
+        with self._fio_lock:
+            if self._aborted:
+                raise KeyboardInterrupt
+            process = subprocess.Popen(fio_cmd, stdout=subprocess.PIPE, stderr=stderr, text=True,
+                                       bufsize=bufsize, start_new_session=True)
+            self._fio_processes.add(process)
+        return process
+
+    def abort_fio(self):
+        """中止测试: 终止所有运行中的FIO进程组, 之后的FIO调用直接中断"""
+        with self._fio_lock:
+            self._aborted = True
+            processes = list(self._fio_processes)
+        for process in processes:
+            FioWatchdog.kill_tree(process, wait=0)
+
+    def _fio_abandoned(self, watchdog: Optional[FioWatchdog], process: subprocess.Popen) -> bool:
+        """看门狗终止FIO后超过WATCHDOG_KILL_WAIT秒进程仍未退出时放弃等待"""
+        if not watchdog or not watchdog.killed_at or time.time() - watchdog.killed_at <= WATCHDOG_KILL_WAIT:
+            return False
+        # 阻塞在设备I/O上的进程收不到SIGKILL, 放弃等待以继续后续测试
+        self.log("WARNING", f"FIO进程 {process.pid} 终止后{WATCHDOG_KILL_WAIT}秒仍未退出, 不再等待")
+        return True
+
+    def _run_fio(self, fio_cmd: List[str], devices: List[str] = None) -> Dict[str, Any]:
+        """运行FIO并收集输出, 期间由看门狗监控进度; 返回 returncode/stdout/stderr/stall"""
+        process = self._start_fio(fio_cmd)
+        watchdog = self._start_watchdog(process, devices)
+        stdout_text, stderr_text = "", ""
+        try:
+            while True:
+                try:
+                    stdout_text, stderr_text = process.communicate(timeout=WATCHDOG_POLL_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self._fio_abandoned(watchdog, process):
+                        break
+        except BaseException:
+            FioWatchdog.kill_tree(process)
+            raise
+        finally:
+            stall = self._stop_watchdog(watchdog, fio_cmd)
+            self._fio_processes.discard(process)
+        if self._aborted:
+            raise KeyboardInterrupt
+        return {
+            "returncode": process.returncode if process.returncode is not None else -signal.SIGKILL,
+            "stdout": stdout_text or "",
+            "stderr": stderr_text or "",
+            "stall": stall
+        }
+
+    def _extract_performance_metrics(self, test_result: Dict) -> Dict[str, float]:
+        """提取性能指标"""
+        json_data = test_result["json_data"]
+        
+        if not json_data or "jobs" not in json_data or not json_data["jobs"]:
             return {}
             
         job = json_data["jobs"][0]
@@ -455,8 +2232,13 @@ class SSDPerformanceTester:
         read_io_bytes = read_data.get("io_bytes", 0)
         write_io_bytes = write_data.get("io_bytes", 0)
         
-        # 如果有读数据,则使用读性能；否则使用写性能
-        if read_io_bytes > 0:
+        # 混合读写使用读写合计；如果有读数据,则使用读性能；否则使用写性能
+        if read_io_bytes > 0 and write_io_bytes > 0:
+            if "rand" in rw_mode or job.get("jobname", "").startswith("random"):
+                primary_metric = read_data.get("iops", 0) + write_data.get("iops", 0)
+            else:
+                primary_metric = read_bw_mbs + write_bw_mbs
+        elif read_io_bytes > 0:
             if "rand" in rw_mode or job.get("jobname", "").startswith("random"):
                 primary_metric = read_data.get("iops", 0)  # 随机读用IOPS
             else:
@@ -481,8 +2263,67 @@ class SSDPerformanceTester:
             "write_iops": write_data.get("iops", 0),
             "write_lat": write_data.get("lat_ns", {}).get("mean", 0) / 1000,
             "primary_metric": primary_metric,
-            "execution_time": test_result.get("execution_time", 0)
+            "execution_time": test_result.get("execution_time", 0),
+            # FIO在group_reporting下给出的是各任务平均CPU占用(%)
+            "usr_cpu": job.get("usr_cpu", 0),
+            "sys_cpu": job.get("sys_cpu", 0),
+            "ctx": job.get("ctx", 0),
+            **self._extract_latency_distribution(read_data, write_data)
         }
+
+    def _extract_latency_distribution(self, read_data: Dict, write_data: Dict) -> Dict[str, Dict]:
+        """提取完成延迟(clat)百分位和json+直方图
+
+        有直方图时百分位由直方图计算, 便于多次采样按直方图合并;
+        否则使用FIO输出的percentile字段。
+        """
+        latency = {}
+        latency_bins = {}
+        for direction, data in (("read", read_data), ("write", write_data)):
+            if data.get("io_bytes", 0) <= 0:
+                continue
+            clat = data.get("clat_ns", {})
+            bins = {int(k): v for k, v in clat.get("bins", {}).items()}
+            if bins:
+                latency_bins[direction] = bins
+                latency[direction] = self._percentiles_from_bins(bins)
+            elif clat.get("percentile"):
+                latency[direction] = {
+                    f"p{p:g}": clat["percentile"].get(f"{p:.6f}", 0) / 1000 for p in LATENCY_PERCENTILES
+                }
+
+        if len(latency_bins) > 1:
+            latency["all"] = self._percentiles_from_bins(self._merge_latency_bins(list(latency_bins.values())))
+        elif latency:
+            latency["all"] = next(iter(latency.values()))
+
+        return {"latency": latency, "latency_bins": latency_bins}
+
+    def _merge_latency_bins(self, bins_list: List[Dict[int, float]]) -> Dict[int, float]:
+        """按桶累加多个延迟直方图"""
+        merged = {}
+        for bins in bins_list:
+            for latency_ns, count in bins.items():
+                merged[latency_ns] = merged.get(latency_ns, 0) + count
+        return merged
+
+    def _percentiles_from_bins(self, bins: Dict[int, float], percentiles: List[float] = None) -> Dict[str, float]:
+        """由延迟直方图计算百分位(us)"""
+        total = sum(bins.values())
+        if total <= 0:
+            return {}
+
+        result = {}
+        sorted_bins = sorted(bins.items())
+        for p in percentiles or LATENCY_PERCENTILES:
+            threshold = total * p / 100
+            cumulative = 0
+            for latency_ns, count in sorted_bins:
+                cumulative += count
+                if cumulative >= threshold:
+                    result[f"p{p:g}"] = latency_ns / 1000
+                    break
+        return result
     
     def _evaluate_test_result(self, result: TestResult) -> Dict[str, Any]:
         """评估测试结果质量"""
@@ -501,6 +2342,9 @@ class SSDPerformanceTester:
         for attempt in range(TEST_RETRY_COUNT + 1):
             try:
                 return operation()
+            except FioStallError:
+                # 卡死的设备重试只会再次卡死
+                raise
             except Exception as e:
                 last_error = e
                 if attempt < TEST_RETRY_COUNT:
@@ -510,20 +2354,52 @@ class SSDPerformanceTester:
         raise last_error
     
     def run_enhanced_test(self, test_type: str, block_size: str, rw_pattern: str, 
-                         queue_depth: int = None, numjobs: int = None) -> TestResult:
-        """运行增强测试(多次采样)"""
+                         queue_depth: int = None, numjobs: int = None, runtime: int = None,
+                         samples: int = None, fio_options: Dict[str, Any] = None, tag: str = "") -> TestResult:
+        """运行增强测试(多次采样)
+
+        启用--adaptive且未指定samples时按顺序采样: 至少ADAPTIVE_MIN_SAMPLES次, 之后每次采样后
+        计算主要指标的置信区间, 相对宽度达到目标、达到最大采样数或预计超出时间预算即停止。
+        """
         self.log("INFO", f"开始增强测试: {test_type}_{block_size}_{rw_pattern} (QD:{queue_depth or self.queue_depth}, Jobs:{numjobs or self.threads})")
+        sample_count = samples or DATA_VALIDATION_SAMPLES
+        
+        if self.sampling_mode == "slices":
+            return self._run_sliced_test(test_type, block_size, rw_pattern, queue_depth, numjobs,
+                                         runtime, sample_count, fio_options, tag)
+        
+        adaptive = self.adaptive_sampling and not samples
+        if adaptive:
+            sample_count = self.max_samples
+        sampling = {"adaptive": adaptive, "stop_reason": "fixed"}
+        start_time = time.time()
         
         # 执行多次采样
         results = []
-        for sample_id in range(DATA_VALIDATION_SAMPLES):
+        for sample_id in range(sample_count):
+            if adaptive and results:
+                stop_reason = self._adaptive_stop_reason(results, time.time() - start_time)
+                if stop_reason:
+                    sampling["stop_reason"] = stop_reason
+                    break
             try:
-                result = self.retry_operation(
-                    lambda: self._execute_single_test(test_type, block_size, rw_pattern, queue_depth, numjobs, sample_id),
-                    f"FIO测试-{test_type}_{block_size}_{rw_pattern}"
-                )
+                run_sample = lambda: self._execute_single_test(test_type, block_size, rw_pattern, queue_depth, numjobs,
+                                                               sample_id, tag=tag, fio_options=fio_options, runtime=runtime)
+                result = self.retry_operation(run_sample, f"FIO测试-{test_type}_{block_size}_{rw_pattern}")
+                # 降速的采样冷却后重跑
+                reruns = 0
+                while (self.thermal_action == "rerun" and reruns < THERMAL_MAX_RERUNS and
+                       result.statistics.get("thermal", {}).get("throttled")):
+                    reruns += 1
+                    self._thermal_cooldown()
+                    self.log("INFO", f"第{sample_id + 1}次采样因热降速重跑")
+                    result = self.retry_operation(run_sample, f"FIO测试-{test_type}_{block_size}_{rw_pattern}")
                 results.append(result)
 
+            except FioStallError as e:
+                self.log("ERROR", f"测试失败: {str(e)}, 跳过剩余采样")
+                results.append(self._make_failed_result(test_type, block_size, rw_pattern, str(e), queue_depth, numjobs))
+                break
             except Exception as e:
                 self.log("ERROR", f"测试失败: {str(e)}")
                 # 创建失败结果
@@ -538,13 +2414,135 @@ class SSDPerformanceTester:
                     retry_count=TEST_RETRY_COUNT
                 )
                 results.append(failed_result)
+        if adaptive and sampling["stop_reason"] == "fixed":
+            sampling["stop_reason"] = "max_samples"
         
         # 合并结果
         if results:
-            return self._merge_test_results(results, test_type, block_size, rw_pattern)
+            merged_result = self._merge_test_results(results, test_type, block_size, rw_pattern)
+            if adaptive:
+                values = [r.statistics.get("mean", 0) for r in results if r.evaluation.get("status") != "FAILED"]
+                sampling.update(self._mean_confidence_interval(values))
+                sampling["target"] = self.ci_width_target
+                width = f"{sampling['rel_width']:.1%}" if sampling["rel_width"] is not None else "N/A"
+                self.log("INFO", f"自适应采样结束: {len(results)}次, 置信区间相对宽度 {width} "
+                                 f"(目标 {self.ci_width_target:.1%}, {ADAPTIVE_STOP_REASONS[sampling['stop_reason']]})")
+            merged_result.statistics["sampling"] = sampling
+            # 单次采样的计划时长, 与实际耗时之差即进程启动/落盘开销, 供--budget规划参考
+            merged_result.statistics["planned_seconds"] = (runtime or self.test_duration) + self.ramp_time
+            return merged_result
         else:
             raise Exception("所有采样均失败")
+
+    def _mean_confidence_interval(self, values: List[float]) -> Dict[str, Optional[float]]:
+        """均值的95%置信区间(t分布), 返回半宽和相对全宽"""
+        if len(values) < 2 or statistics.mean(values) <= 0:
+            return {"half_width": None, "rel_width": None}
+        df = len(values) - 1
+        t_value = T_CRITICAL_95[df] if df < len(T_CRITICAL_95) else 1.96
+        half_width = t_value * statistics.stdev(values) / len(values) ** 0.5
+        return {"half_width": half_width, "rel_width": 2 * half_width / statistics.mean(values)}
+
+    def _adaptive_stop_reason(self, results: List[TestResult], elapsed: float) -> Optional[str]:
+        """判断自适应采样是否应停止, 返回停止原因"""
+        values = [r.statistics.get("mean", 0) for r in results if r.evaluation.get("status") != "FAILED"]
+        if len(values) >= ADAPTIVE_MIN_SAMPLES:
+            interval = self._mean_confidence_interval(values)
+            if interval["rel_width"] is not None and interval["rel_width"] <= self.ci_width_target:
+                return "converged"
+            self.log("INFO", f"已采样{len(results)}次, 置信区间相对宽度 "
+                             f"{interval['rel_width'] if interval['rel_width'] is not None else float('inf'):.1%}, 继续采样")
+        # 按已完成采样的平均耗时预估下一次, 超出预算则停止
+        if self.sample_budget and elapsed + elapsed / len(results) > self.sample_budget:
+            return "budget"
+        return None
     
+    def _run_sliced_test(self, test_type: str, block_size: str, rw_pattern: str,
+                         queue_depth: int = None, numjobs: int = None, runtime: int = None,
+                         sample_count: int = DATA_VALIDATION_SAMPLES, fio_options: Dict[str, Any] = None,
+                         tag: str = "") -> TestResult:
+        """单次FIO运行, 将稳定区间等分为多个时间窗口作为采样"""
+        try:
+            full_result = self.retry_operation(
+                lambda: self._execute_single_test(test_type, block_size, rw_pattern, queue_depth, numjobs, stream=True,
+                                                  tag=tag, fio_options=fio_options, runtime=runtime),
+                f"FIO测试-{test_type}_{block_size}_{rw_pattern}"
+            )
+        except Exception as e:
+            self.log("ERROR", f"测试失败: {str(e)}")
+            return TestResult(
+                test_type=test_type,
+                block_size=block_size,
+                rw_pattern=rw_pattern,
+                data_points=[],
+                statistics={},
+                evaluation={"status": "FAILED", "error": str(e)},
+                execution_time=0,
+                retry_count=TEST_RETRY_COUNT
+            )
+
+        samples = self._slice_data_points(full_result, sample_count, runtime)
+        merged_result = self._merge_test_results(samples, test_type, block_size, rw_pattern)
+        if merged_result.evaluation.get("status") == "FAILED":
+            return merged_result
+        merged_result.execution_time = full_result.execution_time
+        merged_result.statistics["execution_time_mean"] = full_result.execution_time
+        merged_result.statistics["sampling"] = "slices"
+        # 时间窗口无独立直方图, 延迟分布取整次运行
+        merged_result.statistics["latency"] = full_result.statistics.get("latency", {})
+        merged_result.statistics["latency_bins"] = full_result.statistics.get("latency_bins", {})
+        return merged_result
+
+    def _slice_data_points(self, result: TestResult, count: int, runtime: int = None) -> List[TestResult]:
+        """按stable_data_start_time~stable_data_end_time切分时间窗口, 每个窗口生成一个采样结果"""
+        if runtime is None or runtime == self.test_duration:
+            stable_start, stable_end = self.stable_data_start_time, self.stable_data_end_time
+        else:
+            stable_start, stable_end = self._stable_window(runtime)
+        # data_points的时间从FIO启动开始计, 正式测量在ramp_time之后
+        window_start = self.ramp_time + stable_start
+        window_width = (stable_end - stable_start) / count
+        metric = "bw" if result.test_type == "sequential" else "iops"
+
+        samples = []
+        for index in range(count):
+            start = window_start + index * window_width
+            end = start + window_width
+            points = [p for p in result.data_points if start <= p["t"] < end]
+
+            if not points:
+                samples.append(TestResult(
+                    test_type=result.test_type,
+                    block_size=result.block_size,
+                    rw_pattern=result.rw_pattern,
+                    data_points=[],
+                    statistics={},
+                    evaluation={"status": "FAILED", "error": f"时间窗口 {start:.0f}-{end:.0f}秒 无数据"},
+                    execution_time=0,
+                    retry_count=0
+                ))
+                continue
+
+            sample = TestResult(
+                test_type=result.test_type,
+                block_size=result.block_size,
+                rw_pattern=result.rw_pattern,
+                data_points=points,
+                statistics={
+                    "mean": statistics.mean(p[metric] for p in points),
+                    "execution_time": window_width
+                },
+                evaluation={},
+                execution_time=window_width,
+                retry_count=0,
+                queue_depth=result.queue_depth,
+                numjobs=result.numjobs
+            )
+            sample.evaluation = self._evaluate_test_result(sample)
+            samples.append(sample)
+
+        return samples
+
     def _merge_test_results(self, results: List[TestResult], test_type: str, block_size: str, rw_pattern: str) -> TestResult:
         """合并多次测试结果"""
         valid_results = [r for r in results if r.evaluation.get("status") != "FAILED"]
@@ -556,16 +2554,26 @@ class SSDPerformanceTester:
         primary_metrics = [r.statistics.get("mean", 0) for r in valid_results]
         execution_times = [r.execution_time for r in valid_results]
         
+        # 保留各次采样的区间时间序列, 以sample字段区分
+        data_points = []
+        for sample_id, r in enumerate(valid_results):
+            data_points.extend(dict(point, sample=sample_id) for point in r.data_points)
+        
         mean_value = statistics.mean(primary_metrics) if primary_metrics else 0
         stdev_value = statistics.stdev(primary_metrics) if len(primary_metrics) > 1 else 0
         cv = stdev_value / mean_value if mean_value > 0 else float('inf')  # 变异系数：标准差/均值
         
+        latency, latency_bins, latency_note = self._merge_latency_statistics(valid_results)
+        cpu_samples = [r.statistics["cpu"] for r in valid_results if r.statistics.get("cpu")]
+        cpu = {key: statistics.mean(c[key] for c in cpu_samples) for key in cpu_samples[0]} if cpu_samples else {}
+        telemetry_samples = [r.statistics["telemetry"] for r in valid_results if r.statistics.get("telemetry")]
+        
         # 创建合并结果
         merged_result = TestResult(
             test_type=test_type,
             block_size=block_size,
             rw_pattern=rw_pattern,
-            data_points=[],
+            data_points=data_points,
             statistics={
                 "mean": mean_value,
                 "stdev": stdev_value,
@@ -573,15 +2581,39 @@ class SSDPerformanceTester:
                 "min": min(primary_metrics) if primary_metrics else 0,
                 "max": max(primary_metrics) if primary_metrics else 0,
                 "sample_count": len(valid_results),
-                "execution_time_mean": statistics.mean(execution_times) if execution_times else 0
+                "sample_values": primary_metrics,
+                "sample_latency": [{f"p{p:g}": self._result_percentile(r, p) for p in LATENCY_PERCENTILES}
+                                   for r in valid_results],
+                "execution_time_mean": statistics.mean(execution_times) if execution_times else 0,
+                "latency": latency,
+                "latency_bins": latency_bins,
+                "cpu": cpu
             },
             evaluation={},
             execution_time=statistics.mean(execution_times) if execution_times else 0,
-            retry_count=sum(r.retry_count for r in results)
+            retry_count=sum(r.retry_count for r in results),
+            queue_depth=valid_results[0].queue_depth,
+            numjobs=valid_results[0].numjobs
         )
         
+        if telemetry_samples:
+            merged_result.statistics["telemetry"] = self._merge_telemetry(telemetry_samples)
+        thermal_samples = [r.statistics["thermal"] for r in valid_results if "thermal" in r.statistics]
+        throttled_count = sum(1 for thermal in thermal_samples if thermal["throttled"])
+        if thermal_samples:
+            temps = [thermal["max_temp_c"] for thermal in thermal_samples if thermal["max_temp_c"] is not None]
+            merged_result.statistics["thermal"] = {
+                "limit_c": thermal_samples[0]["limit_c"],
+                "max_temp_c": max(temps) if temps else None,
+                "throttled": throttled_count > 0,
+                "throttled_samples": throttled_count,
+                "throttled_seconds": sum(thermal["throttled_seconds"] for thermal in thermal_samples)
+            }
+        
         # 评估合并结果
         merged_result.evaluation = self._evaluate_test_result(merged_result)
+        if latency_note:
+            merged_result.evaluation["notes"].append(latency_note)
         
         # 数据质量评估(基于变异系数CV)
         if cv < 0.1:  # CV<0.1: 数据稳定性极好
@@ -590,104 +2622,1989 @@ class SSDPerformanceTester:
             merged_result.evaluation["data_quality"] = "GOOD"
         else:  # CV>0.2: 数据波动较大
             merged_result.evaluation["data_quality"] = "POOR"
-            merged_result.evaluation["notes"].append(f"数据波动较大,变异系数{cv:.3f}")
+            merged_result.evaluation["notes"].append(f"数据波动较大,变异系数{cv:.3f}"
+                                                     f"{'(检测到热降速)' if throttled_count else ''}")
+        
+        # 热降速: 标记原因, invalid策略下判为无效结果
+        if throttled_count:
+            merged_result.evaluation["notes"].append(f"{throttled_count}/{len(thermal_samples)}次采样检测到热降速")
+            if self.thermal_action == "invalid":
+                merged_result.evaluation["status"] = "FAILED"
+                merged_result.evaluation["error"] = "检测到热降速, 结果无效"
         
         return merged_result
     
+    def _run_warmup(self, name: str, rw: str, block_size: str, queue_depth: int, numjobs: int,
+                    duration: int = None, fio_options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """执行预热: 固定时长(默认ramp_time), 或在稳态检测模式下达到稳态即提前结束"""
+        warmup_time = duration if duration is not None else self.ramp_time
+        warmup_size = self.custom_test_size or "100%"
+        base_options = dict(self._engine_options(), **self._numa_options())
+        fio_options = dict(base_options, **(fio_options or {}))
+        warmup_cmd = ["fio", f"--name={name}", f"--filename=/dev/{self.device}",
+                      f"--rw={rw}", f"--bs={block_size}", f"--ioengine={fio_options.pop('ioengine')}", "--direct=1",
+                      f"--numjobs={numjobs}", f"--iodepth={queue_depth}", f"--runtime={warmup_time}",
+                      "--time_based=1", f"--size={warmup_size}", "--refill_buffers", "--end_fsync=1",
+                      "--norandommap=1", "--randrepeat=0", "--group_reporting",
+                      "--output-format=json", f"--output={os.path.join(self.result_dir, f'{name}.json')}"]
+        warmup_cmd += [f"--{key}={value}" for key, value in fio_options.items()]
+
+        record = {
+            "name": name,
+            "rw": rw,
+            "block_size": block_size,
+            "mode": "steady_state" if self.steady_state_mode else "fixed",
+            "max_time": warmup_time
+        }
+
+        start_time = time.time()
+        if not self.steady_state_mode:
+            if self._run_fio(warmup_cmd)["stall"]:
+                raise FioStallError(f"{name} 预热卡死")
+        else:
+            # 顺序负载跟踪带宽, 随机负载跟踪IOPS
+            metric = "iops" if rw.startswith("rand") else "bw"
+            detector = SteadyStateDetector(round_time=self.steady_state_round_time)
+            streamed = self._run_fio_streaming(warmup_cmd, lambda point: detector.add_sample(point["t"], point[metric]))
+            if streamed["stall"]:
+                raise FioStallError(f"{name} 预热卡死")
+
+            record["metric"] = metric
+            record.update(detector.summary())
+            if record["steady"]:
+                self.log("SUCCESS", f"{name} 在第{record['steady_time']:.0f}秒达到稳态 "
+                                    f"(极差{record['range_ratio']:.1%}, 斜率{record['slope_ratio']:.1%})")
+            else:
+                self.log("WARNING", f"{name} 在{warmup_time}秒内未达到稳态, 设备性能可能持续波动")
+
+        record["elapsed"] = time.time() - start_time
+        self.warmup_records.append(record)
+        return record
+
+    def _get_device_size_bytes(self) -> int:
+        """从sysfs读取设备容量(字节), 读取失败返回0"""
+        try:
+            with open(f"/sys/block/{self.device}/size", "r") as f:
+                return int(f.read().strip()) * 512
+        except (OSError, ValueError):
+            return 0
+
+    def _fill_fio_options(self, rw: str) -> Dict[str, Any]:
+        """全盘填充的FIO参数: 按作业数等分LBA, 每个作业以offset_increment错开并循环fill_passes遍"""
+        device_bytes = self._get_device_size_bytes()
+        part = device_bytes // self.fill_jobs // FILL_ALIGN_BYTES * FILL_ALIGN_BYTES
+        if part <= 0:
+            raise ValueError(f"无法获取设备 {self.device} 的容量")
+        options = {
+            "numjobs": self.fill_jobs,
+            "size": part,
+            "offset_increment": part,
+            "loops": self.fill_passes,
+            "time_based": 0
+        }
+        if rw.startswith("rand"):
+            # 保留随机映射, 保证每遍覆盖分区内的每个块
+            options["norandommap"] = 0
+        return options
+
+    def _run_fill(self, name: str, rw: str, block_size: str, queue_depth: int,
+                  fio_options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """执行全盘填充预处理, 按已写入字节输出进度"""
+        fill_options = self._fill_fio_options(rw)
+        total_bytes = fill_options["size"] * self.fill_jobs * self.fill_passes
+        base_options = dict(self._engine_options(), **self._numa_options())
+        fio_options = dict(base_options, **(fio_options or {}))
+        fio_options.update(fill_options)
+        fill_cmd = ["fio", f"--name={name}", f"--filename=/dev/{self.device}", f"--rw={rw}", f"--bs={block_size}",
+                    f"--ioengine={fio_options.pop('ioengine')}", "--direct=1", f"--iodepth={queue_depth}",
+                    "--refill_buffers", "--end_fsync=1", "--randrepeat=0", "--group_reporting",
+                    "--output-format=json", f"--output={os.path.join(self.result_dir, f'{name}.json')}"]
+        fill_cmd += [f"--{key}={value}" for key, value in fio_options.items()]
+        self.log("INFO", f"FIO命令: {' '.join(fill_cmd)}")
+
+        progress = {"bytes": 0.0, "t": 0.0, "reported": 0.0}
+
+        def on_point(point: Dict[str, float]) -> bool:
+            progress["bytes"] += point["bw"] * (point["t"] - progress["t"]) * 1000 * 1000
+            progress["t"] = point["t"]
+            ratio = min(progress["bytes"] / total_bytes, 1.0)
+            if ratio - progress["reported"] >= FILL_PROGRESS_STEP:
+                progress["reported"] = ratio
+                remaining = (total_bytes - progress["bytes"]) / (point["bw"] * 1000 * 1000) if point["bw"] > 0 else 0
+                self.log("INFO", f"{name} 填充进度 {ratio:.0%}: {progress['bytes'] / 1e9:,.1f} / "
+                                 f"{total_bytes / 1e9:,.1f} GB ({point['bw']:,.0f} MB/s, 预计剩余{remaining:.0f}秒)")
+            return False
+
+        start_time = time.time()
+        streamed = self._run_fio_streaming(fill_cmd, on_point)
+        record = {
+            "name": name,
+            "rw": rw,
+            "block_size": block_size,
+            "mode": "fill",
+            "passes": self.fill_passes,
+            "jobs": self.fill_jobs,
+            "total_bytes": total_bytes,
+            "written_bytes": progress["bytes"],
+            "elapsed": time.time() - start_time
+        }
+        if streamed["stall"]:
+            raise FioStallError(f"{name} 填充卡死")
+        if streamed["returncode"] != 0:
+            raise RuntimeError(f"FIO返回码 {streamed['returncode']}")
+        self.warmup_records.append(record)
+        return record
+
+    def _purge_device(self, method: str) -> bool:
+        """将设备恢复到已知的干净状态: blkdiscard / NVMe format(用户数据擦除) / NVMe sanitize(块擦除)"""
+        if method == "discard":
+            return self._discard_device()
+        if not self.device.startswith("nvme"):
+            self.log("WARNING", f"{method} 仅支持NVMe设备, 改用blkdiscard")
+            return self._discard_device()
+
+        # sanitize作用于整个控制器(其下所有命名空间), format作用于命名空间
+        controller = re.sub(r"n\d+$", "", self.device)
+        if method == "format":
+            cmd = ["nvme", "format", f"/dev/{self.device}", "--ses=1", "--force"]
+        else:
+            cmd = ["nvme", "sanitize", f"/dev/{controller}", "--sanact=2"]
+        self.log("INFO", f"执行purge: {' '.join(cmd)}")
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=SANITIZE_TIMEOUT)
+        except (OSError, subprocess.SubprocessError) as e:
+            self.log("WARNING", f"{method}失败, 从当前状态开始测试: {str(e)}")
+            return False
+        if method == "sanitize":
+            return self._wait_sanitize(controller)
+        self.log("SUCCESS", "NVMe format完成")
+        return True
+
+    @staticmethod
+    def _sanitize_state(status: Any) -> Optional[int]:
+        """SSTAT低3位; nvme-cli 1.x输出为数字, 2.x为 {"status": "(1) ...", ...} 形式的对象"""
+        if isinstance(status, dict):
+            if "value" in status:
+                status = status["value"]
+            else:
+                match = re.search(r"\((\d+)\)", str(status.get("status", "")))
+                return int(match.group(1)) & 0x7 if match else None
+        try:
+            return (int(status, 0) if isinstance(status, str) else int(status)) & 0x7
+        except (TypeError, ValueError):
+            return None
+
+    def _wait_sanitize(self, controller: str) -> bool:
+        """轮询sanitize日志直到完成(SSTAT低3位: 1=成功, 2=进行中, 3=失败)"""
+        def find(data, key):
+            if isinstance(data, dict):
+                if key in data:
+                    return data[key]
+                for value in data.values():
+                    found = find(value, key)
+                    if found is not None:
+                        return found
+            return None
+
+        deadline = time.time() + SANITIZE_TIMEOUT
+        while time.time() < deadline:
+            time.sleep(SANITIZE_POLL_INTERVAL)
+            try:
+                result = subprocess.run(["nvme", "sanitize-log", f"/dev/{controller}", "-o", "json"],
+                                        capture_output=True, text=True, timeout=30)
+                log = json.loads(result.stdout)
+            except (OSError, subprocess.SubprocessError, ValueError):
+                continue
+            status = find(log, "sstat")
+            state = self._sanitize_state(status)
+            if state is None:
+                continue
+            if state == 2:
+                try:
+                    progress = f"{float(find(log, 'sprog') or 0) / 65536:.0%}"
+                except (TypeError, ValueError):
+                    progress = "未知"
+                self.log("INFO", f"sanitize进行中: {progress}")
+                continue
+            if state == 1:
+                self.log("SUCCESS", "NVMe sanitize完成")
+                return True
+            self.log("WARNING", f"sanitize未成功完成 (SSTAT={status})")
+            return False
+        self.log("WARNING", f"sanitize在{SANITIZE_TIMEOUT}秒内未完成")
+        return False
+
+    def _merge_latency_statistics(self, results: List[TestResult]):
+        """合并多次采样的延迟分布: 直方图逐桶累加后重新计算百分位"""
+        bins_by_direction = {}
+        for r in results:
+            for direction, bins in r.statistics.get("latency_bins", {}).items():
+                bins_by_direction.setdefault(direction, []).append(bins)
+
+        if bins_by_direction:
+            latency_bins = {d: self._merge_latency_bins(b) for d, b in bins_by_direction.items()}
+            latency = {d: self._percentiles_from_bins(b) for d, b in latency_bins.items()}
+            latency["all"] = self._percentiles_from_bins(self._merge_latency_bins(list(latency_bins.values())))
+            return latency, latency_bins, None
+
+        # 无直方图(旧版FIO)时百分位无法精确合并, 取各采样最大值作为保守估计
+        latency = {}
+        for r in results:
+            for direction, values in r.statistics.get("latency", {}).items():
+                merged = latency.setdefault(direction, {})
+                for key, value in values.items():
+                    merged[key] = max(merged.get(key, 0), value)
+        note = "缺少json+延迟直方图, 百分位取各采样最大值" if latency else None
+        return latency, {}, note
+
+    def _parse_duration(self, text: str) -> int:
+        """解析时长: 纯数字为秒, 或如 2h / 90m / 1h30m"""
+        text = text.strip().lower()
+        if text.isdigit():
+            return int(text)
+        parts = re.fullmatch(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?", text)
+        if not text or not parts:
+            raise ValueError(text)
+        hours, minutes, seconds = (int(part or 0) for part in parts.groups())
+        return hours * 3600 + minutes * 60 + seconds
+
+    def _size_to_bytes(self, size: str) -> int:
+        """将 4k / 128K / 1m 之类的块大小转换为字节"""
+        units = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+        size = size.strip().lower()
+        if size and size[-1] in units:
+            return int(float(size[:-1]) * units[size[-1]])
+        return int(size)
+
+    def _budget_history(self) -> List[Dict[str, Any]]:
+        """从结果库读取本设备(没有则不限设备)的历史结果, 用于估计开销和写入量"""
+        if not self.db_path or sqlite3 is None:
+            return []
+        store = ResultStore(self.db_path)
+        try:
+            serial = self.system_info.get("identity", {}).get("serial")
+            return (serial and store.recent_results(serial, PLANNER_HISTORY_LIMIT)) or \
+                store.recent_results(None, PLANNER_HISTORY_LIMIT)
+        except sqlite3.Error as e:
+            self.log("WARNING", f"读取结果库失败: {str(e)}")
+            return []
+
+    def _layout_budget(self, stages: List[Dict[str, Any]], unit: float, overhead: float) -> Dict[str, Any]:
+        """按优先级×unit分配各阶段的有效时长, 返回各阶段时长/采样数、ramp和总耗时"""
+        entries = []
+        for stage in stages:
+            active = stage.get("priority", 1) * unit
+            if stage["kind"] == "precondition":
+                entries.append({"duration": max(PLANNER_MIN_WARMUP, int(active)), "samples": 1})
+            elif self.sampling_mode == "slices":
+                # 时间窗口切分只运行一次FIO
+                entries.append({"duration": max(PLANNER_MIN_RUNTIME, int(active)),
+                                "samples": stage.get("samples") or DATA_VALIDATION_SAMPLES})
+            else:
+                default_samples = stage.get("samples") or DATA_VALIDATION_SAMPLES
+                samples = max(PLANNER_MIN_SAMPLES, min(default_samples, int(active // PLANNER_MIN_RUNTIME)))
+                entries.append({"duration": max(PLANNER_MIN_RUNTIME, int(active / samples)), "samples": samples})
+
+        measure = [entry for entry, stage in zip(entries, stages) if stage["kind"] == "measure"]
+        ramp = int(min(entry["duration"] for entry in measure) * PLANNER_RAMP_RATIO) if measure else 0
+        total = 0
+        for entry, stage in zip(entries, stages):
+            if stage["kind"] == "precondition":
+                entry["seconds"] = entry["duration"] + overhead
+            elif self.sampling_mode == "slices":
+                entry["seconds"] = entry["duration"] + ramp + overhead
+            else:
+                entry["seconds"] = entry["samples"] * (entry["duration"] + ramp + overhead)
+            total += entry["seconds"]
+        return {"entries": entries, "ramp": ramp, "total": total}
+
+    def _estimate_written_bytes(self, stages: List[Dict[str, Any]], entries: List[Dict[str, Any]], ramp: int,
+                                history: List[Dict[str, Any]]) -> Optional[float]:
+        """按历史性能估计计划的总写入量, 缺少任一写入阶段的历史数据时返回None"""
+        total = 0.0
+        for stage, entry in zip(stages, entries):
+            rw = stage["rw"]
+            if "write" not in rw and rw not in ("rw", "randrw", "readwrite"):
+                continue
+            write_ratio = 1 - stage.get("rwmixread", 50) / 100 if "write" not in rw else 1.0
+            test_type = "random" if rw.startswith("rand") else "sequential"
+            matches = [h for h in history if h["test_type"] == test_type and h["block_size"] == stage["block_size"]
+                       and (h["rw_pattern"] == stage["rw_pattern"] if stage["kind"] == "measure"
+                            else "write" in h["rw_pattern"])]
+            exact = [h for h in matches if h["queue_depth"] == stage["iodepth"] and h["numjobs"] == stage["numjobs"]]
+            if not (exact or matches):
+                return None
+            mean = (exact or matches)[0]["mean"]
+            rate = mean * 1000 * 1000 if test_type == "sequential" else mean * self._size_to_bytes(stage["block_size"])
+            if stage["kind"] == "precondition":
+                seconds = entry["duration"]
+            elif self.sampling_mode == "slices":
+                seconds = entry["duration"] + ramp
+            else:
+                seconds = entry["samples"] * (entry["duration"] + ramp)
+            total += rate * write_ratio * seconds
+        return total
+
+    def _apply_time_budget(self) -> bool:
+        """按--budget把总时长分配到各阶段(时长和采样数按优先级), 开始前输出预计结束时间和写入量"""
+        history = self._budget_history()
+        overheads = [h["statistics"]["execution_time_mean"] - h["statistics"]["planned_seconds"] for h in history
+                     if "planned_seconds" in h["statistics"] and "execution_time_mean" in h["statistics"]]
+        overheads = [value for value in overheads if value >= 0]
+        overhead = statistics.median(overheads) if overheads else PLANNER_DEFAULT_OVERHEAD
+        source = f"{len(overheads)}条历史结果的中位数" if overheads else "默认值"
+
+        stages = [dict(stage) for stage in self.test_plan["stages"]]
+        minimum = self._layout_budget(stages, 0, overhead)
+        if minimum["total"] > self.time_budget:
+            self.log("ERROR", f"时间预算{self.time_budget}秒不足, 该测试计划最少需要{minimum['total']:.0f}秒")
+            return False
+
+        # 二分查找使总耗时不超过预算的最大单位时长
+        low, high = 0.0, float(self.time_budget)
+        for _ in range(50):
+            middle = (low + high) / 2
+            if self._layout_budget(stages, middle, overhead)["total"] <= self.time_budget:
+                low = middle
+            else:
+                high = middle
+        layout = self._layout_budget(stages, low, overhead)
+
+        for stage, entry in zip(stages, layout["entries"]):
+            stage["duration"] = entry["duration"]
+            if stage["kind"] == "measure":
+                stage["samples"] = entry["samples"]
+        self.test_plan = dict(self.test_plan, stages=stages)
+        self.ramp_time = layout["ramp"]
+        measure_durations = [stage["duration"] for stage in stages if stage["kind"] == "measure"]
+        if measure_durations:
+            self.test_duration = max(measure_durations)
+            self._update_time_parameters()
+
+        end_time = datetime.fromtimestamp(time.time() + layout["total"])
+        written = self._estimate_written_bytes(stages, layout["entries"], layout["ramp"], history)
+        self.analysis["budget"] = {
+            "budget": self.time_budget,
+            "estimated_seconds": layout["total"],
+            "estimated_end": end_time.isoformat(timespec="seconds"),
+            "overhead": overhead,
+            "overhead_source": source,
+            "ramp_time": layout["ramp"],
+            "written_bytes": written,
+            "stages": [{"name": stage["name"], "kind": stage["kind"], "priority": stage.get("priority", 1),
+                        "duration": entry["duration"], "samples": entry["samples"], "seconds": entry["seconds"]}
+                       for stage, entry in zip(stages, layout["entries"])]
+        }
+
+        self.log("INFO", f"时间预算{self.time_budget}秒: 预计耗时{layout['total']:.0f}秒, "
+                         f"预计 {end_time.strftime('%Y-%m-%d %H:%M:%S')} 结束 "
+                         f"(每次FIO开销{overhead:.1f}秒, 来源: {source}; ramp_time={layout['ramp']}秒)")
+        for stage, entry in zip(stages, layout["entries"]):
+            if stage["kind"] == "precondition":
+                detail = f"{entry['duration']}秒"
+            else:
+                detail = f"{entry['duration']}秒 × {entry['samples']}次"
+            self.log("INFO", f"  {stage['name']}: {detail} (优先级{stage.get('priority', 1):g}, 约{entry['seconds']:.0f}秒)")
+        if written is not None:
+            self.log("INFO", f"预计写入 {written / 1e9:,.1f} GB (按结果库中的历史性能估计)")
+        else:
+            self.log("INFO", "结果库中缺少写入阶段的历史性能, 无法估计写入量")
+        return True
+
     def run_comprehensive_test(self) -> List[TestResult]:
-        """运行综合性能测试 - 优化数据写入策略"""
+        """运行综合性能测试 - 按测试计划执行(默认为六阶段标准流程)"""
+        return self.run_plan(self.test_plan)
+
+    def load_test_plan(self, plan_file: str) -> Dict[str, Any]:
+        """加载JSON/YAML格式的测试计划"""
+        with open(plan_file, "r") as f:
+            if plan_file.endswith((".yaml", ".yml")):
+                if yaml is None:
+                    raise ValueError("YAML测试计划需要安装PyYAML (pip3 install pyyaml)")
+                try:
+                    plan = yaml.safe_load(f)
+                except yaml.YAMLError as e:
+                    raise ValueError(f"YAML格式错误: {e}")
+            else:
+                plan = json.load(f)
+        return self._normalize_test_plan(plan)
+
+    def _normalize_test_plan(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """校验测试计划并补全默认字段"""
+        if not isinstance(plan, dict) or not isinstance(plan.get("stages"), list) or not plan["stages"]:
+            raise ValueError("测试计划必须包含非空的stages列表")
+
+        stages = []
+        names = set()
+        for index, raw_stage in enumerate(plan["stages"], 1):
+            if not isinstance(raw_stage, dict):
+                raise ValueError(f"第{index}个阶段格式错误")
+            unknown = set(raw_stage) - set(PLAN_STAGE_FIELDS)
+            if unknown:
+                raise ValueError(f"第{index}个阶段包含未知字段: {', '.join(sorted(unknown))}")
+
+            stage = dict(raw_stage)
+            stage.setdefault("kind", "measure")
+            if stage["kind"] not in PLAN_STAGE_KINDS:
+                raise ValueError(f"第{index}个阶段类型无效: {stage['kind']}")
+            if "rw" not in stage or "block_size" not in stage:
+                raise ValueError(f"第{index}个阶段缺少rw或block_size")
+            for field in ("name", "label", "test_type", "rw", "rw_pattern", "block_size", "distribution"):
+                if field in stage and not isinstance(stage[field], str):
+                    raise ValueError(f"第{index}个阶段的 {field} 必须为字符串")
+            if "fio_options" in stage and not isinstance(stage["fio_options"], dict):
+                raise ValueError(f"第{index}个阶段的 fio_options 必须为键值对")
+
+            rw = stage["rw"]
+            stage.setdefault("test_type", "random" if rw.startswith("rand") else "sequential")
+            stage.setdefault("rw_pattern", rw)
+            stage.setdefault("name", f"{stage['test_type']}_{stage['block_size']}_{stage['rw_pattern']}")
+            stage.setdefault("label", stage["name"])
+            stage.setdefault("iodepth", self.queue_depth)
+            stage.setdefault("numjobs", self.threads)
+            stage.setdefault("fio_options", {})
+            if stage["name"] in names:
+                raise ValueError(f"阶段名称重复: {stage['name']}")
+            names.add(stage["name"])
+
+            for field in ("iodepth", "numjobs", "duration", "samples"):
+                if field in stage and (not isinstance(stage[field], int) or stage[field] <= 0):
+                    raise ValueError(f"阶段 {stage['name']} 的 {field} 必须为正整数")
+            if "priority" in stage and (not isinstance(stage["priority"], (int, float)) or stage["priority"] <= 0):
+                raise ValueError(f"阶段 {stage['name']} 的 priority 必须为正数")
+            if "rwmixread" in stage and (isinstance(stage["rwmixread"], bool) or
+                                         not isinstance(stage["rwmixread"], (int, float)) or
+                                         not 0 <= stage["rwmixread"] <= 100):
+                raise ValueError(f"阶段 {stage['name']} 的 rwmixread 必须为0~100之间的数")
+            distribution = stage.get("distribution", "random")
+            if distribution.split(":")[0] not in ("random", "zipf", "pareto", "normal", "zoned"):
+                raise ValueError(f"阶段 {stage['name']} 的 distribution 无效: {distribution}")
+            stages.append(stage)
+
+        return {
+            "name": plan.get("name", "custom"),
+            "description": plan.get("description", ""),
+            "stages": stages
+        }
+
+    def _stage_fio_options(self, stage: Dict[str, Any]) -> Dict[str, Any]:
+        """由阶段定义生成额外FIO参数"""
+        options = {"rw": stage["rw"]}
+        if "rwmixread" in stage:
+            options["rwmixread"] = stage["rwmixread"]
+        if stage.get("distribution", "random") != "random":
+            options["random_distribution"] = stage["distribution"]
+        options.update(stage.get("fio_options", {}))
+        return options
+
+    def run_engines_test(self) -> List[TestResult]:
+        """I/O引擎对比: 同一阶段依次使用各引擎运行, 比较IOPS、延迟和CPU开销"""
+        stage = self._select_plan_stage(self.engine_stage, ENGINES_DEFAULT_STAGE)
+        options = self._stage_fio_options(stage)
+        self.log("INFO", f"开始执行I/O引擎对比: {stage['name']} ({stage['block_size']} {stage['rw']} "
+                         f"QD{stage['iodepth']}/Jobs{stage['numjobs']}), 引擎 {','.join(self.engines_list)}")
+
         results = []
+        engines = []
+        default_engine = self.ioengine
+        try:
+            for engine in self.engines_list:
+                self.ioengine = engine
+                self.log("INFO", f"引擎 {engine}: {IO_ENGINE_PRESETS[engine]}")
+                try:
+                    result = self.run_enhanced_test(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                    stage["iodepth"], stage["numjobs"], runtime=stage.get("duration"),
+                                                    samples=stage.get("samples"), fio_options=options,
+                                                    tag=f"_{engine}")
+                except Exception as e:
+                    self.log("ERROR", f"引擎 {engine} 测试失败: {str(e)}")
+                    result = self._make_failed_result(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                      str(e), stage["iodepth"], stage["numjobs"])
+                result.stage = f"{stage['name']}_{engine}"
+                results.append(result)
+                if result.evaluation.get("status") == "FAILED":
+                    continue
+
+                cpu = result.statistics.get("cpu", {})
+                summary = {
+                    "engine": engine,
+                    "options": IO_ENGINE_PRESETS[engine],
+                    "value": result.statistics.get("mean", 0),
+                    "cv": result.statistics.get("cv", 0),
+                    "latency": result.statistics.get("latency", {}).get("all", {}),
+                    "usr_cpu": cpu.get("usr", 0),
+                    "sys_cpu": cpu.get("sys", 0),
+                    "cores": cpu.get("cores", 0),
+                    "per_core": result.statistics.get("mean", 0) / cpu["cores"] if cpu.get("cores") else 0,
+                    "effective_iodepth": 1 if engine in SYNC_IO_ENGINES else stage["iodepth"]
+                }
+                engines.append(summary)
+                self.log("SUCCESS", f"{engine}: {summary['value']:,.2f} "
+                                    f"{'MB/s' if stage['test_type'] == 'sequential' else 'IOPS'}, "
+                                    f"P99 {summary['latency'].get('p99', 0):,.1f}us, CPU {summary['cores']:.2f} 核")
+        finally:
+            self.ioengine = default_engine
+
+        analysis = {
+            "stage": stage["name"],
+            "rw": stage["rw"],
+            "block_size": stage["block_size"],
+            "iodepth": stage["iodepth"],
+            "numjobs": stage["numjobs"],
+            "unit": "MB/s" if stage["test_type"] == "sequential" else "IOPS",
+            "engines": engines
+        }
+        if engines:
+            analysis["best_throughput"] = max(engines, key=lambda e: e["value"])["engine"]
+            analysis["best_efficiency"] = max(engines, key=lambda e: e["per_core"])["engine"]
+        self.analysis["engines"] = analysis
+        self._write_engines_report(analysis)
+        return results
+
+    def _write_engines_report(self, analysis: Dict[str, Any]):
+        """保存I/O引擎对比CSV"""
+        report_file = os.path.join(self.result_dir, "engines_compare.csv")
+        unit = analysis["unit"]
+        with open(report_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["引擎", "FIO参数", f"性能({unit})", "变异系数", "实际队列深度", "P50延迟(us)", "P99延迟(us)",
+                             "P99.9延迟(us)", "usr_cpu(%)", "sys_cpu(%)", "占用核数", f"每核{unit}"])
+            for e in analysis["engines"]:
+                writer.writerow([
+                    e["engine"], " ".join(f"{k}={v}" for k, v in e["options"].items()),
+                    f"{e['value']:.2f}", f"{e['cv']:.3f}", e["effective_iodepth"],
+                    f"{e['latency'].get('p50', 0):.1f}", f"{e['latency'].get('p99', 0):.1f}",
+                    f"{e['latency'].get('p99.9', 0):.1f}", f"{e['usr_cpu']:.1f}", f"{e['sys_cpu']:.1f}",
+                    f"{e['cores']:.2f}", f"{e['per_core']:.0f}"
+                ])
+
+    def run_numa_test(self) -> List[TestResult]:
+        """NUMA A/B对比: 同一阶段分别绑定到设备本地节点和远端节点运行, 计算跨节点损失"""
+        stage = self._select_plan_stage(self.numa_stage, NUMA_DEFAULT_STAGE)
+        options = self._stage_fio_options(stage)
+        nodes = self._get_numa_nodes()
+        device_node = self._get_device_numa()["numa_node"]
+        if len(nodes) < 2 or device_node < 0:
+            error = f"NUMA对比需要至少2个NUMA节点且能识别设备所在节点 (节点数: {len(nodes)}, 设备节点: {device_node})"
+            self.log("ERROR", error)
+            failed = self._make_failed_result(stage["test_type"], stage["block_size"], stage["rw_pattern"], error,
+                                              stage["iodepth"], stage["numjobs"])
+            failed.stage = stage["name"]
+            return [failed]
+
+        self.log("INFO", f"开始执行NUMA对比: {stage['name']} ({stage['block_size']} {stage['rw']} "
+                         f"QD{stage['iodepth']}/Jobs{stage['numjobs']}), 设备位于节点{device_node}")
+        results = []
+        sides = {}
+        default_mode = self.numa_mode
+        try:
+            for mode in ("local", "remote"):
+                self.numa_mode = mode
+                placement = self._numa_placement()
+                self.log("INFO", f"{mode}: 绑定节点{placement['node']} (CPU {placement['cpus']})")
+                try:
+                    result = self.run_enhanced_test(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                    stage["iodepth"], stage["numjobs"], runtime=stage.get("duration"),
+                                                    samples=stage.get("samples"), fio_options=options,
+                                                    tag=f"_numa_{mode}")
+                except Exception as e:
+                    self.log("ERROR", f"{mode} 测试失败: {str(e)}")
+                    result = self._make_failed_result(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                      str(e), stage["iodepth"], stage["numjobs"])
+                result.stage = f"{stage['name']}_{mode}"
+                results.append(result)
+                if result.evaluation.get("status") != "FAILED":
+                    sides[mode] = {
+                        "node": placement["node"],
+                        "cpus": placement["cpus"],
+                        "fio_options": placement["fio_options"],
+                        "value": result.statistics.get("mean", 0),
+                        "lat_mean": result.statistics.get("lat_mean", 0),
+                        "latency": result.statistics.get("latency", {}).get("all", {}),
+                        "cpu_cores": result.statistics.get("cpu", {}).get("cores", 0)
+                    }
+        finally:
+            self.numa_mode = default_mode
+
+        analysis = {
+            "stage": stage["name"],
+            "rw": stage["rw"],
+            "block_size": stage["block_size"],
+            "unit": "MB/s" if stage["test_type"] == "sequential" else "IOPS",
+            "device_node": device_node,
+            "local": sides.get("local"),
+            "remote": sides.get("remote")
+        }
+        if len(sides) == 2 and sides["local"]["value"] > 0:
+            local, remote = sides["local"], sides["remote"]
+            analysis["throughput_penalty"] = (local["value"] - remote["value"]) / local["value"]
+            analysis["p99_penalty_us"] = remote["latency"].get("p99", 0) - local["latency"].get("p99", 0)
+            self.log("SUCCESS", f"远端节点性能损失 {analysis['throughput_penalty']:.1%}, "
+                                f"P99延迟增加 {analysis['p99_penalty_us']:,.1f}us")
+        self.analysis["numa"] = analysis
+        return results
+
+    def _select_plan_stage(self, name: Optional[str], default_stage: Dict[str, Any]) -> Dict[str, Any]:
+        """按名称选取测试计划中的测量阶段, 未指定时使用模式自带的默认阶段"""
+        if name is None:
+            return self._normalize_test_plan({"stages": [default_stage]})["stages"][0]
+        for stage in self.test_plan["stages"]:
+            if stage["name"] == name and stage["kind"] == "measure":
+                return stage
+        raise ValueError(f"测试计划中没有测量阶段 {name}")
+
+    def _engine_options(self) -> Dict[str, Any]:
+        """当前I/O引擎对应的FIO参数"""
+        return dict(IO_ENGINE_PRESETS[self.ioengine])
+
+    def run_plan(self, plan: Dict[str, Any]) -> List[TestResult]:
+        """通用测试计划执行器: 依次执行预处理和测量阶段"""
+        if self.purge_method != "none" and self.checkpoint:
+            self.log("INFO", "断点续测, 不再重复清除设备")
+        elif self.purge_method != "none":
+            start_time = time.time()
+            purged = self._purge_device(self.purge_method)
+            self.warmup_records.append({"name": "purge", "mode": "purge", "method": self.purge_method,
+                                        "purged": purged, "elapsed": time.time() - start_time})
+        if self.jobfile_mode:
+            return self.run_plan_jobfile(plan)
+        return self._run_plan_stages(plan)
+
+    def _config_hash(self, test_type: str, block_size: str, rw_pattern: str, queue_depth: int, numjobs: int,
+                     fio_options: Dict[str, Any] = None, runtime: int = None, samples: int = None) -> str:
+        """测试的有效FIO参数(含引擎/NUMA/时长/采样方式)的哈希"""
+        base_options = dict(self._engine_options(), **self._numa_options())
+        params = {
+            "mode": self.mode,
+            "test_type": test_type,
+            "block_size": block_size,
+            "rw_pattern": rw_pattern,
+            "iodepth": queue_depth,
+            "numjobs": numjobs,
+            "fio_options": dict(base_options, **(fio_options or {})),
+            "runtime": runtime if runtime is not None else self.test_duration,
+            "ramp_time": self.ramp_time,
+            "size": self.custom_test_size or "100%",
+            "sampling": self.sampling_mode,
+            "samples": samples or DATA_VALIDATION_SAMPLES,
+            "adaptive": [self.ci_width_target, self.max_samples, self.sample_budget]
+                        if self.adaptive_sampling and not samples else None,
+            "jobfile": self.jobfile_mode
+        }
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def _load_fresh_result(self, config_hash: str) -> Optional[TestResult]:
+        """从结果库取同一设备相同配置在--skip_fresh小时内的结果"""
+        serial = self.system_info.get("identity", {}).get("serial")
+        if not self.db_path or not self.skip_fresh or sqlite3 is None or not serial:
+            return None
+        try:
+            record = ResultStore(self.db_path).find_fresh(serial, config_hash, self.skip_fresh)
+        except sqlite3.Error as e:
+            self.log("WARNING", f"查询结果库失败: {str(e)}")
+            return None
+        if record is None:
+            return None
+
+        result = TestResult.from_dict(dict(record, statistics=json.loads(record["statistics"]),
+                                           evaluation=json.loads(record["evaluation"]), retry_count=0,
+                                           config_hash=config_hash))
+        result.statistics["reused_from"] = {"result_id": record["id"], "created": record["created"]}
+        result.evaluation.setdefault("notes", []).append(f"复用结果库中{record['created']}的相同配置结果")
+        return result
+
+    def _run_plan_stages(self, plan: Dict[str, Any]) -> List[TestResult]:
+        """逐阶段执行测试计划(每次采样和预热单独启动FIO)"""
+        results = []
+        stages = plan["stages"]
+        measure_stages = [stage for stage in stages if stage["kind"] == "measure"]
+        self.log("INFO", f"开始执行测试计划 {plan['name']}: {len(stages)} 个阶段, {len(measure_stages)} 个测试用例...")
+
+        # 同类测试出现多次时以阶段名区分输出文件
+        keys = [(st["test_type"], st["block_size"], st["rw_pattern"]) for st in measure_stages]
+
+        # 已完成的阶段: 阶段名 -> 测量阶段的配置哈希(预处理阶段为None)
+        completed = dict(self.checkpoint["completed"]) if self.checkpoint else {}
+        restored = {}
+        if self.checkpoint:
+            restored = {r.stage: r for r in (TestResult.from_dict(data) for data in self.checkpoint["results"])}
+        resume_pending = bool(completed)
+
+        for index, stage in enumerate(stages, 1):
+            options = self._stage_fio_options(stage)
+            config_hash = None
+            if stage["kind"] == "measure":
+                config_hash = self._config_hash(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                stage["iodepth"], stage["numjobs"], options, stage.get("duration"),
+                                                stage.get("samples"))
+
+            if stage["name"] in completed:
+                if stage["kind"] == "precondition":
+                    self.log("INFO", f"{stage['name']} 已在中断前完成, 跳过")
+                    continue
+                if completed[stage["name"]] == config_hash and stage["name"] in restored:
+                    self.log("INFO", f"{stage['name']} 已在中断前完成, 沿用断点中的结果")
+                    results.append(restored[stage["name"]])
+                    continue
+                self.log("WARNING", f"{stage['name']} 的参数与中断前不一致, 重新执行")
+                del completed[stage["name"]]
+
+            if resume_pending:
+                # 中断期间设备状态可能已变化(空闲GC/TRIM等), 续测前按需重新执行一次短预处理
+                resume_pending = False
+                if stage["kind"] == "measure" and self.resume_precondition:
+                    self._run_resume_precondition(stages[:index - 1])
+
+            health_before = self._capture_health_snapshot(f"{stage['name']}_before")
+
+            if stage["kind"] == "precondition":
+                warmup_time = stage.get("duration", self.ramp_time)
+                try:
+                    if self.fill_passes:
+                        self.log("INFO", f"{stage['label']} 全盘填充{self.fill_passes}遍 "
+                                         f"[QD{stage['iodepth']}/Job{self.fill_jobs}]")
+                        record = self._run_fill(stage["name"], options.pop("rw"), stage["block_size"],
+                                                stage["iodepth"], options)
+                    else:
+                        self.log("INFO", f"{stage['label']} {warmup_time}秒 [QD{stage['iodepth']}/Job{stage['numjobs']}]")
+                        record = self._run_warmup(stage["name"], options.pop("rw"), stage["block_size"],
+                                                  stage["iodepth"], stage["numjobs"], warmup_time, options)
+                    self.log("SUCCESS", f"{stage['name']} 预热完成")
+                    health = self._stage_health(stage["name"], health_before)
+                    if health:
+                        record["health"] = health
+                    completed[stage["name"]] = None
+                    self._save_checkpoint(results, completed)
+                except Exception as e:
+                    self.log("WARNING", f"{stage['name']} 预热失败,继续测试: {str(e)}")
+                continue
+
+            test_type = stage["test_type"]
+            block_size = stage["block_size"]
+            rw_pattern = stage["rw_pattern"]
+            key = (test_type, block_size, rw_pattern)
+            tag = "" if keys.count(key) == 1 else f"_{stage['name']}"
+
+            self.log("INFO", f"执行阶段 {index}/{len(stages)}: {test_type} {block_size} {rw_pattern} [{stage['label']}]")
+            self.log("INFO", f"参数配置: 队列深度={stage['iodepth']}, 任务数={stage['numjobs']}")
+
+            cached = self._load_fresh_result(config_hash)
+            if cached is not None:
+                self.log("INFO", f"{stage['name']} 已有{self.skip_fresh:g}小时内的相同配置结果 "
+                                 f"({cached.statistics['reused_from']['created']}), 跳过")
+                results.append(cached)
+                completed[stage["name"]] = config_hash
+                self._save_checkpoint(results, completed)
+                continue
+
+            try:
+                result = self.run_enhanced_test(test_type, block_size, rw_pattern, stage["iodepth"], stage["numjobs"],
+                                                runtime=stage.get("duration"), samples=stage.get("samples"),
+                                                fio_options=options, tag=tag)
+                result.stage = stage["name"]
+                result.config_hash = config_hash
+                health = self._stage_health(stage["name"], health_before)
+                if health:
+                    result.statistics["health"] = health
+                results.append(result)
+
+                # 显示性能结果
+                mean_value = result.statistics.get("mean", 0)
+                # 使用明确的类型判断，避免字符串包含关系产生歧义
+                if result.test_type == "sequential":
+                    performance_str = f"{mean_value:.2f} MB/s"
+                else:
+                    performance_str = f"{mean_value:.0f} IOPS"
+
+                cv = result.statistics.get("cv", 0)  # 变异系数：衡量数据稳定性
+                self.log("SUCCESS", f"测试完成 - 性能: {performance_str}, CV: {cv:.3f}")
+                completed[stage["name"]] = config_hash
+                self._save_checkpoint(results, completed)
+
+            except Exception as e:
+                self.log("ERROR", f"测试执行失败: {str(e)}")
+                failed_result = self._make_failed_result(test_type, block_size, rw_pattern, str(e),
+                                                         stage["iodepth"], stage["numjobs"])
+                failed_result.stage = stage["name"]
+                results.append(failed_result)
         
-        # 定义测试配置 - 按照1)顺序写 2)顺序读 3)随机写 4)随机读的顺序
-        test_configs = [
-            {"test_type": "sequential", "block_size": "128k", "rw_pattern": "write", "queue_depth": 128, "numjobs": 1, "stage": "第二阶段：128K顺序写入/QD128/Job1"},
-            {"test_type": "sequential", "block_size": "128k", "rw_pattern": "read", "queue_depth": 128, "numjobs": 1, "stage": "第三阶段：128K顺序读取/QD128/Job1"},
-            {"test_type": "random", "block_size": "4k", "rw_pattern": "write", "queue_depth": 32, "numjobs": 8, "stage": "第五阶段：4K随机写入/QD32/Job8"},
-            {"test_type": "random", "block_size": "4k", "rw_pattern": "read", "queue_depth": 32, "numjobs": 8, "stage": "第六阶段：4K随机读取/QD32/Job8"}
+        return results
+    
+    def _save_checkpoint(self, results: List[TestResult], completed: Dict[str, Optional[str]]):
+        """将测试计划进度和已完成阶段的结果写入结果目录, 供--resume续测"""
+        checkpoint = {
+            "version": SCRIPT_VERSION,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "device": self.device,
+            "identity": self.system_info.get("identity", {}),
+            "plan": self.test_plan,
+            "test_duration": self.test_duration,
+            "ramp_time": self.ramp_time,
+            "completed": completed,
+            "results": [result.to_dict() for result in results if result.stage in completed],
+            "warmups": self.warmup_records,
+            "analysis": self.analysis
+        }
+        # 先写临时文件再替换, 写入过程中被中断也不会损坏已有断点
+        checkpoint_file = os.path.join(self.result_dir, CHECKPOINT_FILE)
+        try:
+            with open(checkpoint_file + ".tmp", "w") as f:
+                json.dump(checkpoint, f, indent=2, ensure_ascii=False, default=str)
+            os.replace(checkpoint_file + ".tmp", checkpoint_file)
+        except OSError as e:
+            self.log("WARNING", f"保存断点失败: {str(e)}")
+
+    def _load_checkpoint(self, result_dir: str) -> Optional[Dict[str, Any]]:
+        """读取结果目录中的断点文件"""
+        checkpoint_file = os.path.join(result_dir, CHECKPOINT_FILE)
+        try:
+            with open(checkpoint_file, "r") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            self.log("ERROR", f"无法读取断点文件 {checkpoint_file}: {str(e)}")
+            return None
+        if not all(key in checkpoint for key in ("device", "plan", "completed", "results")):
+            self.log("ERROR", f"断点文件 {checkpoint_file} 格式错误")
+            return None
+        return checkpoint
+
+    def _restore_checkpoint(self, system_info: Dict[str, Any]) -> bool:
+        """续测时校验设备身份, 并恢复中断前的测试计划、时间参数和预热记录"""
+        saved_serial = self.checkpoint.get("identity", {}).get("serial")
+        serial = system_info.get("identity", {}).get("serial")
+        if saved_serial and serial and saved_serial != serial:
+            self.log("ERROR", f"设备序列号 {serial} 与断点中的 {saved_serial} 不一致, 无法续测")
+            return False
+
+        # 测试计划和时长以断点为准(含--budget规划的结果), 保证各阶段与中断前一致
+        self.test_plan = self.checkpoint["plan"]
+        self.test_duration = self.checkpoint.get("test_duration", self.test_duration)
+        self.ramp_time = self.checkpoint.get("ramp_time", self.ramp_time)
+        self._update_time_parameters()
+        self.warmup_records = list(self.checkpoint.get("warmups", []))
+        self.analysis = dict(self.checkpoint.get("analysis", {}))
+
+        names = [stage["name"] for stage in self.test_plan["stages"]]
+        done = [name for name in names if name in self.checkpoint["completed"]]
+        self.log("INFO", f"从断点 ({self.checkpoint.get('updated', 'Unknown')}) 续测: "
+                         f"已完成 {len(done)}/{len(names)} 个阶段")
+        return True
+
+    def _run_resume_precondition(self, previous_stages: List[Dict[str, Any]]):
+        """续测前以最近的预处理阶段重新执行--resume_precondition秒, 使设备回到测量前的状态"""
+        preconditions = [stage for stage in previous_stages if stage["kind"] == "precondition"]
+        if not preconditions:
+            self.log("INFO", "续测阶段之前没有预处理阶段, 不执行短预处理")
+            return
+        stage = preconditions[-1]
+        options = self._stage_fio_options(stage)
+        self.log("INFO", f"续测前短预处理: {stage['name']} {self.resume_precondition}秒 "
+                         f"[QD{stage['iodepth']}/Job{stage['numjobs']}]")
+        try:
+            record = self._run_warmup(f"{stage['name']}_resume", options.pop("rw"), stage["block_size"],
+                                      stage["iodepth"], stage["numjobs"], self.resume_precondition, options)
+            record["resume"] = True
+            self.log("SUCCESS", "续测前短预处理完成")
+        except Exception as e:
+            self.log("WARNING", f"续测前短预处理失败,继续测试: {str(e)}")
+
+    def _compile_plan_jobfile(self, plan: Dict[str, Any]):
+        """将测试计划编译为单个FIO jobfile, 各阶段/采样以stonewall+new_group顺序执行
+
+        返回 (jobfile内容, 作业列表), 作业列表记录每个section对应的阶段和采样序号。
+        """
+        lines = [
+            "[global]",
+            f"filename=/dev/{self.device}",
+            "direct=1",
+            "time_based=1",
+            f"size={self.custom_test_size or '100%'}",
+            "refill_buffers",
+            "norandommap=1",
+            "randrepeat=0",
+            "group_reporting",
+            f"percentile_list={':'.join(f'{p:g}' for p in LATENCY_PERCENTILES)}"
+        ]
+        lines += [f"{key}={value}" for key, value in self._engine_options().items()]
+        lines += [f"{key}={value}" for key, value in self._numa_options().items()]
+
+        jobs = []
+        for stage in plan["stages"]:
+            options = self._stage_fio_options(stage)
+            numjobs = stage["numjobs"]
+            if stage["kind"] == "precondition" and self.fill_passes:
+                # 全盘填充按写入量结束, runtime=0表示不限时
+                runtime = 0
+                sections = [(stage["name"], None)]
+                options.update(self._fill_fio_options(stage["rw"]))
+                numjobs = options.pop("numjobs")
+            elif stage["kind"] == "precondition":
+                runtime = stage.get("duration", self.ramp_time)
+                sections = [(stage["name"], None)]
+                if self.steady_state_mode:
+                    # jobfile内无法实时干预, 使用FIO自带的稳态检测提前结束预热
+                    metric = "iops" if stage["rw"].startswith("rand") else "bw"
+                    options["steadystate"] = f"{metric}:{STEADY_STATE_EXCURSION * 100:g}%"
+                    options["steadystate_duration"] = self.steady_state_round_time * STEADY_STATE_WINDOW
+            else:
+                runtime = stage.get("duration", self.test_duration)
+                sample_count = stage.get("samples") or DATA_VALIDATION_SAMPLES
+                sections = [(f"{stage['name']}_s{i}", i) for i in range(sample_count)]
+
+            for section, sample_id in sections:
+                lines += [
+                    "",
+                    f"[{section}]",
+                    "stonewall",
+                    "new_group",
+                    f"bs={stage['block_size']}",
+                    f"iodepth={stage['iodepth']}",
+                    f"numjobs={numjobs}",
+                    f"runtime={runtime}"
+                ]
+                if sample_id is not None:
+                    lines.append(f"ramp_time={self.ramp_time}")
+                lines += [f"{key}={value}" for key, value in options.items()]
+                jobs.append({"section": section, "stage": stage, "sample": sample_id, "runtime": runtime})
+
+        # 仅在全部阶段结束后落盘一次
+        lines.append("end_fsync=1")
+        return "\n".join(lines) + "\n", jobs
+
+    def run_plan_jobfile(self, plan: Dict[str, Any]) -> List[TestResult]:
+        """以单个FIO jobfile执行整个测试计划, 再将多作业JSON输出拆分为各阶段结果"""
+        jobfile_text, jobs = self._compile_plan_jobfile(plan)
+        jobfile = os.path.join(self.result_dir, f"plan_{plan['name']}.fio")
+        output_json = os.path.join(self.result_dir, f"plan_{plan['name']}.json")
+        with open(jobfile, "w") as f:
+            f.write(jobfile_text)
+
+        fio_cmd = ["fio", jobfile, "--output-format=json+", f"--output={output_json}"]
+        self.log("INFO", f"开始执行测试计划 {plan['name']} (单jobfile, {len(jobs)} 个作业): {jobfile}")
+        self.log("INFO", f"FIO命令: {' '.join(fio_cmd)}")
+
+        health_before = self._capture_health_snapshot(f"plan_{plan['name']}_before")
+        sampler = HostTelemetrySampler([self.device]) if self.telemetry_mode else None
+        if sampler:
+            sampler.start()
+        start_time = time.time()
+        try:
+            result = self._run_fio(fio_cmd)
+        finally:
+            if sampler:
+                # 单jobfile内无法按阶段区分, 只记录整个计划的遥测
+                self.analysis["plan_telemetry"] = sampler.stop()
+        execution_time = time.time() - start_time
+        plan_health = self._stage_health(f"plan_{plan['name']}", health_before)
+        if plan_health:
+            self.analysis["plan_health"] = plan_health
+
+        if result["stall"]:
+            # 设备卡死时逐阶段重跑只会再次卡死, 各测量阶段直接记为失败
+            failed_results = []
+            for stage in plan["stages"]:
+                if stage["kind"] == "measure":
+                    failed = self._make_failed_result(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                      "jobfile执行卡死", stage["iodepth"], stage["numjobs"])
+                    failed.stage = stage["name"]
+                    failed_results.append(failed)
+            return failed_results
+
+        json_data = self._load_and_validate_json(output_json)
+        if result["returncode"] == 0 and json_data:
+            self.log("SUCCESS", f"jobfile执行完成, 耗时 {execution_time:.0f}秒")
+            return self._split_jobfile_results(json_data, jobs, plan)
+
+        stderr_preview = result["stderr"].strip()
+        if stderr_preview:
+            self.log("ERROR", f"FIO stderr: {stderr_preview[:800]}")
+        completed = self._jobfile_completed_stages(json_data, jobs) if json_data else set()
+        if not completed:
+            self.log("WARNING", f"jobfile执行失败 (返回码: {result['returncode']}), 回退到逐阶段执行")
+            return self._run_plan_stages(plan)
+
+        # 保留部分输出中已完整跑完的阶段, 只逐阶段补跑缺失或出错的阶段
+        kept_stages = [stage for stage in plan["stages"] if stage["name"] in completed]
+        missing_stages = [stage for stage in plan["stages"] if stage["name"] not in completed]
+        self.log("WARNING", f"jobfile执行失败 (返回码: {result['returncode']}), 保留已完成的 {len(kept_stages)} 个阶段, "
+                            f"逐阶段补跑其余 {len(missing_stages)} 个阶段")
+        results = self._split_jobfile_results(json_data, [entry for entry in jobs if entry["stage"]["name"] in completed],
+                                              dict(plan, stages=kept_stages))
+        if missing_stages:
+            results += self._run_plan_stages(dict(plan, stages=missing_stages))
+
+        by_stage = {r.stage: r for r in results}
+        return [by_stage[stage["name"]] for stage in plan["stages"] if stage["name"] in by_stage]
+
+    def _jobfile_completed_stages(self, json_data: Dict[str, Any], jobs: List[Dict[str, Any]]) -> Set[str]:
+        """从(可能不完整的)多作业JSON输出中找出所有作业都无错误且有实际IO的阶段"""
+        fio_jobs = {job.get("jobname"): job for job in json_data.get("jobs", [])}
+        stage_ok = {}
+        for entry in jobs:
+            job = fio_jobs.get(entry["section"])
+            ok = bool(job) and not job.get("error") and \
+                job.get("read", {}).get("io_bytes", 0) + job.get("write", {}).get("io_bytes", 0) > 0
+            name = entry["stage"]["name"]
+            stage_ok[name] = stage_ok.get(name, True) and ok
+        return {name for name, ok in stage_ok.items() if ok}
+
+    def _split_jobfile_results(self, json_data: Dict[str, Any], jobs: List[Dict[str, Any]],
+                               plan: Dict[str, Any]) -> List[TestResult]:
+        """按作业名拆分多作业JSON输出, 每个测量阶段合并各采样为一个测试结果"""
+        fio_jobs = {job.get("jobname"): job for job in json_data.get("jobs", [])}
+        samples_by_stage = {}
+
+        for entry in jobs:
+            stage = entry["stage"]
+            job = fio_jobs.get(entry["section"])
+            elapsed = job.get("elapsed", entry["runtime"]) if job else 0
+
+            if stage["kind"] == "precondition":
+                record = {
+                    "name": stage["name"],
+                    "rw": stage["rw"],
+                    "block_size": stage["block_size"],
+                    "mode": "steady_state" if self.steady_state_mode else "fixed",
+                    "max_time": entry["runtime"],
+                    "elapsed": elapsed
+                }
+                if self.fill_passes:
+                    record.update({"mode": "fill", "passes": self.fill_passes, "jobs": self.fill_jobs,
+                                   "written_bytes": job.get("write", {}).get("io_bytes", 0) if job else 0})
+                elif self.steady_state_mode and job:
+                    attained = bool(job.get("steadystate", {}).get("attained"))
+                    record.update({"steady": attained, "steady_time": elapsed if attained else None})
+                self.warmup_records.append(record)
+                continue
+
+            samples = samples_by_stage.setdefault(stage["name"], [])
+            if not job or job.get("error"):
+                error = f"作业 {entry['section']} 无结果" if not job else f"作业 {entry['section']} 错误码 {job['error']}"
+                samples.append(self._make_failed_result(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                        error, stage["iodepth"], stage["numjobs"]))
+                continue
+
+            metrics = self._extract_performance_metrics({
+                "json_data": {"jobs": [job]},
+                "job_name": entry["section"],
+                "execution_time": elapsed
+            })
+            samples.append(self._build_test_result(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                   metrics, elapsed, [], stage["iodepth"], stage["numjobs"]))
+
+        results = []
+        for stage in plan["stages"]:
+            if stage["kind"] != "measure":
+                continue
+            merged = self._merge_test_results(samples_by_stage.get(stage["name"], []), stage["test_type"],
+                                              stage["block_size"], stage["rw_pattern"])
+            merged.stage = stage["name"]
+            results.append(merged)
+
+            if merged.evaluation.get("status") == "FAILED":
+                self.log("ERROR", f"{stage['name']} 测试失败: {merged.evaluation.get('error')}")
+            else:
+                unit = "MB/s" if merged.test_type == "sequential" else "IOPS"
+                self.log("SUCCESS", f"{stage['name']} - 性能: {merged.statistics.get('mean', 0):.2f} {unit}, "
+                                    f"CV: {merged.statistics.get('cv', 0):.3f}")
+        return results
+
+    def _make_failed_result(self, test_type: str, block_size: str, rw_pattern: str, error: str,
+                            queue_depth: int = None, numjobs: int = None) -> TestResult:
+        """创建失败结果"""
+        return TestResult(
+            test_type=test_type,
+            block_size=block_size,
+            rw_pattern=rw_pattern,
+            data_points=[],
+            statistics={},
+            evaluation={"status": "FAILED", "error": error},
+            execution_time=0,
+            retry_count=TEST_RETRY_COUNT,
+            queue_depth=queue_depth,
+            numjobs=numjobs
+        )
+
+    def run_sweep_test(self) -> List[TestResult]:
+        """队列深度×任务数扫描, 输出吞吐-延迟曲线和饱和拐点"""
+        test_type = "random" if self.sweep_rw.startswith("rand") else "sequential"
+        adaptive = self.sweep_search == "adaptive"
+        self.log("INFO", f"开始执行队列深度扫描: {self.sweep_block_size} {self.sweep_rw} "
+                         f"({'自适应搜索' if adaptive else '全网格'}, 每个扫描点{self.test_duration}秒)")
+
+        results = []
+        global_peak = 0
+        for numjobs in self.sweep_numjobs:
+            job_peak = 0
+            for queue_depth in self.sweep_queue_depths:
+                result = self._run_sweep_point(test_type, queue_depth, numjobs)
+                results.append(result)
+                if result.evaluation.get("status") == "FAILED":
+                    if adaptive:
+                        break
+                    continue
+
+                value = result.statistics.get("mean", 0)
+                saturated = value < job_peak * (1 + SWEEP_GAIN_THRESHOLD)
+                job_peak = max(job_peak, value)
+                if adaptive and saturated:
+                    # 加深队列已无明显收益, 该任务数下已饱和
+                    break
+
+            if adaptive and global_peak > 0 and job_peak < global_peak * (1 + SWEEP_GAIN_THRESHOLD):
+                self.log("INFO", f"Jobs{numjobs} 未带来明显提升, 停止增加任务数")
+                break
+            global_peak = max(global_peak, job_peak)
+
+        analysis = self._analyze_sweep(results)
+        self.analysis["sweep"] = analysis
+        self._write_sweep_curve(analysis)
+
+        knee = analysis.get("knee")
+        if knee:
+            self.log("SUCCESS", f"饱和拐点: QD{knee['iodepth']}/Jobs{knee['numjobs']} "
+                                f"(峰值的{knee['value'] / analysis['peak']:.1%}, P99 {knee['lat_p99']:.1f}us)")
+        return results
+
+    def _run_sweep_point(self, test_type: str, queue_depth: int, numjobs: int) -> TestResult:
+        """执行单个扫描点"""
+        self.log("INFO", f"扫描点: QD{queue_depth}/Jobs{numjobs}")
+        try:
+            result = self.retry_operation(
+                lambda: self._execute_single_test(test_type, self.sweep_block_size, self.sweep_rw,
+                                                  queue_depth, numjobs, tag=f"_qd{queue_depth}_j{numjobs}"),
+                f"FIO测试-扫描QD{queue_depth}/Jobs{numjobs}"
+            )
+        except Exception as e:
+            self.log("ERROR", f"扫描点失败: {str(e)}")
+            return self._make_failed_result(test_type, self.sweep_block_size, self.sweep_rw, str(e),
+                                            queue_depth, numjobs)
+
+        latency = result.statistics.get("latency", {}).get("all", {})
+        self.log("SUCCESS", f"QD{queue_depth}/Jobs{numjobs}: {result.statistics.get('iops', 0):,.0f} IOPS, "
+                            f"{result.statistics.get('bw', 0):.2f} MB/s, P99 {latency.get('p99', 0):.1f}us")
+        return result
+
+    def _analyze_sweep(self, results: List[TestResult]) -> Dict[str, Any]:
+        """整理扫描曲线并寻找拐点(达到峰值SWEEP_KNEE_RATIO的最低并发)"""
+        points = []
+        for r in results:
+            if r.evaluation.get("status") == "FAILED":
+                continue
+            points.append({
+                "numjobs": r.numjobs,
+                "iodepth": r.queue_depth,
+                "concurrency": r.queue_depth * r.numjobs,
+                "value": r.statistics.get("mean", 0),
+                "iops": r.statistics.get("iops", 0),
+                "bw": r.statistics.get("bw", 0),
+                "lat_mean": r.statistics.get("lat_mean", 0),
+                "lat_p99": r.statistics.get("latency", {}).get("all", {}).get("p99", 0)
+            })
+        points.sort(key=lambda p: (p["concurrency"], p["numjobs"]))
+
+        analysis = {
+            "rw": self.sweep_rw,
+            "block_size": self.sweep_block_size,
+            "unit": "IOPS" if self.sweep_rw.startswith("rand") else "MB/s",
+            "points": points,
+            "peak": 0,
+            "knee": None
+        }
+        if not points:
+            return analysis
+
+        peak = max(p["value"] for p in points)
+        candidates = [p for p in points if p["value"] >= peak * SWEEP_KNEE_RATIO]
+        analysis["peak"] = peak
+        analysis["peak_point"] = max(points, key=lambda p: p["value"])
+        analysis["knee"] = min(candidates, key=lambda p: (p["concurrency"], p["lat_mean"]))
+        return analysis
+
+    def _write_sweep_curve(self, analysis: Dict[str, Any]):
+        """保存吞吐-延迟曲线CSV"""
+        curve_file = os.path.join(self.result_dir, "sweep_curve.csv")
+        knee = analysis.get("knee")
+        with open(curve_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["任务数", "队列深度", "总并发", "IOPS", "带宽(MB/s)", "平均延迟(us)", "P99延迟(us)", "拐点"])
+            for p in analysis["points"]:
+                writer.writerow([
+                    p["numjobs"], p["iodepth"], p["concurrency"],
+                    f"{p['iops']:.0f}", f"{p['bw']:.2f}", f"{p['lat_mean']:.1f}", f"{p['lat_p99']:.1f}",
+                    "*" if p is knee else ""
+                ])
+
+    def _result_percentile(self, result: TestResult, percentile: float) -> float:
+        """获取结果的完成延迟百分位(us), 优先由直方图计算"""
+        latency_bins = result.statistics.get("latency_bins", {})
+        if latency_bins:
+            merged = self._merge_latency_bins(list(latency_bins.values()))
+            return self._percentiles_from_bins(merged, [percentile]).get(f"p{percentile:g}", 0)
+        return result.statistics.get("latency", {}).get("all", {}).get(f"p{percentile:g}", 0)
+
+    def _parse_rand_pattern(self, pattern: str) -> Dict[str, Any]:
+        """解析4K随机负载名称: randread / randwrite / randrw<读比例>"""
+        if pattern in ("randread", "randwrite"):
+            return {"rw": pattern}
+        if pattern.startswith("randrw") and pattern[6:].isdigit() and 0 < int(pattern[6:]) < 100:
+            return {"rw": "randrw", "rwmixread": int(pattern[6:])}
+        raise ValueError(pattern)
+
+    def _rate_options(self, options: Dict[str, Any], total_iops: float, numjobs: int) -> Dict[str, Any]:
+        """将总IOPS目标换算为每个job的rate_iops(混合负载按读写比例拆分)"""
+        per_job = total_iops / numjobs
+        rate_options = dict(options)
+        if "rwmixread" in options:
+            read_ratio = options["rwmixread"] / 100
+            rate_options["rate_iops"] = f"{max(1, round(per_job * read_ratio))},{max(1, round(per_job * (1 - read_ratio)))}"
+        else:
+            rate_options["rate_iops"] = max(1, round(per_job))
+        return rate_options
+
+    def run_slo_test(self) -> List[TestResult]:
+        """延迟SLO搜索: 二分限速IOPS, 寻找百分位延迟不超过目标的最大持续IOPS"""
+        self.log("INFO", f"开始执行延迟SLO搜索: P{self.slo_percentile:g} ≤ {self.slo_target_us:g}us "
+                         f"(QD{self.queue_depth}/Jobs{self.threads}, 每次探测{self.test_duration}秒)")
+        results = []
+        summaries = []
+        for pattern in self.slo_patterns:
+            pattern_results, summary = self._search_slo_pattern(pattern)
+            results.extend(pattern_results)
+            summaries.append(summary)
+
+        self.analysis["slo"] = {
+            "target_us": self.slo_target_us,
+            "percentile": self.slo_percentile,
+            "queue_depth": self.queue_depth,
+            "numjobs": self.threads,
+            "patterns": summaries
+        }
+        return results
+
+    def _search_slo_pattern(self, pattern: str):
+        """对单个负载执行SLO二分搜索"""
+        options = self._parse_rand_pattern(pattern)
+        percentile_key = f"P{self.slo_percentile:g}"
+        results = []
+        probes = []
+
+        def probe(offered_iops: Optional[float]) -> Optional[Dict[str, Any]]:
+            probe_options = options if offered_iops is None else self._rate_options(options, offered_iops, self.threads)
+            tag = "_peak" if offered_iops is None else f"_rate{offered_iops:.0f}"
+            try:
+                result = self.retry_operation(
+                    lambda: self._execute_single_test("random", "4k", pattern, self.queue_depth, self.threads,
+                                                      tag=tag, fio_options=probe_options),
+                    f"FIO测试-SLO-{pattern}{tag}"
+                )
+            except Exception as e:
+                self.log("ERROR", f"SLO探测失败: {str(e)}")
+                results.append(self._make_failed_result("random", "4k", pattern, str(e), self.queue_depth, self.threads))
+                return None
+
+            achieved = result.statistics.get("iops", 0)
+            latency = self._result_percentile(result, self.slo_percentile)
+            sustained = offered_iops is None or achieved >= offered_iops * RATE_SUSTAINED_RATIO
+            record = {
+                "offered_iops": offered_iops,
+                "achieved_iops": achieved,
+                "latency_us": latency,
+                "meets_slo": sustained and latency <= self.slo_target_us
+            }
+            result.statistics["offered_iops"] = offered_iops
+            result.statistics["slo"] = record
+            results.append(result)
+            probes.append(record)
+            self.log("INFO", f"{pattern} 限速 {'无' if offered_iops is None else f'{offered_iops:,.0f}'} IOPS: "
+                             f"实际 {achieved:,.0f} IOPS, {percentile_key} {latency:,.1f}us "
+                             f"-> {'满足' if record['meets_slo'] else '不满足'}SLO")
+            return record
+
+        summary = {"pattern": pattern, "peak_iops": 0, "max_iops": 0, "latency_us": None, "probes": probes}
+
+        # 先测闭环峰值, 作为二分上界
+        peak = probe(None)
+        if peak is None:
+            summary["error"] = "峰值测试失败"
+            return results, summary
+        summary["peak_iops"] = peak["achieved_iops"]
+        summary["peak_latency_us"] = peak["latency_us"]
+
+        if peak["meets_slo"]:
+            summary["max_iops"] = peak["achieved_iops"]
+            summary["latency_us"] = peak["latency_us"]
+        else:
+            low, high = 0.0, peak["achieved_iops"]
+            for _ in range(SLO_SEARCH_MAX_STEPS):
+                if high - low <= peak["achieved_iops"] * SLO_SEARCH_RESOLUTION:
+                    break
+                record = probe((low + high) / 2)
+                if record is None:
+                    break
+                if record["meets_slo"]:
+                    low = record["offered_iops"]
+                    summary["max_iops"] = record["achieved_iops"]
+                    summary["latency_us"] = record["latency_us"]
+                else:
+                    high = record["offered_iops"]
+
+        if summary["latency_us"] is None:
+            self.log("WARNING", f"{pattern}: 在探测范围内无法满足 {percentile_key} ≤ {self.slo_target_us:g}us")
+        else:
+            self.log("SUCCESS", f"{pattern}: SLO内最大持续IOPS {summary['max_iops']:,.0f} "
+                                f"({percentile_key} {summary['latency_us']:,.1f}us, 峰值 {summary['peak_iops']:,.0f} IOPS)")
+        return results, summary
+
+    def _parse_openloop_loads(self, text: str) -> List[str]:
+        """解析开环负载列表: 百分比(相对峰值)或绝对IOPS"""
+        loads = [item.strip() for item in text.split(",") if item.strip()]
+        for load in loads:
+            value = float(load[:-1]) if load.endswith("%") else float(load)
+            if value <= 0:
+                raise ValueError(load)
+        if not loads:
+            raise ValueError(text)
+        return loads
+
+    def run_openloop_test(self) -> List[TestResult]:
+        """开环负载测试: 泊松到达的固定提交速率下测量延迟分布和实际/目标速率"""
+        pattern = self.openloop_pattern
+        options = dict(self._parse_rand_pattern(pattern), rate_process="poisson")
+        self.log("INFO", f"开始执行开环负载测试: 4k {pattern} 泊松到达 "
+                         f"(Jobs{self.threads}, 在途上限QD{OPENLOOP_IODEPTH}, 每级{self.test_duration}秒)")
+        results = []
+
+        # 百分比负载需要先测得闭环峰值
+        peak_iops = None
+        if any(load.endswith("%") for load in self.openloop_loads):
+            try:
+                peak = self.retry_operation(
+                    lambda: self._execute_single_test("random", "4k", pattern, self.queue_depth, self.threads,
+                                                      tag="_peak", fio_options=self._parse_rand_pattern(pattern)),
+                    f"FIO测试-开环峰值-{pattern}"
+                )
+            except Exception as e:
+                self.log("ERROR", f"闭环峰值测试失败: {str(e)}")
+                return [self._make_failed_result("random", "4k", pattern, str(e), self.queue_depth, self.threads)]
+            results.append(peak)
+            peak_iops = peak.statistics.get("iops", 0)
+            self.log("SUCCESS", f"闭环峰值: {peak_iops:,.0f} IOPS (QD{self.queue_depth}/Jobs{self.threads})")
+
+        levels = []
+        for load in self.openloop_loads:
+            offered = peak_iops * float(load[:-1]) / 100 if load.endswith("%") else float(load)
+            tag = f"_open{offered:.0f}"
+            try:
+                result = self.retry_operation(
+                    lambda: self._execute_single_test("random", "4k", pattern, OPENLOOP_IODEPTH, self.threads, tag=tag,
+                                                      fio_options=self._rate_options(options, offered, self.threads)),
+                    f"FIO测试-开环-{pattern}{tag}"
+                )
+            except Exception as e:
+                self.log("ERROR", f"开环负载 {offered:,.0f} IOPS 测试失败: {str(e)}")
+                results.append(self._make_failed_result("random", "4k", pattern, str(e), OPENLOOP_IODEPTH, self.threads))
+                continue
+
+            achieved = result.statistics.get("iops", 0)
+            latency = result.statistics.get("latency", {}).get("all", {})
+            level = {
+                "load": load,
+                "offered_iops": offered,
+                "achieved_iops": achieved,
+                "achieved_ratio": achieved / offered if offered > 0 else 0,
+                "saturated": achieved < offered * RATE_SUSTAINED_RATIO,
+                "lat_mean": result.statistics.get("lat_mean", 0),
+                "latency": latency
+            }
+            result.statistics["offered_iops"] = offered
+            result.statistics["achieved_ratio"] = level["achieved_ratio"]
+            results.append(result)
+            levels.append(level)
+            self.log("SUCCESS" if not level["saturated"] else "WARNING",
+                     f"目标 {offered:,.0f} IOPS: 实际 {achieved:,.0f} IOPS ({level['achieved_ratio']:.1%}), "
+                     f"P50 {latency.get('p50', 0):,.1f}us, P99 {latency.get('p99', 0):,.1f}us"
+                     f"{', 已超出设备能力' if level['saturated'] else ''}")
+
+        self.analysis["openloop"] = {
+            "pattern": pattern,
+            "numjobs": self.threads,
+            "peak_iops": peak_iops,
+            "levels": levels
+        }
+        self._write_openloop_curve(levels)
+        return results
+
+    def _default_scaling_counts(self, device_count: int) -> List[int]:
+        """默认盘数序列: 1, 2, 4, …, N"""
+        counts = []
+        count = 1
+        while count < device_count:
+            counts.append(count)
+            count *= 2
+        counts.append(device_count)
+        return counts
+
+    def run_scaling_test(self) -> List[TestResult]:
+        """多盘聚合扩展测试: 同一阶段在1、2、4…N块盘上同时运行, 寻找主机侧饱和点"""
+        stage = self._select_plan_stage(self.scaling_stage, SCALING_DEFAULT_STAGE)
+        counts = [c for c in (self.scaling_counts or self._default_scaling_counts(len(self.devices)))
+                  if c <= len(self.devices)]
+        unit = "MB/s" if stage["test_type"] == "sequential" else "IOPS"
+        self.log("INFO", f"开始执行多盘扩展测试: {stage['name']} ({stage['block_size']} {stage['rw']} "
+                         f"QD{stage['iodepth']}/Jobs{stage['numjobs']}), 盘数 {','.join(str(c) for c in counts)}")
+
+        results = []
+        points = []
+        for count in counts:
+            devices = self.devices[:count]
+            self.log("INFO", f"扩展点: {count} 块盘同时运行 ({', '.join(devices)})")
+            per_device, sample_totals, telemetry = self._run_scaling_point(stage, devices)
+            for device in devices:
+                per_device[device].stage = f"{stage['name']}_x{count}_{device}"
+                results.append(per_device[device])
+
+            if not sample_totals:
+                self.log("ERROR", f"{count} 块盘扩展点失败")
+                continue
+
+            total = statistics.mean(sample_totals)
+            points.append({
+                "devices": count,
+                "total": total,
+                "total_cv": (statistics.stdev(sample_totals) / total if len(sample_totals) > 1 and total > 0 else 0),
+                "per_device_mean": total / count,
+                "host_cpu_util": telemetry.get("cpu", {}).get("util", 0),
+                "host_max_cpu_util": telemetry.get("cpu", {}).get("max_cpu_util", 0),
+                "per_device": {
+                    device: {
+                        "value": per_device[device].statistics.get("mean", 0),
+                        "lat_p99": per_device[device].statistics.get("latency", {}).get("all", {}).get("p99", 0)
+                    } for device in devices
+                }
+            })
+            self.log("SUCCESS", f"{count} 块盘: 总计 {total:,.2f} {unit}, 单盘平均 {total / count:,.2f} {unit}")
+
+        analysis = self._analyze_scaling(stage, points)
+        self.analysis["scaling"] = analysis
+        self._write_scaling_curve(analysis)
+
+        saturation = analysis.get("saturation")
+        if saturation:
+            self.log("WARNING", f"扩展饱和点: {saturation['devices']} 块盘之后新增盘数收益不足单盘的"
+                                f"{SCALING_MARGINAL_RATIO:.0%}, 主机侧(PCIe/内存/CPU)已成瓶颈")
+        return results
+
+    def _smooth_series(self, points: List[Dict[str, Any]], metric: str = "bw") -> List[float]:
+        """逐区间指标的滑动中位数"""
+        values = [point[metric] for point in points]
+        return [statistics.median(values[max(0, i - SLC_SMOOTH_WINDOW + 1):i + 1]) for i in range(len(values))]
+
+    def _written_gb(self, points: List[Dict[str, Any]]) -> List[float]:
+        """按区间带宽和时长累计写入量(GB)"""
+        written = []
+        total = 0.0
+        prev_t = 0.0
+        for point in points:
+            total += point["bw"] * (point["t"] - prev_t) / 1000
+            prev_t = point["t"]
+            written.append(total)
+        return written
+
+    def _detect_write_cliffs(self, points: List[Dict[str, Any]], metric: str = "bw") -> List[Dict[str, Any]]:
+        """检测写入性能断崖(可能有多级: SLC→TLC/QLC直写→折叠, 或随机写GC介入)
+
+        返回每个断崖的时间点、此前累计写入量, 以及断崖前后metric的中位数(before/after)。
+        """
+        smoothed = self._smooth_series(points, metric)
+        written = self._written_gb(points)
+        bws = [point[metric] for point in points]
+        cliffs = []
+        segment_start = 0
+        i = SLC_CLIFF_HOLD
+        while i + SLC_CLIFF_HOLD <= len(points):
+            if i - segment_start < SLC_CLIFF_HOLD:
+                i += 1
+                continue
+            baseline = statistics.median(bws[max(segment_start, i - SLC_BASELINE_WINDOW):i])
+            if all(value < baseline * SLC_CLIFF_RATIO for value in smoothed[i:i + SLC_CLIFF_HOLD]):
+                # 断崖起点回退到平滑窗口开始处
+                start = max(segment_start, i - SLC_SMOOTH_WINDOW + 1)
+                while start < i and bws[start] >= baseline * SLC_CLIFF_RATIO:
+                    start += 1
+                cliffs.append({
+                    "t": points[start]["t"],
+                    "written_gb": written[start - 1] if start > 0 else 0,
+                    "before": statistics.median(bws[segment_start:start])
+                })
+                segment_start = start
+                i = start + SLC_CLIFF_HOLD
+                continue
+            i += 1
+
+        # 断崖后取到下一个断崖(或结束)之间的中位数
+        for index, cliff in enumerate(cliffs):
+            end = len(points)
+            if index + 1 < len(cliffs):
+                end = next(j for j, point in enumerate(points) if point["t"] >= cliffs[index + 1]["t"])
+            begin = next(j for j, point in enumerate(points) if point["t"] >= cliff["t"])
+            cliff["after"] = statistics.median(bws[begin:end]) if end > begin else 0
+        return cliffs
+
+    def _cache_extent(self, points: List[Dict[str, Any]], threshold: float) -> Dict[str, Any]:
+        """平滑带宽持续低于threshold之前写入的数据量(GB), 即可用的缓存容量"""
+        smoothed = self._smooth_series(points)
+        written = self._written_gb(points)
+        for i in range(len(points) - SLC_CLIFF_HOLD + 1):
+            if all(value < threshold for value in smoothed[i:i + SLC_CLIFF_HOLD]):
+                return {"cache_gb": written[i - 1] if i > 0 else 0, "exhausted": True}
+        return {"cache_gb": written[-1] if written else 0, "exhausted": False}
+
+    def _run_slc_write(self, tag: str, threshold: float = None) -> Optional[TestResult]:
+        """从LBA 0开始顺序写并逐区间记录带宽; 指定threshold时带宽跌破阈值即提前结束"""
+        name = f"slc_{tag}"
+        output_json = os.path.join(self.result_dir, f"{name}.json")
+        fio_options = dict(self._engine_options(), **self._numa_options())
+        fio_cmd = [
+            "fio", f"--name={name}", f"--filename=/dev/{self.device}",
+            f"--ioengine={fio_options.pop('ioengine')}", "--direct=1", "--numjobs=1",
+            f"--iodepth={SLC_IODEPTH}", "--rw=write", f"--bs={SLC_BLOCK_SIZE}",
+            f"--size={self.custom_test_size or '100%'}", f"--runtime={self.test_duration}",
+            "--refill_buffers", "--end_fsync=1", "--group_reporting",
+            "--output-format=json", f"--output={output_json}"
+        ] + [f"--{key}={value}" for key, value in fio_options.items()]
+        self.log("INFO", f"FIO命令: {' '.join(fio_cmd)}")
+
+        state = {"below": 0}
+
+        def on_point(point: Dict[str, float]) -> bool:
+            if threshold is None:
+                return False
+            state["below"] = state["below"] + 1 if point["bw"] < threshold else 0
+            return state["below"] >= SLC_CLIFF_HOLD + SLC_SMOOTH_WINDOW
+
+        start_time = time.time()
+        streamed = self._run_fio_streaming(fio_cmd, on_point)
+        execution_time = time.time() - start_time
+        if streamed["stall"] or not streamed["json_data"] or not streamed["data_points"]:
+            self.log("ERROR", f"{name} 写入失败 (返回码: {streamed['returncode']})")
+            return None
+
+        metrics = self._extract_performance_metrics({
+            "json_data": streamed["json_data"],
+            "job_name": name,
+            "execution_time": execution_time
+        })
+        result = self._build_test_result("sequential", SLC_BLOCK_SIZE, "write", metrics, execution_time,
+                                         streamed["data_points"], SLC_IODEPTH, 1)
+        result.stage = name
+        return result
+
+    def _discard_device(self) -> bool:
+        """整盘TRIM使缓存和映射表回到干净状态, 失败时从当前状态继续"""
+        try:
+            subprocess.run(["blkdiscard", f"/dev/{self.device}"], capture_output=True, check=True, timeout=600)
+            self.log("INFO", "已执行blkdiscard")
+            return True
+        except (OSError, subprocess.SubprocessError) as e:
+            self.log("WARNING", f"blkdiscard失败, 从当前状态开始测试: {str(e)}")
+            return False
+
+    def _clean_state_method(self) -> str:
+        """SLC/WSAT需要干净状态, 未指定--purge时默认使用blkdiscard"""
+        return "discard" if self.purge_method == "none" else self.purge_method
+
+    def run_slc_test(self) -> List[TestResult]:
+        """SLC缓存断崖测试: 从干净状态顺序写, 检测带宽断崖并测量空闲后的缓存恢复"""
+        self.log("INFO", f"开始执行SLC缓存测试: {SLC_BLOCK_SIZE}顺序写 QD{SLC_IODEPTH} (最长{self.test_duration}秒)")
+        if not self.custom_test_size and self._purge_device(self._clean_state_method()):
+            self.log("INFO", "等待设备完成后台整理")
+            time.sleep(max(self.slc_idle_times))
+
+        fill = self._run_slc_write("fill")
+        if fill is None:
+            return [self._make_failed_result("sequential", SLC_BLOCK_SIZE, "write", "顺序写入失败", SLC_IODEPTH, 1)]
+        results = [fill]
+        cliffs = self._detect_write_cliffs(fill.data_points)
+        written = self._written_gb(fill.data_points)
+        analysis = {
+            "block_size": SLC_BLOCK_SIZE,
+            "iodepth": SLC_IODEPTH,
+            "written_gb": written[-1] if written else 0,
+            "cliffs": cliffs,
+            "cache_size_gb": cliffs[0]["written_gb"] if cliffs else None,
+            "pre_cliff_bw": cliffs[0]["before"] if cliffs else None,
+            "post_cliff_bw": cliffs[-1]["after"] if cliffs else None,
+            "recovery": []
+        }
+        self._write_slc_curve(fill.data_points)
+
+        if not cliffs:
+            self.log("WARNING", f"写入 {analysis['written_gb']:.1f} GB 内未检测到带宽断崖, 缓存大于写入量或无SLC缓存")
+            self.analysis["slc"] = analysis
+            return results
+
+        for index, cliff in enumerate(cliffs, 1):
+            self.log("SUCCESS", f"断崖{index}: {cliff['written_gb']:.1f} GB 处 (第{cliff['t']:.0f}秒), "
+                                f"{cliff['before']:,.0f} → {cliff['after']:,.0f} MB/s")
+
+        # 恢复测试: 空闲后重新写入, 以断崖前后带宽的中点为阈值测量恢复的缓存容量
+        threshold = (cliffs[0]["before"] + cliffs[0]["after"]) / 2
+        for idle in self.slc_idle_times:
+            self.log("INFO", f"空闲 {idle} 秒后测量缓存恢复")
+            time.sleep(idle)
+            rewrite = self._run_slc_write(f"idle{idle}", threshold)
+            if rewrite is None:
+                continue
+            results.append(rewrite)
+            extent = self._cache_extent(rewrite.data_points, threshold)
+            recovered = {
+                "idle": idle,
+                "recovered_gb": extent["cache_gb"],
+                "ratio": extent["cache_gb"] / analysis["cache_size_gb"] if analysis["cache_size_gb"] else 0,
+                "exhausted": extent["exhausted"]
+            }
+            analysis["recovery"].append(recovered)
+            self.log("SUCCESS", f"空闲 {idle} 秒: 恢复 {recovered['recovered_gb']:.1f} GB "
+                                f"({recovered['ratio']:.0%})")
+
+        self.analysis["slc"] = analysis
+        return results
+
+    def _select_wsat_stage(self) -> Dict[str, Any]:
+        """选取WSAT使用的随机写阶段, 默认沿用标准流程的rand_warmup预处理"""
+        name = self.wsat_stage or WSAT_DEFAULT_STAGE
+        for stage in self.test_plan["stages"]:
+            if stage["name"] == name:
+                return stage
+        if self.wsat_stage is None:
+            default_plan = self._normalize_test_plan(DEFAULT_TEST_PLAN)
+            return next(stage for stage in default_plan["stages"] if stage["name"] == WSAT_DEFAULT_STAGE)
+        raise ValueError(f"测试计划中没有阶段 {name}")
+
+    def run_wsat_test(self) -> List[TestResult]:
+        """随机写饱和(WSAT)测试: 从干净状态持续随机写到稳态, 记录逐区间IOPS/P99、GC介入点和稳态IOPS"""
+        stage = self._select_wsat_stage()
+        block_size, queue_depth, numjobs = stage["block_size"], stage["iodepth"], stage["numjobs"]
+        self.log("INFO", f"开始执行WSAT测试: {stage['name']} ({block_size} {stage['rw']} QD{queue_depth}/Jobs{numjobs}), "
+                         f"达到稳态即结束 (最长{self.test_duration}秒)")
+        if not self.custom_test_size:
+            self._purge_device(self._clean_state_method())
+        self.log("INFO", f"稳态检测在检测到GC介入或写满{WSAT_MIN_DRIVE_FILLS:g}倍容量后启用")
+
+        name = f"wsat_{stage['name']}"
+        output_json = os.path.join(self.result_dir, f"{name}.json")
+        base_options = dict(self._engine_options(), **self._numa_options())
+        fio_options = dict(base_options, **stage.get("fio_options", {}))
+        fio_cmd = [
+            "fio", f"--name={name}", f"--filename=/dev/{self.device}", f"--rw={stage['rw']}",
+            f"--bs={block_size}", f"--ioengine={fio_options.pop('ioengine')}", "--direct=1",
+            f"--numjobs={numjobs}", f"--iodepth={queue_depth}", f"--runtime={self.test_duration}",
+            "--time_based=1", f"--size={self.custom_test_size or '100%'}", "--refill_buffers",
+            "--norandommap=1", "--randrepeat=0", "--group_reporting",
+            "--output-format=json+", f"--output={output_json}"
+        ] + [f"--{key}={value}" for key, value in fio_options.items()]
+        self.log("INFO", f"FIO命令: {' '.join(fio_cmd)}")
+
+        capacity_gb = self._get_device_capacity_gb() or self._get_device_size_bytes() / 1e9
+        required_gb = capacity_gb * WSAT_MIN_DRIVE_FILLS
+        detector = SteadyStateDetector(round_time=self.steady_state_round_time)
+        state = {"points": [], "written_gb": 0.0, "armed": None, "warned": False}
+
+        def on_point(point: Dict[str, float]) -> bool:
+            # FOB阶段的平台同样平稳, 检测到GC介入或写满容量之前不做稳态判定
+            prev_t = state["points"][-1]["t"] if state["points"] else 0.0
+            state["points"].append(point)
+            state["written_gb"] += point["bw"] * (point["t"] - prev_t) / 1000
+            if state["armed"] is not None:
+                return detector.add_sample(point["t"], point["iops"])
+
+            if required_gb and state["written_gb"] >= required_gb:
+                state["armed"] = {"reason": "drive_fill", "t": point["t"], "written_gb": state["written_gb"]}
+            elif (len(state["points"]) % WSAT_CLIFF_CHECK_INTERVAL == 0 and
+                  self._detect_write_cliffs(state["points"], "iops")):
+                state["armed"] = {"reason": "gc_onset", "t": point["t"], "written_gb": state["written_gb"]}
+            if state["armed"] is not None:
+                reason = "检测到GC介入" if state["armed"]["reason"] == "gc_onset" else f"已写满{WSAT_MIN_DRIVE_FILLS:g}倍容量"
+                self.log("INFO", f"第{point['t']:.0f}秒{reason} ({state['written_gb']:.1f} GB), 开始稳态检测")
+            elif (not state["warned"] and required_gb and point["bw"] > 0 and
+                  len(state["points"]) >= SLC_BASELINE_WINDOW):
+                # 按当前带宽估算写满容量所需时间, 不足时提前提示
+                fill_time = point["t"] + (required_gb - state["written_gb"]) * 1000 / point["bw"]
+                if fill_time > self.test_duration:
+                    state["warned"] = True
+                    self.log("WARNING", f"按当前 {point['bw']:,.0f} MB/s 写满 {required_gb:.0f} GB 约需{fill_time:.0f}秒, "
+                                        f"超过-t {self.test_duration}秒; 若未出现GC介入, 结果将停留在FOB阶段")
+            return False
+
+        start_time = time.time()
+        streamed = self._run_fio_streaming(fio_cmd, on_point)
+        execution_time = time.time() - start_time
+        if streamed["stall"] or not streamed["json_data"] or not streamed["data_points"]:
+            error = f"随机写失败 (返回码: {streamed['returncode']})"
+            self.log("ERROR", error)
+            failed = self._make_failed_result("random", block_size, "write", error, queue_depth, numjobs)
+            failed.stage = name
+            return [failed]
+
+        points = streamed["data_points"]
+        metrics = self._extract_performance_metrics({
+            "json_data": streamed["json_data"],
+            "job_name": name,
+            "execution_time": execution_time
+        })
+        result = self._build_test_result("random", block_size, "write", metrics, execution_time,
+                                         points, queue_depth, numjobs)
+        result.stage = name
+
+        analysis = self._analyze_wsat(points, detector.summary())
+        analysis.update({"stage": stage["name"], "block_size": block_size, "iodepth": queue_depth, "numjobs": numjobs,
+                         "armed": state["armed"]})
+        if state["armed"] is None:
+            self.log("WARNING", f"写入 {analysis['written_gb']:.1f} GB, 既未写满{WSAT_MIN_DRIVE_FILLS:g}倍容量也未检测到GC介入, "
+                                f"末段IOPS可能仍是FOB性能, 请增大 -t")
+        self.analysis["wsat"] = analysis
+        self._write_wsat_curve(points, analysis)
+
+        onset = analysis["gc_onset"]
+        if onset:
+            self.log("SUCCESS", f"GC介入点: 第{onset['t']:.0f}秒, 已写入 {onset['written_gb']:.1f} GB, "
+                                f"IOPS {onset['before']:,.0f} → {onset['after']:,.0f}")
+        else:
+            self.log("WARNING", "未检测到GC介入点, 设备可能未处于干净状态或写入量不足")
+        steady = analysis["steady_state"]
+        level = "SUCCESS" if steady["steady"] else "WARNING"
+        self.log(level, f"{'稳态' if steady['steady'] else '未达到稳态, 末段'}IOPS {steady['iops']:,.0f} "
+                        f"(区间 {steady['iops_min']:,.0f} ~ {steady['iops_max']:,.0f}, 标准差 {steady['iops_stdev']:,.0f})")
+        return [result]
+
+    def _analyze_wsat(self, points: List[Dict[str, Any]], steady: Dict[str, Any]) -> Dict[str, Any]:
+        """由逐区间IOPS/P99计算GC介入点和稳态窗口统计"""
+        written = self._written_gb(points)
+        capacity_gb = self._get_device_capacity_gb() or self._get_device_size_bytes() / 1e9
+        # 没有完成I/O的区间无直方图增量, 不计入P99
+        has_p99 = any("p99" in point for point in points)
+
+        gc_onset = None
+        cliffs = self._detect_write_cliffs(points, "iops")
+        if cliffs:
+            gc_onset = dict(cliffs[0])
+            gc_onset["drive_fills"] = gc_onset["written_gb"] / capacity_gb if capacity_gb else None
+            if has_p99:
+                before = [point["p99"] for point in points if "p99" in point and point["t"] < gc_onset["t"]]
+                after = [point["p99"] for point in points if "p99" in point and point["t"] >= gc_onset["t"]]
+                gc_onset["p99_before"] = statistics.median(before) if before else 0
+                gc_onset["p99_after"] = statistics.median(after) if after else 0
+
+        # 稳态窗口: 检测器判定稳态前的最后window轮, 未达到稳态时取末尾同样长度
+        window_time = self.steady_state_round_time * STEADY_STATE_WINDOW
+        end_t = steady["steady_time"] if steady["steady"] else points[-1]["t"]
+        window = [point for point in points if end_t - window_time < point["t"] <= end_t] or points[-1:]
+        iops = [point["iops"] for point in window]
+        window_p99 = [point["p99"] for point in window if "p99" in point]
+        steady_state = {
+            "steady": steady["steady"],
+            "steady_time": steady["steady_time"],
+            "window_start": window[0]["t"],
+            "window_end": window[-1]["t"],
+            "iops": statistics.mean(iops),
+            "iops_stdev": statistics.stdev(iops) if len(iops) > 1 else 0,
+            "iops_min": min(iops),
+            "iops_max": max(iops),
+            "range_ratio": steady["range_ratio"],
+            "slope_ratio": steady["slope_ratio"],
+            "p99": statistics.median(window_p99) if window_p99 else None
+        }
+        return {
+            "written_gb": written[-1] if written else 0,
+            "drive_fills": written[-1] / capacity_gb if capacity_gb and written else None,
+            "gc_onset": gc_onset,
+            "steady_state": steady_state
+        }
+
+    def _write_wsat_curve(self, points: List[Dict[str, Any]], analysis: Dict[str, Any]):
+        """保存WSAT逐区间IOPS/延迟曲线CSV, 并标注所处阶段"""
+        curve_file = os.path.join(self.result_dir, "wsat_curve.csv")
+        written = self._written_gb(points)
+        onset = analysis["gc_onset"]
+        steady = analysis["steady_state"]
+        with open(curve_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["时间(秒)", "累计写入(GB)", "IOPS", "平均延迟(us)", "P99延迟(us)", "阶段"])
+            for point, total in zip(points, written):
+                if steady["window_start"] <= point["t"] <= steady["window_end"]:
+                    phase = "稳态" if steady["steady"] else "末段"
+                elif onset is None or point["t"] < onset["t"]:
+                    phase = "FOB"
+                else:
+                    phase = "过渡"
+                writer.writerow([point["t"], f"{total:.2f}", f"{point['iops']:.0f}", f"{point['lat']:.1f}",
+                                 f"{point['p99']:.1f}" if "p99" in point else "", phase])
+
+    def _write_slc_curve(self, points: List[Dict[str, Any]]):
+        """保存顺序写带宽-写入量曲线CSV"""
+        curve_file = os.path.join(self.result_dir, "slc_curve.csv")
+        written = self._written_gb(points)
+        with open(curve_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["时间(秒)", "累计写入(GB)", "带宽(MB/s)", "平均延迟(us)"])
+            for point, total in zip(points, written):
+                writer.writerow([point["t"], f"{total:.2f}", f"{point['bw']:.1f}", f"{point['lat']:.1f}"])
+
+    def _compile_scaling_jobfile(self, stage: Dict[str, Any], devices: List[str], samples: int, runtime: int) -> str:
+        """生成扩展测试jobfile: 每次采样各盘一个作业同时运行, 采样之间以stonewall隔开"""
+        lines = [
+            "[global]",
+            "direct=1",
+            "time_based=1",
+            f"size={self.custom_test_size or '100%'}",
+            "refill_buffers",
+            "end_fsync=1",
+            "norandommap=1",
+            "randrepeat=0",
+            "group_reporting",
+            f"percentile_list={':'.join(f'{p:g}' for p in LATENCY_PERCENTILES)}",
+            f"bs={stage['block_size']}",
+            f"iodepth={stage['iodepth']}",
+            f"numjobs={stage['numjobs']}",
+            f"runtime={runtime}",
+            f"ramp_time={self.ramp_time}"
         ]
-        
-        total_tests = len(test_configs)
-        self.log("INFO", f"开始执行优化版SSD性能测试流程 {total_tests} 个测试用例...")
+        lines += [f"{key}={value}" for key, value in self._engine_options().items()]
+        lines += [f"{key}={value}" for key, value in self._stage_fio_options(stage).items()]
 
-        # 第一步：顺序写预热(使用ramp_time参数)
-        warmup_time = self.ramp_time  # 使用ramp_time参数
-        self.log("INFO", f"第一阶段：顺序写预热{warmup_time}秒 [QD128/Job1]")
-        warmup_size = self.custom_test_size or "100%"
+        for sample_id in range(samples):
+            for index, device in enumerate(devices):
+                lines += ["", f"[x{len(devices)}_s{sample_id}_{device}]", f"filename=/dev/{device}", "new_group"]
+                # 每块盘的任务绑定到各自所在的NUMA节点
+                lines += [f"{key}={value}" for key, value in self._numa_options(device).items()]
+                if index == 0:
+                    lines.append("stonewall")
+        return "\n".join(lines) + "\n"
+
+    def _run_scaling_point(self, stage: Dict[str, Any], devices: List[str]):
+        """在一组盘上同时运行阶段, 返回 (各盘合并结果, 各次采样的总性能, 主机遥测)"""
+        samples = stage.get("samples") or DATA_VALIDATION_SAMPLES
+        runtime = stage.get("duration", self.test_duration)
+        prefix = os.path.join(self.result_dir, f"scaling_x{len(devices)}")
+        with open(f"{prefix}.fio", "w") as f:
+            f.write(self._compile_scaling_jobfile(stage, devices, samples, runtime))
+
+        fio_cmd = ["fio", f"{prefix}.fio", "--output-format=json+", f"--output={prefix}.json"]
+        self.log("INFO", f"FIO命令: {' '.join(fio_cmd)}")
+        sampler = HostTelemetrySampler(devices) if self.telemetry_mode else None
+        if sampler:
+            sampler.start()
         try:
-            seq_warmup_cmd = ["fio", "--name=seq_warmup", f"--filename=/dev/{self.device}",
-                              "--rw=write", "--bs=128k", "--ioengine=libaio", "--direct=1",
-                              "--numjobs=1", "--iodepth=128", f"--runtime={warmup_time}", "--time_based=1",
-                              f"--size={warmup_size}", "--refill_buffers", "--end_fsync=1", 
-                              "--norandommap=1", "--randrepeat=0", "--group_reporting",
-                              "--output-format=json", "--output=/tmp/seq_warmup.json"]
-            
-            subprocess.run(seq_warmup_cmd, capture_output=True, check=False)
-            self.log("SUCCESS", "顺序写预热完成")
-        except Exception as e:
-            self.log("WARNING", f"顺序写预热失败,继续测试: {str(e)}")
-
-        # 执行测试循环
-        for i, config in enumerate(test_configs, 1):
-            test_type = config["test_type"]
-            block_size = config["block_size"] 
-            rw_pattern = config["rw_pattern"]
-            queue_depth = config["queue_depth"]
-            numjobs = config["numjobs"]
-            stage = config["stage"]
-            
-            # 特殊处理：第四步随机写预热(使用ramp_time参数)
-            if i == 3:  # 在随机写测试前进行预热
-                warmup_time = self.ramp_time  # 使用ramp_time参数
-                self.log("INFO", f"第四阶段：随机写预热{warmup_time}秒 [QD32/Job8]")
-                warmup_size = self.custom_test_size or "100%"
-                try:
-                    rand_warmup_cmd = ["fio", "--name=rand_warmup", f"--filename=/dev/{self.device}",
-                                      "--rw=randwrite", "--bs=4k", "--ioengine=libaio", "--direct=1",
-                                      "--numjobs=8", "--iodepth=32", f"--runtime={warmup_time}", "--time_based=1",
-                                      f"--size={warmup_size}", "--refill_buffers", "--end_fsync=1",
-                                      "--norandommap=1", "--randrepeat=0", "--group_reporting",
-                                      "--output-format=json", "--output=/tmp/rand_warmup.json"]
-                    
-                    subprocess.run(rand_warmup_cmd, capture_output=True, check=False)
-                    self.log("SUCCESS", "随机写预热完成")
-                except Exception as e:
-                    self.log("WARNING", f"随机写预热失败,继续测试: {str(e)}")
+            result = self._run_fio(fio_cmd, devices)
+        finally:
+            telemetry = sampler.stop() if sampler else {}
+        json_data = self._load_and_validate_json(f"{prefix}.json") if result["returncode"] == 0 else None
 
-            self.log("INFO", f"执行测试 {i+1}/{total_tests+1}: {test_type} {block_size} {rw_pattern} [{stage}]")
-            self.log("INFO", f"参数配置: 队列深度={queue_depth}, 任务数={numjobs}")
+        def failed(error: str) -> TestResult:
+            return self._make_failed_result(stage["test_type"], stage["block_size"], stage["rw_pattern"], error,
+                                            stage["iodepth"], stage["numjobs"])
 
-            try:
-                result = self.run_enhanced_test(test_type, block_size, rw_pattern, queue_depth, numjobs)
-                results.append(result)
+        if not json_data:
+            stderr_preview = result["stderr"].strip()
+            if stderr_preview:
+                self.log("ERROR", f"FIO stderr: {stderr_preview[:800]}")
+            error = "FIO执行卡死" if result["stall"] else f"命令执行失败 (返回码: {result['returncode']})"
+            return {device: failed(error) for device in devices}, [], telemetry
 
-                # 显示性能结果
-                mean_value = result.statistics.get("mean", 0)
-                # 使用明确的类型判断，避免字符串包含关系产生歧义
-                if result.test_type == "sequential":
-                    performance_str = f"{mean_value:.2f} MB/s"
-                else:
-                    performance_str = f"{mean_value:.0f} IOPS"
+        fio_jobs = {job.get("jobname"): job for job in json_data.get("jobs", [])}
+        device_samples = {device: [] for device in devices}
+        sample_totals = []
+        for sample_id in range(samples):
+            total = 0
+            complete = True
+            for device in devices:
+                section = f"x{len(devices)}_s{sample_id}_{device}"
+                job = fio_jobs.get(section)
+                if not job or job.get("error"):
+                    device_samples[device].append(failed(f"作业 {section} 无有效结果"))
+                    complete = False
+                    continue
+                elapsed = job.get("elapsed", runtime)
+                metrics = self._extract_performance_metrics({
+                    "json_data": {"jobs": [job]},
+                    "job_name": section,
+                    "execution_time": elapsed
+                })
+                sample = self._build_test_result(stage["test_type"], stage["block_size"], stage["rw_pattern"],
+                                                 metrics, elapsed, [], stage["iodepth"], stage["numjobs"])
+                device_samples[device].append(sample)
+                total += sample.statistics.get("mean", 0)
+            # 任一盘失败时该次采样的总量不可比
+            if complete:
+                sample_totals.append(total)
 
-                cv = result.statistics.get("cv", 0)  # 变异系数：衡量数据稳定性
-                self.log("SUCCESS", f"测试完成 - 性能: {performance_str}, CV: {cv:.3f}")
+        per_device = {
+            device: self._merge_test_results(device_samples[device], stage["test_type"], stage["block_size"],
+                                             stage["rw_pattern"])
+            for device in devices
+        }
+        return per_device, sample_totals, telemetry
+
+    def _analyze_scaling(self, stage: Dict[str, Any], points: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """计算扩展效率(总性能/(盘数×单盘性能))和饱和点"""
+        analysis = {
+            "stage": stage["name"],
+            "rw": stage["rw"],
+            "block_size": stage["block_size"],
+            "iodepth": stage["iodepth"],
+            "numjobs": stage["numjobs"],
+            "unit": "MB/s" if stage["test_type"] == "sequential" else "IOPS",
+            "points": points,
+            "devices": self.devices,
+            "saturation": None
+        }
+        if not points:
+            return analysis
+
+        single = points[0]["per_device_mean"]
+        for prev, point in zip([None] + points[:-1], points):
+            point["efficiency"] = point["total"] / (point["devices"] * single) if single > 0 else 0
+            if prev is None:
+                point["marginal"] = 1.0
+                continue
+            # 每新增一块盘带来的增量, 以单盘性能为基准
+            added = point["devices"] - prev["devices"]
+            point["marginal"] = (point["total"] - prev["total"]) / (added * single) if single > 0 else 0
+            if analysis["saturation"] is None and point["marginal"] < SCALING_MARGINAL_RATIO:
+                analysis["saturation"] = prev
+        return analysis
+
+    def _write_scaling_curve(self, analysis: Dict[str, Any]):
+        """保存盘数-聚合性能曲线CSV"""
+        curve_file = os.path.join(self.result_dir, "scaling_curve.csv")
+        saturation = analysis.get("saturation")
+        unit = analysis["unit"]
+        with open(curve_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["盘数", f"总计({unit})", f"单盘平均({unit})", "总计变异系数", "扩展效率", "边际收益",
+                             "主机CPU(%)", "最忙CPU(%)", "饱和点"])
+            for p in analysis["points"]:
+                writer.writerow([
+                    p["devices"], f"{p['total']:.2f}", f"{p['per_device_mean']:.2f}", f"{p['total_cv']:.3f}",
+                    f"{p['efficiency']:.3f}", f"{p['marginal']:.3f}", f"{p['host_cpu_util']:.1f}",
+                    f"{p['host_max_cpu_util']:.1f}", "*" if p is saturation else ""
+                ])
+
+    def _write_openloop_curve(self, levels: List[Dict[str, Any]]):
+        """保存开环负载-延迟曲线CSV"""
+        curve_file = os.path.join(self.result_dir, "openloop_curve.csv")
+        with open(curve_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["目标IOPS", "实际IOPS", "达成率", "平均延迟(us)"] +
+                            [f"P{p:g}延迟(us)" for p in LATENCY_PERCENTILES] + ["饱和"])
+            for level in levels:
+                writer.writerow([
+                    f"{level['offered_iops']:.0f}", f"{level['achieved_iops']:.0f}",
+                    f"{level['achieved_ratio']:.3f}", f"{level['lat_mean']:.1f}"
+                ] + [f"{level['latency'].get(f'p{p:g}', 0):.1f}" for p in LATENCY_PERCENTILES] +
+                    ["*" if level["saturated"] else ""])
 
-            except Exception as e:
-                self.log("ERROR", f"测试执行失败: {str(e)}")
-                # 创建失败结果
-                failed_result = TestResult(
-                    test_type=test_type,
-                    block_size=block_size,
-                    rw_pattern=rw_pattern,
-                    data_points=[],
-                    statistics={},
-                    evaluation={"status": "FAILED", "error": str(e)},
-                    execution_time=0,
-                    retry_count=TEST_RETRY_COUNT
-                )
-                results.append(failed_result)
-        
-        return results
-    
     def save_results(self, results: List[TestResult], system_info: Dict):
         """保存测试结果"""
         # CSV报告
@@ -695,11 +4612,16 @@ class SSDPerformanceTester:
         with open(csv_file, "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow([
-            "测试类型", "块大小", "读写模式", "主要指标", "均值", "标准差", "变异系数",
+            "阶段", "测试类型", "块大小", "读写模式", "队列深度", "任务数", "主要指标", "均值", "标准差", "变异系数",
             "执行时间", "重试次数"
-            ])
+            ] + [f"P{p:g}延迟(us)" for p in LATENCY_PERCENTILES] + ["主机CPU(%)", "设备繁忙(%)", "每核IOPS", "主机写入(GB)", "NAND写入(GB)", "WAF", "降速时间(秒)", "采样数", "CI相对宽度(%)"])
             
             for result in results:
+                latency = result.statistics.get("latency", {}).get("all", {})
+                telemetry = result.statistics.get("telemetry", {})
+                device_telemetry = telemetry.get("devices", {}).get(self.device, {})
+                health = result.statistics.get("health", {})
+                sampling = result.statistics.get("sampling", {})
                 # 确定正确的单位
                 if result.test_type == "sequential":
                     unit = "MB/s"
@@ -709,15 +4631,29 @@ class SSDPerformanceTester:
                     format_str = f"{result.statistics.get('mean', 0):.0f}"
                 
                 writer.writerow([
+                    result.stage or "",
                     result.test_type,
                     result.block_size,
                     result.rw_pattern,
+                    result.queue_depth if result.queue_depth is not None else "",
+                    result.numjobs if result.numjobs is not None else "",
                     unit,
                     format_str,
                     f"{result.statistics.get('stdev', 0):.2f}",
                     f"{result.statistics.get('cv', 0):.3f}",
                     f"{result.execution_time:.2f}",
                     result.retry_count
+                ] + [f"{latency.get(f'p{p:g}', 0):.1f}" for p in LATENCY_PERCENTILES] + [
+                    f"{telemetry.get('cpu', {}).get('util', 0):.1f}" if telemetry else "",
+                    f"{device_telemetry.get('busy_pct', 0):.1f}" if device_telemetry else "",
+                    f"{telemetry.get('iops_per_core', 0):.0f}" if telemetry else ""
+                ] + [
+                    f"{health[key] / scale:.{digits}f}" if health.get(key) is not None else ""
+                    for key, scale, digits in (("host_bytes", 1e9, 2), ("nand_bytes", 1e9, 2), ("waf", 1, 2),
+                                               ("throttle_time_s", 1, 0))
+                ] + [
+                    result.statistics.get("sample_count", ""),
+                    f"{sampling['rel_width'] * 100:.2f}" if sampling.get("rel_width") is not None else ""
                 ])
 
         # JSON报告
@@ -726,24 +4662,21 @@ class SSDPerformanceTester:
             "version": SCRIPT_VERSION,
             "timestamp": datetime.now().isoformat(),
             "system_info": system_info,
+            "warmups": self.warmup_records,
+            "analysis": self.analysis,
             "test_results": []
         }
         
         for result in results:
-            result_dict = {
-                "test_type": result.test_type,
-                "block_size": result.block_size,
-                "rw_pattern": result.rw_pattern,
-                "statistics": result.statistics,
-                "evaluation": result.evaluation,
-                "execution_time": result.execution_time,
-                "retry_count": result.retry_count
-            }
-            report_data["test_results"].append(result_dict)
+            report_data["test_results"].append(result.to_dict())
 
         with open(json_file, "w") as f:
             json.dump(report_data, f, indent=2, ensure_ascii=False)
 
+        # 结果库: 复用的结果已在库中, 不再重复写入
+        if self.db_path:
+            self._store_results([r for r in results if "reused_from" not in r.statistics], system_info)
+
         # 系统信息
         sysinfo_file = os.path.join(self.result_dir, "system_info.txt")
         with open(sysinfo_file, "w") as f:
@@ -765,13 +4698,66 @@ class SSDPerformanceTester:
     def parse_arguments(self) -> bool:
         """解析命令行参数"""
         parser = argparse.ArgumentParser(description="SSD性能测试脚本 (修复版本)", add_help=False)
-        parser.add_argument("device", nargs="?", help="要测试的设备名 (如: sda, nvme0n1)")
+        parser.add_argument("device", nargs="*", help="要测试的设备名, 可指定多个 (如: sda, nvme0n1)")
         parser.add_argument("-t", "--time", type=int, default=DEFAULT_TEST_DURATION, help=f"预热和测试持续时间 (默认: {DEFAULT_TEST_DURATION}秒)")
         parser.add_argument("-q", "--queue", type=int, default=DEFAULT_QUEUE_DEPTH, help=f"队列深度 (默认: {DEFAULT_QUEUE_DEPTH})")
         parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_THREADS, help=f"并发线程数 (默认: {DEFAULT_THREADS})")
         parser.add_argument("-d", "--debug", action="store_true", help="启用调试模式")
         parser.add_argument("--size", type=str, metavar="SIZE", help="自定义测试大小 (例如: 10G, 500M, 20%, 100%)")
         parser.add_argument("--ramp_time", type=int, help=f"预热时间 (默认: 自动设置为-t参数值的一半)")
+        parser.add_argument("--steady_state", action="store_true", help="预热阶段自动检测稳态, 达到稳态即提前结束")
+        parser.add_argument("--purge", choices=PURGE_METHODS, default="none", help="测试前将设备恢复到干净状态: discard=blkdiscard, format=NVMe格式化, sanitize=NVMe块擦除 (默认: none)")
+        parser.add_argument("--fill_passes", type=int, default=0, help="预处理阶段改为全盘填充指定遍数 (默认: 0, 按ramp_time计时预热)")
+        parser.add_argument("--fill_jobs", type=int, default=DEFAULT_FILL_JOBS, help=f"全盘填充的并行作业数, 按offset_increment等分LBA (默认: {DEFAULT_FILL_JOBS})")
+        parser.add_argument("--ss_round", type=int, default=STEADY_STATE_ROUND_TIME, help=f"稳态检测每轮时长 (默认: {STEADY_STATE_ROUND_TIME}秒)")
+        parser.add_argument("--live", action="store_true", help="实时解析FIO状态输出, 记录逐区间带宽/IOPS/延迟")
+        parser.add_argument("--status_interval", type=int, default=FIO_STATUS_INTERVAL, help=f"FIO状态输出间隔 (默认: {FIO_STATUS_INTERVAL}秒)")
+        parser.add_argument("--stall_timeout", type=int, default=WATCHDOG_STALL_TIMEOUT, help=f"FIO无I/O进展超过该秒数即终止并记录卡死 (默认: {WATCHDOG_STALL_TIMEOUT}, 0为关闭)")
+        parser.add_argument("--resume", type=str, metavar="RESULT_DIR", help="从结果目录中的断点继续被中断的测试计划")
+        parser.add_argument("--resume_precondition", type=int, default=0, help="续测前重新执行的短预处理时长(秒) (默认: 0, 不执行)")
+        parser.add_argument("--budget", type=str, help="整个测试计划的时间预算, 如 7200 / 2h / 1h30m; 按阶段优先级分配时长和采样数")
+        parser.add_argument("--adaptive", action="store_true", help="自适应采样: 置信区间足够窄即停止, 否则继续采样")
+        parser.add_argument("--ci_width", type=float, default=ADAPTIVE_CI_WIDTH, help=f"自适应采样的目标置信区间相对宽度 (默认: {ADAPTIVE_CI_WIDTH})")
+        parser.add_argument("--max_samples", type=int, default=ADAPTIVE_MAX_SAMPLES, help=f"自适应采样的最大采样数 (默认: {ADAPTIVE_MAX_SAMPLES})")
+        parser.add_argument("--sample_budget", type=int, default=0, help="自适应采样每个测试的时间预算(秒) (默认: 0, 不限)")
+        parser.add_argument("--sampling", choices=["runs", "slices"], default="runs", help="采样方式: runs=多次运行FIO, slices=单次运行切分时间窗口")
+        parser.add_argument("--mode", choices=["standard", "sweep", "slo", "openloop", "scaling", "engines", "numa", "slc", "wsat"], default="standard", help="测试模式 (默认: standard)")
+        parser.add_argument("--sweep_rw", choices=SWEEP_RW_PATTERNS, default="randread", help="扫描模式的读写模式 (默认: randread)")
+        parser.add_argument("--sweep_bs", type=str, default="4k", help="扫描模式的块大小 (默认: 4k)")
+        parser.add_argument("--sweep_qd", type=str, help="扫描的队列深度列表, 逗号分隔")
+        parser.add_argument("--sweep_jobs", type=str, help="扫描的任务数列表, 逗号分隔")
+        parser.add_argument("--sweep_search", choices=["adaptive", "grid"], default="adaptive", help="扫描方式 (默认: adaptive)")
+        parser.add_argument("--slo_target", type=float, default=SLO_DEFAULT_TARGET_US, help=f"SLO模式的延迟目标 (默认: {SLO_DEFAULT_TARGET_US}us)")
+        parser.add_argument("--slo_percentile", type=float, default=SLO_DEFAULT_PERCENTILE, help=f"SLO模式的考核百分位 (默认: {SLO_DEFAULT_PERCENTILE})")
+        parser.add_argument("--slo_patterns", type=str, default=SLO_DEFAULT_PATTERNS, help=f"SLO模式的负载列表 (默认: {SLO_DEFAULT_PATTERNS})")
+        parser.add_argument("--openloop_pattern", type=str, default="randread", help="开环模式的4K负载 (默认: randread)")
+        parser.add_argument("--openloop_loads", type=str, default=OPENLOOP_DEFAULT_LOADS, help=f"开环模式的目标负载列表 (默认: {OPENLOOP_DEFAULT_LOADS})")
+        parser.add_argument("--slc_idle", type=str, default=SLC_DEFAULT_IDLE, help=f"SLC模式恢复测试的空闲时间列表(秒) (默认: {SLC_DEFAULT_IDLE})")
+        parser.add_argument("--wsat_stage", type=str, help=f"WSAT模式使用的测试计划阶段名 (默认: {WSAT_DEFAULT_STAGE})")
+        parser.add_argument("--db", type=str, default=DEFAULT_RESULTS_DB, help=f"SQLite结果库路径 (默认: {DEFAULT_RESULTS_DB})")
+        parser.add_argument("--no_db", action="store_true", help="不写入结果库")
+        parser.add_argument("--skip_fresh", type=float, default=0, help="复用结果库中该小时数内同一设备相同配置的结果 (默认: 0, 不复用)")
+        parser.add_argument("--db_query", type=str, help="查询结果库并退出, 条件为逗号分隔的 字段=值 (如: model=X,firmware=Y,block_size=4k)")
+        parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="对比两次运行并退出: 结果目录、performance_report.json或结果库run_id")
+        parser.add_argument("--confidence", type=float, default=COMPARE_CONFIDENCE, help=f"对比的置信水平 (默认: {COMPARE_CONFIDENCE})")
+        parser.add_argument("--min_effect", type=float, default=COMPARE_MIN_EFFECT, help=f"判为回归/提升的最小相对差异 (默认: {COMPARE_MIN_EFFECT})")
+        parser.add_argument("--thermal", action="store_true", help="运行期间轮询温度和降速状态, 与逐区间性能对齐")
+        parser.add_argument("--thermal_action", choices=["flag", "invalid", "rerun"], default="flag", help="检测到热降速时的处理 (默认: flag)")
+        parser.add_argument("--thermal_limit", type=float, help="降速判定温度(°C) (默认: 设备告警温度)")
+        parser.add_argument("--no_health", action="store_true", help="关闭阶段前后的SMART/NVMe健康快照")
+        parser.add_argument("--no_telemetry", action="store_true", help="关闭主机CPU/块设备/中断遥测采样")
+        parser.add_argument("--numa", choices=NUMA_MODES, default="auto", help="FIO任务的NUMA绑定策略 (默认: auto)")
+        parser.add_argument("--numa_stage", type=str, help="NUMA对比模式使用的测试计划阶段名 (默认: 4K随机读/QD32/Job4)")
+        parser.add_argument("--ioengine", choices=list(IO_ENGINE_PRESETS), default=DEFAULT_IO_ENGINE, help=f"I/O引擎 (默认: {DEFAULT_IO_ENGINE})")
+        parser.add_argument("--engines", type=str, default=ENGINES_DEFAULT_LIST, help=f"引擎对比模式的引擎列表 (默认: {ENGINES_DEFAULT_LIST})")
+        parser.add_argument("--engine_stage", type=str, help="引擎对比模式使用的测试计划阶段名 (默认: 4K随机读/QD32/Job4)")
+        parser.add_argument("--scaling_stage", type=str, help="扩展模式使用的测试计划阶段名 (默认: 128K顺序读/QD128)")
+        parser.add_argument("--scaling_counts", type=str, help="扩展模式的盘数列表, 逗号分隔 (默认: 1,2,4,…,N)")
+        parser.add_argument("--plan", type=str, metavar="FILE", help="测试计划文件 (JSON/YAML), 替代默认六阶段流程")
+        parser.add_argument("--jobfile", action="store_true", help="将测试计划编译为单个FIO jobfile执行")
+        parser.add_argument("--parallel", type=int, help="多设备模式下同时测试的最大设备数 (默认: 不限制)")
+        parser.add_argument("--group_by", choices=MULTI_DEVICE_GROUP_BY, default="switch", help="多设备并发分组依据 (默认: switch)")
+        parser.add_argument("--per_group", type=int, default=DEFAULT_PER_GROUP_LIMIT, help=f"每个分组同时测试的设备数 (默认: {DEFAULT_PER_GROUP_LIMIT})")
         parser.add_argument("-h", "--help", action="store_true", help="显示帮助信息")
         
         try:
@@ -782,11 +4768,57 @@ class SSDPerformanceTester:
             self.show_help()
             return False
         
-        if args.help or not args.device:
+        # 结果库参数
+        if args.skip_fresh < 0:
+            self.log("ERROR", "--skip_fresh 不能为负数")
+            return False
+        self.db_path = None if args.no_db else args.db
+        self.skip_fresh = args.skip_fresh
+        if args.db_query is not None and not args.help:
+            self.db_path = args.db
+            self.db_query = args.db_query
+            return True
+        
+        # 回归对比参数
+        if args.compare and not args.help:
+            if args.min_effect < 0 or not 0 < args.confidence < 1:
+                self.log("ERROR", "--min_effect 不能为负数, --confidence 必须在0和1之间")
+                return False
+            self.db_path = args.db
+            self.compare_runs = args.compare
+            self.compare_min_effect = args.min_effect
+            self.compare_confidence = args.confidence
+            return True
+        
+        if args.help or not (args.device or args.resume):
             self.show_help()
             return False
         
-        self.device = args.device
+        # 断点续测参数: 未指定设备时使用断点中的设备
+        if args.resume:
+            self.checkpoint = self._load_checkpoint(args.resume)
+            if self.checkpoint is None:
+                return False
+            if not args.device:
+                args.device = [self.checkpoint["device"]]
+            if args.device != [self.checkpoint["device"]]:
+                self.log("ERROR", f"--resume 只能用于断点中的设备 {self.checkpoint['device']}")
+                return False
+            if args.mode != "standard" or args.jobfile:
+                self.log("ERROR", "--resume 仅用于standard模式, 且不能与 --jobfile 同时使用")
+                return False
+            self.resume_dir = args.resume
+        if args.stall_timeout < 0:
+            self.log("ERROR", "--stall_timeout 不能为负数")
+            return False
+        self.stall_timeout = args.stall_timeout
+        if args.resume_precondition < 0:
+            self.log("ERROR", "--resume_precondition 不能为负数")
+            return False
+        self.resume_precondition = args.resume_precondition
+        
+        self.devices = list(dict.fromkeys(args.device))
+        self.device = self.devices[0]
         self.test_duration = args.time
         
         # 验证测试时间参数
@@ -812,21 +4844,197 @@ class SSDPerformanceTester:
         self.debug_mode = args.debug
         self.custom_test_size = getattr(args, 'size', "")
         
+        # 稳态检测参数
+        if args.ss_round <= 0:
+            self.log("ERROR", "稳态检测每轮时长必须大于0秒")
+            return False
+        self.steady_state_mode = args.steady_state
+        self.steady_state_round_time = args.ss_round
+        
+        # 预处理参数
+        if args.fill_passes < 0 or args.fill_jobs <= 0:
+            self.log("ERROR", "--fill_passes 不能为负数, --fill_jobs 必须大于0")
+            return False
+        self.purge_method = args.purge
+        self.fill_passes = args.fill_passes
+        self.fill_jobs = args.fill_jobs
+        
+        # 实时数据采集参数
+        if args.status_interval <= 0:
+            self.log("ERROR", "FIO状态输出间隔必须大于0秒")
+            return False
+        self.live_mode = args.live
+        self.status_interval = args.status_interval
+        self.sampling_mode = args.sampling
+        
+        # 时间预算参数
+        if args.budget:
+            try:
+                self.time_budget = self._parse_duration(args.budget)
+            except ValueError:
+                self.log("ERROR", "--budget 格式错误, 应为秒数或如 2h / 90m / 1h30m")
+                return False
+            if self.time_budget <= 0 or args.mode != "standard" or args.adaptive or args.fill_passes:
+                self.log("ERROR", "--budget 必须大于0, 仅用于standard模式, 且不能与 --adaptive / --fill_passes 同时使用")
+                return False
+        
+        # 自适应采样参数
+        if args.adaptive and args.sampling == "slices":
+            self.log("ERROR", "--adaptive 不能与 --sampling slices 同时使用")
+            return False
+        if args.ci_width <= 0 or args.max_samples < ADAPTIVE_MIN_SAMPLES or args.sample_budget < 0:
+            self.log("ERROR", f"--ci_width 必须大于0, --max_samples 不能小于{ADAPTIVE_MIN_SAMPLES}, --sample_budget 不能为负数")
+            return False
+        self.adaptive_sampling = args.adaptive
+        self.ci_width_target = args.ci_width
+        self.max_samples = args.max_samples
+        self.sample_budget = args.sample_budget
+        
+        # 测试模式参数
+        self.mode = args.mode
+        self.sweep_rw = args.sweep_rw
+        self.sweep_block_size = args.sweep_bs
+        self.sweep_search = args.sweep_search
+        try:
+            if args.sweep_qd:
+                self.sweep_queue_depths = self._parse_int_list(args.sweep_qd)
+            if args.sweep_jobs:
+                self.sweep_numjobs = self._parse_int_list(args.sweep_jobs)
+        except ValueError:
+            self.log("ERROR", "扫描列表格式错误, 应为逗号分隔的正整数 (如: 1,4,16,64)")
+            return False
+        
+        # 延迟SLO参数
+        if args.slo_target <= 0 or not 0 < args.slo_percentile < 100:
+            self.log("ERROR", "SLO延迟目标必须大于0, 百分位必须在0~100之间")
+            return False
+        self.slo_target_us = args.slo_target
+        self.slo_percentile = args.slo_percentile
+        self.slo_patterns = [p.strip() for p in args.slo_patterns.split(",") if p.strip()]
+        try:
+            for pattern in self.slo_patterns:
+                self._parse_rand_pattern(pattern)
+        except ValueError as e:
+            self.log("ERROR", f"不支持的SLO负载: {e} (可选: randread, randwrite, randrw<读比例>)")
+            return False
+        
+        # 开环负载参数
+        try:
+            self._parse_rand_pattern(args.openloop_pattern)
+            self.openloop_loads = self._parse_openloop_loads(args.openloop_loads)
+        except ValueError as e:
+            self.log("ERROR", f"开环负载参数错误: {e}")
+            return False
+        self.openloop_pattern = args.openloop_pattern
+        
+        # 测试计划
+        if args.plan:
+            try:
+                self.test_plan = self.load_test_plan(args.plan)
+            except (OSError, ValueError) as e:
+                self.log("ERROR", f"测试计划加载失败: {e}")
+                return False
+            self.log("INFO", f"已加载测试计划: {self.test_plan['name']} ({len(self.test_plan['stages'])} 个阶段)")
+        
+        # 单jobfile执行: 阶段之间无法切分时间窗口或实时解析
+        if args.jobfile and (args.sampling == "slices" or args.live or args.adaptive):
+            self.log("ERROR", "--jobfile 不能与 --sampling slices、--live 或 --adaptive 同时使用")
+            return False
+        self.jobfile_mode = args.jobfile
+        
+        self.telemetry_mode = not args.no_telemetry
+        self.health_mode = not args.no_health
+        
+        # SLC缓存测试参数
+        try:
+            self.slc_idle_times = self._parse_int_list(args.slc_idle)
+        except ValueError:
+            self.log("ERROR", "--slc_idle 格式错误, 应为逗号分隔的正整数 (如: 60,300)")
+            return False
+        
+        # 随机写饱和测试参数
+        self.wsat_stage = args.wsat_stage
+        if self.mode == "wsat":
+            try:
+                self._select_wsat_stage()
+            except ValueError as e:
+                self.log("ERROR", f"WSAT参数错误: {e}")
+                return False
+        
+        # 热降速检测参数
+        if args.thermal and args.jobfile:
+            self.log("ERROR", "--thermal 不能与 --jobfile 同时使用")
+            return False
+        self.thermal_mode = args.thermal
+        self.thermal_action = args.thermal_action
+        self.thermal_limit = args.thermal_limit
+        
+        # NUMA绑定参数
+        self.numa_mode = args.numa
+        self.numa_stage = args.numa_stage
+        if self.mode == "numa":
+            try:
+                self._select_plan_stage(self.numa_stage, NUMA_DEFAULT_STAGE)
+            except ValueError as e:
+                self.log("ERROR", f"NUMA对比参数错误: {e}")
+                return False
+        
+        # I/O引擎参数
+        self.ioengine = args.ioengine
+        self.engine_stage = args.engine_stage
+        self.engines_list = [e.strip() for e in args.engines.split(",") if e.strip()]
+        unknown = [e for e in self.engines_list if e not in IO_ENGINE_PRESETS]
+        if unknown or not self.engines_list:
+            self.log("ERROR", f"不支持的I/O引擎: {','.join(unknown)} (可选: {', '.join(IO_ENGINE_PRESETS)})")
+            return False
+        if self.mode == "engines":
+            try:
+                self._select_plan_stage(self.engine_stage, ENGINES_DEFAULT_STAGE)
+            except ValueError as e:
+                self.log("ERROR", f"引擎对比参数错误: {e}")
+                return False
+        
+        # 多盘聚合扩展参数
+        self.scaling_stage = args.scaling_stage
+        try:
+            if args.scaling_counts:
+                self.scaling_counts = self._parse_int_list(args.scaling_counts)
+            if self.mode == "scaling":
+                self._select_plan_stage(self.scaling_stage, SCALING_DEFAULT_STAGE)
+        except ValueError as e:
+            self.log("ERROR", f"扩展模式参数错误: {e}")
+            return False
+        
+        # 多设备调度参数
+        if (args.parallel is not None and args.parallel <= 0) or args.per_group <= 0:
+            self.log("ERROR", "--parallel 和 --per_group 必须为正整数")
+            return False
+        self.max_parallel = args.parallel or len(self.devices)
+        self.group_by = args.group_by
+        self.per_group_limit = args.per_group
+        
         return True
     
+    def _parse_int_list(self, text: str) -> List[int]:
+        """解析逗号分隔的正整数列表"""
+        values = sorted(set(int(item) for item in text.split(",") if item.strip()))
+        if not values or values[0] <= 0:
+            raise ValueError(text)
+        return values
+
     def show_help(self) -> None:
         """显示帮助信息"""
         help_text = f"""
 SSD性能测试脚本 v{SCRIPT_VERSION} (修复版本)
 
 用法:
-    python ssd_perf_test.py [选项] <设备名>
+    python ssd_perf_test.py [选项] <设备名> [<设备名> ...]
 
 建议的测试命令:
     python3 ssd_perf_test.py nvme0n1 --debug
 
 必需参数:
-    <设备名>         要测试的SSD设备名 (如: sda, nvme0n1)
+    <设备名>         要测试的SSD设备名 (如: sda, nvme0n1), 指定多个时并行测试
 
 可选参数:
     -t, --time      预热和测试持续时间 (默认: {DEFAULT_TEST_DURATION}秒)
@@ -835,6 +5043,105 @@ SSD性能测试脚本 v{SCRIPT_VERSION} (修复版本)
     -d, --debug     启用调试模式
     --size          自定义测试大小 (默认: 100%,例如: 10G, 500M, 20%, 100%)
     --ramp_time     预热时间 (默认: 自动设置为-t参数值的一半)
+    --steady_state  预热阶段自动检测稳态, 达到稳态即提前结束 (最长为ramp_time)
+    --ss_round      稳态检测每轮时长 (默认: {STEADY_STATE_ROUND_TIME}秒)
+    --purge         测试前将设备恢复到干净状态: none (默认) / discard=blkdiscard /
+                    format=NVMe格式化(用户数据擦除) / sanitize=NVMe块擦除(作用于整个控制器)
+    --fill_passes   预处理阶段改为全盘填充N遍: 多个并行作业按offset_increment等分LBA,
+                    按写入字节输出进度 (默认: 0, 按ramp_time计时预热)
+    --fill_jobs     全盘填充的并行作业数 (默认: {DEFAULT_FILL_JOBS})
+    --live          实时解析FIO状态输出, 记录逐区间带宽/IOPS/延迟并输出进度
+    --status_interval FIO状态输出间隔 (默认: {FIO_STATUS_INTERVAL}秒)
+    --sampling      采样方式 (默认: runs)
+                    runs   - 每个测试运行FIO {DATA_VALIDATION_SAMPLES} 次
+                    slices - 每个测试只运行一次FIO, 稳定区间等分为 {DATA_VALIDATION_SAMPLES} 个时间窗口作为采样
+    --stall_timeout FIO卡死判定时长 (默认: {WATCHDOG_STALL_TIMEOUT}秒, 0为关闭): 设备/sys/block/<dev>/stat的
+                    完成I/O计数和FIO状态输出均无进展超过该时长时, 终止FIO进程组, 记录在途I/O数和
+                    dmesg尾部到analysis.stalls, 当前测试记为失败并继续下一阶段/设备
+    --resume        从结果目录继续被中断的测试 (如: --resume results_nvme0n1_20250101_120000):
+                    每个阶段完成后结果和进度写入checkpoint.json, 续测时跳过已完成阶段,
+                    测试计划和时长沿用断点 (仅standard模式, 不能与--jobfile同时使用)
+    --resume_precondition 续测前以最近的预处理阶段重新执行N秒, 应对中断期间设备状态变化 (默认: 0)
+    --budget        整个测试计划的时间预算 (如 7200 / 2h / 1h30m), 覆盖-t和--ramp_time:
+                    按阶段priority分配时长和采样数, 扣除结果库中历史测得的进程启动/落盘开销,
+                    开始前输出预计结束时间和写入量
+    --adaptive      自适应采样: 至少{ADAPTIVE_MIN_SAMPLES}次, 主要指标均值的95%置信区间相对宽度(全宽/均值)
+                    不超过--ci_width即停止, 否则继续采样直到--max_samples或--sample_budget
+    --ci_width      目标置信区间相对宽度 (默认: {ADAPTIVE_CI_WIDTH})
+    --max_samples   自适应采样的最大采样数 (默认: {ADAPTIVE_MAX_SAMPLES})
+    --sample_budget 自适应采样每个测试的时间预算(秒) (默认: 0, 不限)
+    --mode          测试模式 (默认: standard)
+                    standard - 六阶段标准测试流程
+                    sweep    - 队列深度×任务数扫描, 寻找饱和拐点
+                    slo      - 限速二分搜索, 寻找延迟百分位满足目标的最大持续IOPS
+                    openloop - 泊松到达的开环负载, 测量各负载级别的延迟分布
+                    scaling  - 多盘聚合扩展, 同一阶段在1、2、4…N块盘上同时运行, 寻找主机侧饱和点
+                    engines  - I/O引擎对比, 同一阶段依次使用各引擎运行, 比较IOPS/延迟/CPU开销
+                    numa     - NUMA对比, 同一阶段分别绑定本地/远端节点运行, 测量跨节点损失
+                    slc      - SLC缓存断崖, 整盘TRIM后顺序写, 检测断崖并测量空闲后的缓存恢复
+                    wsat     - 随机写饱和, 整盘TRIM后持续4K随机写到稳态, 报告GC介入点和稳态IOPS
+    --sweep_rw      扫描模式的读写模式: {'/'.join(SWEEP_RW_PATTERNS)} (默认: randread)
+    --sweep_bs      扫描模式的块大小 (默认: 4k)
+    --sweep_qd      扫描的队列深度列表 (默认: {','.join(map(str, SWEEP_QUEUE_DEPTHS))})
+    --sweep_jobs    扫描的任务数列表 (默认: {','.join(map(str, SWEEP_NUMJOBS))})
+    --sweep_search  扫描方式 (默认: adaptive)
+                    adaptive - 增益低于{SWEEP_GAIN_THRESHOLD:.0%}即停止加深队列/增加任务数
+                    grid     - 遍历全部组合
+    --slo_target    SLO模式的延迟目标 (默认: {SLO_DEFAULT_TARGET_US}us)
+    --slo_percentile SLO模式的考核百分位 (默认: {SLO_DEFAULT_PERCENTILE})
+    --slo_patterns  SLO模式的4K负载列表 (默认: {SLO_DEFAULT_PATTERNS}, randrw70表示70%读)
+    --openloop_pattern 开环模式的4K负载 (默认: randread)
+    --openloop_loads   开环模式的目标负载列表 (默认: {OPENLOOP_DEFAULT_LOADS})
+                       百分比表示相对闭环峰值IOPS, 数字表示绝对IOPS
+    --numa          FIO任务的NUMA绑定策略 (默认: auto)
+                    auto   - 多NUMA节点时绑定到设备所在节点, 单节点时不绑定
+                    local  - 绑定到设备所在节点
+                    remote - 绑定到另一个节点
+                    off    - 不绑定
+                    FIO支持libnuma时使用numa_cpu_nodes/numa_mem_policy, 否则使用cpus_allowed
+    --numa_stage    NUMA对比模式使用的测试计划阶段名 (默认: 4K随机读/QD32/Job4)
+    --slc_idle      SLC模式恢复测试的空闲时间列表 (默认: {SLC_DEFAULT_IDLE}秒)
+                    顺序写最长运行-t秒, 测试缓存容量时应设置足够长的-t
+    --wsat_stage    WSAT模式使用的测试计划阶段名 (默认: {WSAT_DEFAULT_STAGE}, 最长运行-t秒)
+    --db            SQLite结果库路径 (默认: {DEFAULT_RESULTS_DB}), 记录每个结果、逐区间数据和系统信息
+    --no_db         不写入结果库
+    --skip_fresh    复用结果库中N小时内同一设备(序列号)相同配置(FIO参数哈希)的结果, 跳过该阶段
+    --db_query      查询结果库并退出, 条件为逗号分隔的 字段=值, 可用字段:
+                    {', '.join(RESULTS_DB_QUERY_FIELDS)}
+    --compare       对比两次运行并退出: --compare <基线> <候选>, 每个参数为结果目录、
+                    performance_report.json或结果库run_id; 检测到显著回归时退出码为{COMPARE_REGRESSION_EXIT_CODE}
+    --confidence    对比的置信水平 (默认: {COMPARE_CONFIDENCE})
+    --min_effect    判为回归/提升的最小相对差异 (默认: {COMPARE_MIN_EFFECT})
+    --thermal       运行期间每{THERMAL_POLL_INTERVAL}秒轮询温度(hwmon)和热管理降速计数(nvme smart-log),
+                    与逐区间带宽/IOPS对齐, 标记降速区间 (自动启用逐区间数据采集)
+    --thermal_action 检测到热降速时的处理 (默认: flag)
+                    flag    - 仅在报告中标记
+                    invalid - 将该测试判为无效
+                    rerun   - 冷却后重跑降速的采样 (最多{THERMAL_MAX_RERUNS}次)
+    --thermal_limit 降速判定温度 (默认: 设备hwmon告警温度, 读取不到时{THERMAL_DEFAULT_LIMIT_C}°C)
+    --no_health     关闭设备健康快照 (默认每个阶段前后通过nvme-cli/smartctl采集SMART/健康日志)
+    --no_telemetry  关闭主机遥测 (默认每次FIO运行时每{TELEMETRY_INTERVAL}秒采样/proc/stat、块设备stat和设备中断)
+    --ioengine      I/O引擎 (默认: {DEFAULT_IO_ENGINE}), 作用于所有预热、测试和jobfile
+                    libaio             - Linux原生异步I/O
+                    io_uring           - io_uring
+                    io_uring_fixedbufs - io_uring + 注册缓冲区和文件 (fixedbufs/registerfiles)
+                    io_uring_sqpoll    - io_uring + 内核提交轮询线程 (sqthread_poll)
+                    io_uring_hipri     - io_uring + 轮询完成 (hipri, 需要nvme poll_queues)
+                    psync / pvsync2    - 同步I/O (每个任务QD1)
+    --engines       引擎对比模式的引擎列表 (默认: {ENGINES_DEFAULT_LIST})
+    --engine_stage  引擎对比模式使用的测试计划阶段名 (默认: 4K随机读/QD32/Job4)
+    --scaling_stage 扩展模式使用的测试计划阶段名 (默认: 128K顺序读/QD128/Job1)
+    --scaling_counts 扩展模式的盘数列表 (默认: 1,2,4,…,N, N为指定的设备数)
+    --plan          测试计划文件 (JSON, 安装PyYAML后支持YAML), 替代默认六阶段流程
+    --jobfile       将测试计划编译为单个FIO jobfile (stonewall顺序执行), 省去各阶段的
+                    FIO启动、设备打开和end_fsync开销, 预处理与测量之间设备状态连续
+    --parallel      多设备模式下同时测试的最大设备数 (默认: 不限制)
+    --group_by      多设备并发分组依据 (默认: switch)
+                    switch     - 同一PCIe交换芯片/根端口
+                    controller - 同一控制器(NVMe控制器/SAS HBA)
+                    numa       - 同一NUMA节点
+                    none       - 不分组
+    --per_group     每个分组同时测试的设备数 (默认: {DEFAULT_PER_GROUP_LIMIT})
     -h, --help      显示此帮助信息
 
 === 优化版测试流程 ===
@@ -852,15 +5159,43 @@ SSD性能测试脚本 v{SCRIPT_VERSION} (修复版本)
 • 顺序写预热使用与顺序写完全相同的参数配置 (QD128/Job1)
 • 随机写预热使用与随机写完全相同的参数配置 (QD32/Job8)
 • --ramp_time参数默认自动设置为-t参数值的一半,也可手动指定
+• --steady_state模式下逐秒跟踪带宽/IOPS, 最近{STEADY_STATE_WINDOW}轮的极差≤{STEADY_STATE_EXCURSION:.0%}且
+  拟合斜率变化≤{STEADY_STATE_SLOPE:.0%}时判定稳态并提前结束预热, 超过ramp_time仍未稳定则在报告中标记
+
+测试计划格式 (--plan):
+{{"name": "db", "stages": [
+  {{"name": "fill", "kind": "precondition", "rw": "write", "block_size": "128k", "iodepth": 32, "numjobs": 1, "duration": 600}},
+  {{"name": "oltp", "rw": "randrw", "rwmixread": 70, "block_size": "8k", "iodepth": 16, "numjobs": 4,
+   "distribution": "zipf:1.2", "duration": 300, "samples": 3}}]}}
+• kind: precondition(预处理) / measure(测量, 默认)
+• 可选字段: label, test_type, rw_pattern, rwmixread, distribution(random/zipf/pareto/normal/zoned),
+  duration(默认-t或ramp_time), samples(默认{DATA_VALIDATION_SAMPLES}), priority(--budget分配权重, 默认1),
+  fio_options(其他FIO参数)
 
 测试模型说明:
 • 128K顺序读/QD128/Job1 - 大文件顺序读写性能 (MB/s)
 • 128K顺序写/QD128/Job1 - 大文件顺序写入性能 (MB/s)
 • 4K随机读/QD32/Job8 - 小文件随机读取性能 (IOPS)
 • 4K随机写/QD32/Job8 - 小文件随机写入性能 (IOPS)
+• 示例计划见 plans/ 目录 (database.json, log_append.json)
 
 FIO命令示例(128K顺序写入):
-fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --direct=1 --numjobs=1 --iodepth=128 --rw=write --bs=128k --runtime=30 --ramp_time=15 --time_based=1 --size=100% --refill_buffers --end_fsync=1 --norandommap=1 --randrepeat=0 --group_reporting --output-format=json --output=sequential_128k_write.json
+fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --direct=1 --numjobs=1 --iodepth=128 --rw=write --bs=128k --runtime=30 --ramp_time=15 --time_based=1 --size=100% --refill_buffers --end_fsync=1 --norandommap=1 --randrepeat=0 --group_reporting --percentile_list=50:90:99:99.9:99.99 --output-format=json+ --output=sequential_128k_write.json
+
+主机遥测说明:
+• 每次FIO运行期间后台采样: 各CPU利用率(/proc/stat), 设备在途I/O、io_ticks和合并数(/sys/block/<设备>/stat),
+  NVMe队列中断数(/proc/interrupts), 以及FIO自身的usr_cpu/sys_cpu/ctx
+• 设备繁忙接近100%而主机CPU有余量: 瓶颈在盘; 设备繁忙不足而某个CPU接近100%: 瓶颈在主机(中断/提交线程)
+• 每核IOPS = IOPS / 整机繁忙核数 (含测试期间主机上的其他负载)
+
+设备健康说明:
+• 每个阶段前后采集: 主机写入量(data units written), NAND写入量(OCP/Intel扩展日志或SATA厂商属性),
+  温度, 寿命已用百分比, 热管理降速次数和时长; 原始输出保存在 health/ 目录
+• WAF = 阶段内NAND写入 / 主机写入, 厂商未提供NAND写入量时为N/A; 计数器粒度较粗, 短阶段的WAF仅供参考
+
+尾延迟说明:
+• 从json+输出中提取完成延迟(clat)直方图, 计算P50/P90/P99/P99.9/P99.99
+• 多次采样按直方图逐桶累加后重新计算百分位, 不对百分位求平均
 
 变异系数(CV)说明:
 • CV < 0.1: 数据稳定性极好(标准差/均值 < 10%)
@@ -869,8 +5204,19 @@ fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --dir
 
 输出文件:
 • performance_report.csv  - CSV格式性能报告
-• performance_report.json - JSON格式详细报告  
+• performance_report.json - JSON格式详细报告 (--live模式下包含data_points时间序列)
 • system_info.txt        - 系统信息和测试配置
+• sweep_curve.csv        - 扫描模式的吞吐-延迟曲线(拐点以*标记)
+• plan_<计划名>.fio/.json - --jobfile模式生成的jobfile及其原始输出
+• checkpoint.json        - standard模式的断点: 测试计划进度和已完成阶段的结果 (用于--resume)
+• openloop_curve.csv     - 开环模式的目标/实际IOPS和延迟百分位
+• engines_compare.csv    - 引擎对比模式的各引擎性能、延迟和CPU开销
+• wsat_curve.csv         - WSAT模式的逐区间IOPS/P99曲线(标注FOB/过渡/稳态)
+• slc_curve.csv          - SLC模式的逐区间带宽-累计写入量曲线
+• scaling_curve.csv      - 扩展模式的盘数-聚合性能曲线(饱和点以*标记)
+• scaling_x<盘数>.fio/.json - 扩展模式各盘数生成的jobfile及其原始输出
+• 多设备模式: results_multi_<时间戳>/<设备名>/ 下为各设备的上述文件,
+  aggregate_report.csv/json 为所有设备的汇总
 
 更新内容:
 • 实现4种标准SSD性能测试模型
@@ -910,9 +5256,33 @@ fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --dir
         # CV稳定性分析
         self._display_cv_analysis(overall_cv_analysis)
 
+        # 预热稳态检测
+        if self.warmup_records and (self.steady_state_mode or self.fill_passes or self.purge_method != "none"):
+            self._display_warmup_summary(self.warmup_records)
+
         # 性能数据详情
         self._display_performance_details(successful_tests)
 
+        # 各测试模式的分析结果
+        if "sweep" in self.analysis:
+            self._display_sweep_summary(self.analysis["sweep"])
+        if "slo" in self.analysis:
+            self._display_slo_summary(self.analysis["slo"])
+        if "openloop" in self.analysis:
+            self._display_openloop_summary(self.analysis["openloop"])
+        if "engines" in self.analysis:
+            self._display_engines_summary(self.analysis["engines"])
+        if "slc" in self.analysis:
+            self._display_slc_summary(self.analysis["slc"])
+        if "wsat" in self.analysis:
+            self._display_wsat_summary(self.analysis["wsat"])
+        if "numa" in self.analysis:
+            self._display_numa_summary(self.analysis["numa"])
+        if "scaling" in self.analysis:
+            self._display_scaling_summary(self.analysis["scaling"])
+        if "stalls" in self.analysis:
+            self._display_stall_summary(self.analysis["stalls"])
+
         # 性能评估结论
         self._display_performance_conclusions(performance_summary, overall_cv_analysis)
         
@@ -987,6 +5357,23 @@ fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --dir
         else:
             print(f"⚠️  {Colors.YELLOW}注意: 数据存在一定波动,建议多次测试验证{Colors.END}")
 
+    def _display_warmup_summary(self, warmup_records: List[Dict[str, Any]]):
+        """显示预处理结果: purge、全盘填充和预热稳态检测"""
+        print(f"\n{Colors.BOLD}🔥 预处理{Colors.END}")
+        for record in warmup_records:
+            if record.get("mode") == "purge":
+                status = f"{Colors.GREEN}完成{Colors.END}" if record["purged"] else f"{Colors.RED}失败{Colors.END}"
+                print(f"  purge ({record['method']}): {status} (耗时{record['elapsed']:.0f}秒)")
+            elif record.get("mode") == "fill":
+                print(f"  {record['name']}: 全盘填充{record['passes']}遍/{record['jobs']}个作业, "
+                      f"写入 {record['written_bytes'] / 1e9:,.1f} GB (耗时{record['elapsed']:.0f}秒)")
+            elif record.get("steady"):
+                print(f"  {record['name']}: {Colors.GREEN}已稳态{Colors.END} "
+                      f"(第{record['steady_time']:.0f}秒, 预热耗时{record['elapsed']:.0f}/{record['max_time']}秒)")
+            else:
+                print(f"  {record['name']}: {Colors.RED}未达到稳态{Colors.END} "
+                      f"(预热耗时{record['elapsed']:.0f}/{record['max_time']}秒)")
+
     def _display_performance_details(self, successful_tests: List[TestResult]):
         """显示性能数据详情"""
         print(f"\n{Colors.BOLD}⚡ 详细性能数据{Colors.END}")
@@ -1010,7 +5397,144 @@ fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --dir
             
             print(f"  {icon} {test_name}:")
             print(f"     性能: {Colors.BOLD}{mean_str}{Colors.END}")
-            print(f"     CV: {cv:.3f} | 质量: {quality_color}{quality}{Colors.END}")
+            sampling = result.statistics.get("sampling", {})
+            sample_str = f"{result.statistics.get('sample_count', 0)}次"
+            if sampling.get("adaptive"):
+                width = f"{sampling['rel_width']:.1%}" if sampling.get("rel_width") is not None else "N/A"
+                sample_str += f" (CI宽度 {width}, {ADAPTIVE_STOP_REASONS[sampling['stop_reason']]})"
+            print(f"     CV: {cv:.3f} | 采样: {sample_str} | 质量: {quality_color}{quality}{Colors.END}")
+            latency = result.statistics.get("latency", {}).get("all", {})
+            if latency:
+                print("     延迟: " + " | ".join(f"P{p:g} {latency.get(f'p{p:g}', 0):,.1f}us" for p in LATENCY_PERCENTILES))
+            telemetry = result.statistics.get("telemetry", {})
+            host_cpu = telemetry.get("cpu")
+            if host_cpu:
+                busy = telemetry.get("devices", {}).get(self.device, {}).get("busy_pct", 0)
+                print(f"     主机: CPU {host_cpu['util']:.1f}% ({host_cpu['busy_cores']:.2f}核, 最忙CPU {host_cpu['max_cpu_util']:.0f}%)"
+                      f" | 设备繁忙 {busy:.1f}% | 每核IOPS {telemetry.get('iops_per_core', 0):,.0f}")
+            thermal = result.statistics.get("thermal", {})
+            if thermal.get("max_temp_c") is not None:
+                state = (f"{Colors.YELLOW}降速 {thermal['throttled_seconds']:.0f}秒{Colors.END}"
+                         if thermal["throttled"] else f"{Colors.GREEN}未降速{Colors.END}")
+                print(f"     温度: 最高 {thermal['max_temp_c']:.0f}°C (阈值 {thermal['limit_c']:.0f}°C) | {state}")
+            health = result.statistics.get("health", {})
+            if health.get("host_bytes") is not None:
+                waf = f"{health['waf']:.2f}" if health.get("waf") is not None else "N/A"
+                print(f"     健康: 主机写入 {health['host_bytes'] / 1e9:.2f} GB | WAF {waf}"
+                      f" | 降速 {health.get('throttle_events', 0):.0f}次/{health.get('throttle_time_s', 0):.0f}秒")
+
+    def _display_sweep_summary(self, analysis: Dict[str, Any]):
+        """显示队列深度扫描曲线和拐点"""
+        print(f"\n{Colors.BOLD}📉 队列深度扫描 ({analysis['block_size']} {analysis['rw']}){Colors.END}")
+        knee = analysis.get("knee")
+        for p in analysis["points"]:
+            marker = f" {Colors.GREEN}← 拐点{Colors.END}" if p is knee else ""
+            print(f"  QD{p['iodepth']:>4}/Jobs{p['numjobs']:<3} {p['value']:>12,.1f} {analysis['unit']}"
+                  f" | 平均 {p['lat_mean']:>9,.1f}us | P99 {p['lat_p99']:>9,.1f}us{marker}")
+        if knee:
+            print(f"  💡 建议队列配置: QD{knee['iodepth']} × Jobs{knee['numjobs']} "
+                  f"(峰值 {analysis['peak']:,.1f} {analysis['unit']} 的{knee['value'] / analysis['peak']:.1%})")
+
+    def _display_slo_summary(self, analysis: Dict[str, Any]):
+        """显示延迟SLO搜索结果"""
+        print(f"\n{Colors.BOLD}🎯 延迟SLO搜索 (P{analysis['percentile']:g} ≤ {analysis['target_us']:g}us, "
+              f"QD{analysis['queue_depth']}/Jobs{analysis['numjobs']}){Colors.END}")
+        for summary in analysis["patterns"]:
+            if summary.get("latency_us") is None:
+                print(f"  {summary['pattern']}: {Colors.RED}无法满足SLO{Colors.END} (峰值 {summary['peak_iops']:,.0f} IOPS)")
+            else:
+                ratio = summary["max_iops"] / summary["peak_iops"] if summary["peak_iops"] else 0
+                print(f"  {summary['pattern']}: {Colors.GREEN}{summary['max_iops']:,.0f} IOPS{Colors.END} "
+                      f"(P{analysis['percentile']:g} {summary['latency_us']:,.1f}us, 峰值的{ratio:.1%})")
+
+    def _display_openloop_summary(self, analysis: Dict[str, Any]):
+        """显示开环负载测试结果"""
+        print(f"\n{Colors.BOLD}🌊 开环负载 (4k {analysis['pattern']}, 泊松到达){Colors.END}")
+        for level in analysis["levels"]:
+            color = Colors.RED if level["saturated"] else Colors.GREEN
+            latency = level["latency"]
+            print(f"  目标 {level['offered_iops']:>10,.0f} IOPS → 实际 {color}{level['achieved_iops']:>10,.0f}{Colors.END}"
+                  f" ({level['achieved_ratio']:>6.1%}) | P50 {latency.get('p50', 0):>8,.1f}us"
+                  f" | P99 {latency.get('p99', 0):>8,.1f}us | P99.9 {latency.get('p99.9', 0):>8,.1f}us")
+
+    def _display_engines_summary(self, analysis: Dict[str, Any]):
+        """显示I/O引擎对比结果"""
+        print(f"\n{Colors.BOLD}⚙️  I/O引擎对比 ({analysis['block_size']} {analysis['rw']} "
+              f"QD{analysis['iodepth']}/Jobs{analysis['numjobs']}){Colors.END}")
+        for e in analysis["engines"]:
+            note = " (同步引擎, QD1)" if e["effective_iodepth"] == 1 and analysis["iodepth"] > 1 else ""
+            print(f"  {e['engine']:<20} {e['value']:>12,.1f} {analysis['unit']} | P99 {e['latency'].get('p99', 0):>9,.1f}us"
+                  f" | CPU {e['cores']:>5.2f} 核 | 每核 {e['per_core']:>10,.0f}{note}")
+        if analysis.get("best_throughput"):
+            print(f"  💡 吞吐最高: {analysis['best_throughput']}, CPU效率最高: {analysis['best_efficiency']}")
+
+    def _display_numa_summary(self, analysis: Dict[str, Any]):
+        """显示NUMA本地/远端对比结果"""
+        print(f"\n{Colors.BOLD}🧭 NUMA对比 ({analysis['block_size']} {analysis['rw']}, 设备位于节点{analysis['device_node']}){Colors.END}")
+        for mode in ("local", "remote"):
+            side = analysis.get(mode)
+            if not side:
+                continue
+            print(f"  {mode:<6} 节点{side['node']}: {side['value']:>12,.1f} {analysis['unit']}"
+                  f" | 平均 {side['lat_mean']:>8,.1f}us | P99 {side['latency'].get('p99', 0):>8,.1f}us")
+        if "throughput_penalty" in analysis:
+            print(f"  💡 跨节点性能损失 {analysis['throughput_penalty']:.1%}, P99延迟增加 {analysis['p99_penalty_us']:,.1f}us")
+
+    def _display_wsat_summary(self, analysis: Dict[str, Any]):
+        """显示WSAT测试结果"""
+        fills = f", {analysis['drive_fills']:.2f}倍容量" if analysis["drive_fills"] else ""
+        print(f"\n{Colors.BOLD}🧹 随机写饱和 ({analysis['block_size']} QD{analysis['iodepth']}/Jobs{analysis['numjobs']}, "
+              f"共写入 {analysis['written_gb']:.1f} GB{fills}){Colors.END}")
+        onset = analysis["gc_onset"]
+        if onset:
+            p99 = f" | P99 {onset['p99_before']:,.0f} → {onset['p99_after']:,.0f}us" if "p99_before" in onset else ""
+            print(f"  GC介入: 第{onset['t']:.0f}秒 / {onset['written_gb']:.1f} GB | "
+                  f"IOPS {onset['before']:,.0f} → {onset['after']:,.0f}{p99}")
+        else:
+            print(f"  未检测到GC介入点")
+        if analysis.get("armed", True) is None:
+            print(f"  {Colors.YELLOW}写入量不足且未出现GC介入, 以下末段IOPS可能仍是FOB性能{Colors.END}")
+        steady = analysis["steady_state"]
+        label = f"稳态 (第{steady['steady_time']:.0f}秒)" if steady["steady"] else f"{Colors.YELLOW}未达到稳态{Colors.END}, 末段"
+        p99 = f" | P99 {steady['p99']:,.0f}us" if steady["p99"] is not None else ""
+        print(f"  {label}: {Colors.BOLD}{steady['iops']:,.0f} IOPS{Colors.END} "
+              f"(区间 {steady['iops_min']:,.0f} ~ {steady['iops_max']:,.0f}, 标准差 {steady['iops_stdev']:,.0f}){p99}")
+
+    def _display_stall_summary(self, stalls: List[Dict[str, Any]]):
+        """显示FIO卡死事件"""
+        print(f"\n{Colors.BOLD}{Colors.RED}⛔ FIO卡死 ({len(stalls)}次){Colors.END}")
+        for stall in stalls:
+            in_flight = ", ".join(f"{device}={count}" for device, count in stall["in_flight"].items()) or "未知"
+            print(f"  {stall['name']}: 运行{stall['elapsed']:.0f}秒后{stall['idle_seconds']:.0f}秒无I/O进展 | "
+                  f"在途I/O: {in_flight} | {stall['time']}")
+            for line in stall["dmesg"][-3:]:
+                print(f"    {line}")
+
+    def _display_slc_summary(self, analysis: Dict[str, Any]):
+        """显示SLC缓存断崖测试结果"""
+        print(f"\n{Colors.BOLD}🧊 SLC缓存 ({analysis['block_size']}顺序写, 共写入 {analysis['written_gb']:.1f} GB){Colors.END}")
+        if not analysis["cliffs"]:
+            print(f"  未检测到带宽断崖")
+            return
+        print(f"  缓存容量: {Colors.BOLD}{analysis['cache_size_gb']:.1f} GB{Colors.END} | "
+              f"断崖前 {analysis['pre_cliff_bw']:,.0f} MB/s | 断崖后 {analysis['post_cliff_bw']:,.0f} MB/s")
+        for index, cliff in enumerate(analysis["cliffs"], 1):
+            print(f"  断崖{index}: {cliff['written_gb']:>8.1f} GB | {cliff['before']:>8,.0f} → {cliff['after']:>8,.0f} MB/s")
+        for recovered in analysis["recovery"]:
+            print(f"  空闲 {recovered['idle']:>5} 秒后恢复 {recovered['recovered_gb']:>7.1f} GB ({recovered['ratio']:.0%})")
+
+    def _display_scaling_summary(self, analysis: Dict[str, Any]):
+        """显示多盘扩展曲线和饱和点"""
+        print(f"\n{Colors.BOLD}📈 多盘扩展 ({analysis['block_size']} {analysis['rw']} "
+              f"QD{analysis['iodepth']}/Jobs{analysis['numjobs']}){Colors.END}")
+        saturation = analysis.get("saturation")
+        for p in analysis["points"]:
+            marker = f" {Colors.YELLOW}← 饱和点{Colors.END}" if p is saturation else ""
+            print(f"  {p['devices']:>3} 块盘: 总计 {p['total']:>12,.1f} {analysis['unit']}"
+                  f" | 单盘 {p['per_device_mean']:>10,.1f} | 效率 {p['efficiency']:>6.1%}"
+                  f" | 主机CPU {p['host_cpu_util']:>5.1f}%{marker}")
+        if saturation is None and analysis["points"]:
+            print(f"  💡 测试范围内聚合性能随盘数持续增长, 未达到主机侧瓶颈")
 
     def _display_performance_conclusions(self, performance_summary: Dict[str, Any], cv_analysis: Dict[str, Any]):
         """显示基于CV的性能评估结论"""
@@ -1058,10 +5582,13 @@ fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --dir
             error = result.evaluation.get("error", "Unknown error")
             print(f"  {Colors.RED}{test_name}: {error}{Colors.END}")
     
+    def _stable_window(self, duration: float):
+        """计算测试时长内的稳定数据区间(起止秒数)"""
+        return min(5, duration * 0.1), min(duration - 5, duration * 0.9)
+
     def _update_time_parameters(self):
         """更新时间参数"""
-        self.stable_data_start_time = min(5, self.test_duration * 0.1)
-        self.stable_data_end_time = min(self.test_duration - 5, self.test_duration * 0.9)
+        self.stable_data_start_time, self.stable_data_end_time = self._stable_window(self.test_duration)
         self.sampling_interval = max(1, (self.stable_data_end_time - self.stable_data_start_time) / 4)
     
     def set_default_params(self, device: str):
@@ -1082,14 +5609,30 @@ fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --dir
         """主执行函数"""
         if not self.parse_arguments():
             return False
-            
+        
+        if self.db_query is not None:
+            return self.query_results_db()
+        if self.compare_runs is not None:
+            return self.run_compare()
+        
+        if len(self.devices) > 1 and self.mode != "scaling":
+            return self.run_multi_device()
+        return self.run_single_device()
+
+    def run_single_device(self, result_dir: str = None) -> bool:
+        """对self.device执行完整测试流程"""
         # 设备访问检查
-        if not self.check_device_access():
+        if not all(self.check_device_access(device) for device in self.devices or [self.device]):
             return False
             
-        # 创建结果目录
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.result_dir = f"results_{self.device}_{timestamp}"
+        # 创建结果目录(续测时沿用中断前的目录)
+        if result_dir is None and self.resume_dir:
+            result_dir = self.resume_dir
+        elif result_dir is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            name = "scaling" if self.mode == "scaling" else self.device
+            result_dir = f"results_{name}_{timestamp}"
+        self.result_dir = result_dir
         os.makedirs(self.result_dir, exist_ok=True)
         
         self.log("INFO", f"结果目录: {self.result_dir}")
@@ -1103,35 +5646,481 @@ fio --name=sequential_128k_write --filename=/dev/nvme0n1 --ioengine=libaio --dir
         # 收集系统信息
         self.log("INFO", "收集系统信息...")
         system_info = self.collect_system_info()
+        self.system_info = system_info
+
+        # 续测时恢复中断前的测试计划和时间参数
+        if self.checkpoint and not self._restore_checkpoint(system_info):
+            return False
 
         # 显示测试配置
         self.log("INFO", f"测试设备: {self.device} ({system_info.get('device_model', 'Unknown')}, {system_info.get('device_capacity_gb', 0):.1f} GB)")
         self.log("INFO", f"设备类型: {system_info.get('device_type', 'Unknown')}")
         self.log("INFO", f"测试时间: {self.test_duration}秒, 预热时间: {self.ramp_time}秒")
+        placement = system_info.get("numa", {}).get("placement", {})
+        if placement.get("mode", "off") != "off":
+            self.log("INFO", f"NUMA绑定: 节点{placement['node']} (CPU {placement['cpus']}, 设备位于节点{placement['device_node']})")
+
+        # 按时间预算规划各阶段时长和采样数(续测时沿用断点中的规划)
+        if self.time_budget and not self.checkpoint and not self._apply_time_budget():
+            return False
 
         # 运行测试
         try:
-            results = self.run_comprehensive_test()
+            mode_runners = {
+                "standard": self.run_comprehensive_test,
+                "sweep": self.run_sweep_test,
+                "slo": self.run_slo_test,
+                "openloop": self.run_openloop_test,
+                "scaling": self.run_scaling_test,
+                "engines": self.run_engines_test,
+                "numa": self.run_numa_test,
+                "slc": self.run_slc_test,
+                "wsat": self.run_wsat_test
+            }
+            results = mode_runners[self.mode]()
+            self.results = results
 
             # 保存结果
             self.save_results(results, system_info)
 
             # 显示总结
-            self.show_summary(results)
+            if self.show_device_summary:
+                self.show_summary(results)
 
             return True
 
         except KeyboardInterrupt:
             self.log("WARNING", "测试被用户中断")
+            self._log_resume_hint()
             return False
         except Exception as e:
             self.log("ERROR", f"测试执行失败: {str(e)}")
+            self._log_resume_hint()
+            return False
+
+    def _log_resume_hint(self):
+        """测试中断时若已保存断点, 提示续测命令"""
+        if os.path.exists(os.path.join(self.result_dir, CHECKPOINT_FILE)):
+            self.log("INFO", f"已完成阶段的结果已保存, 可使用 --resume {self.result_dir} 继续测试")
+
+    def _clone_for_device(self, device: str) -> "SSDPerformanceTester":
+        """为单个设备复制一份测试配置: 配置项深拷贝, 运行状态取新实例的初始值"""
+        tester = SSDPerformanceTester()
+        for name, value in vars(self).items():
+            if name not in self.RUN_STATE_ATTRIBUTES:
+                setattr(tester, name, copy.deepcopy(value))
+        tester.device = device
+        tester.devices = [device]
+        tester.show_device_summary = False
+        return tester
+
+    def _device_group_key(self, device: str) -> str:
+        """多设备调度的分组键"""
+        if self.group_by == "none":
+            return device
+        topology = self._get_device_topology(device)
+        if self.group_by == "numa":
+            return f"numa{topology['numa_node']}"
+        key = topology.get(self.group_by)
+        return key if key else device
+
+    def run_multi_device(self) -> bool:
+        """多设备并行测试: 按PCIe交换/控制器/NUMA节点分组限流, 每个设备独立结果目录"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base_dir = f"results_multi_{timestamp}"
+        os.makedirs(base_dir, exist_ok=True)
+
+        groups = {device: self._device_group_key(device) for device in self.devices}
+        self.log("INFO", f"多设备测试: {len(self.devices)} 个设备, 最大并行 {self.max_parallel}, "
+                         f"按{self.group_by}分组每组最多 {self.per_group_limit} 个")
+        for device in self.devices:
+            self.log("INFO", f"  {device}: 分组 {groups[device]}")
+
+        testers = {device: self._clone_for_device(device) for device in self.devices}
+        outcomes = {}
+        pending = list(self.devices)
+        running = {}
+        condition = threading.Condition()
+
+        def worker(device: str):
+            try:
+                outcomes[device] = testers[device].run_single_device(os.path.join(base_dir, device))
+            except Exception as e:
+                testers[device].log("ERROR", f"设备测试异常: {str(e)}")
+                outcomes[device] = False
+            finally:
+                with condition:
+                    del running[device]
+                    condition.notify_all()
+
+        threads = []
+        try:
+            with condition:
+                while pending or running:
+                    busy_groups = [groups[d] for d in running]
+                    ready = [d for d in pending if busy_groups.count(groups[d]) < self.per_group_limit]
+                    if ready and len(running) < self.max_parallel:
+                        device = ready[0]
+                        pending.remove(device)
+                        running[device] = True
+                        self.log("INFO", f"启动设备 {device} 的测试 (运行中: {len(running)})")
+                        thread = threading.Thread(target=worker, args=(device,), name=device, daemon=True)
+                        threads.append(thread)
+                        thread.start()
+                        continue
+                    condition.wait()
+        except KeyboardInterrupt:
+            # FIO在独立进程组中运行, 收不到终端的SIGINT, 需要逐个终止
+            self.log("WARNING", "测试被用户中断, 正在终止各设备的FIO进程")
+            for tester in testers.values():
+                tester.abort_fio()
+            for thread in threads:
+                thread.join(timeout=WATCHDOG_KILL_WAIT)
+            return False
+
+        for thread in threads:
+            thread.join()
+
+        self.save_aggregate_report(base_dir, testers, outcomes)
+        self._display_aggregate_summary(testers, outcomes)
+        return all(outcomes.get(device) for device in self.devices)
+
+    def _store_results(self, results: List[TestResult], system_info: Dict):
+        """将本次运行的结果写入SQLite结果库"""
+        if sqlite3 is None:
+            self.log("WARNING", "当前Python不含sqlite3模块, 跳过结果库")
+            return
+        for result in results:
+            if result.config_hash is None:
+                result.config_hash = self._config_hash(result.test_type, result.block_size, result.rw_pattern,
+                                                       result.queue_depth, result.numjobs)
+        try:
+            run_id = ResultStore(self.db_path).save_run(system_info, results, self.result_dir)
+            self.log("INFO", f"结果已写入结果库 {self.db_path} (run_id={run_id})")
+        except sqlite3.Error as e:
+            self.log("WARNING", f"写入结果库失败: {str(e)}")
+
+    def query_results_db(self) -> bool:
+        """按 --db_query 条件查询结果库并输出表格"""
+        if sqlite3 is None:
+            self.log("ERROR", "当前Python不含sqlite3模块, 无法查询结果库")
+            return False
+        filters = {}
+        for item in self.db_query.split(","):
+            key, sep, value = item.partition("=")
+            if not item.strip():
+                continue
+            if not sep or key.strip() not in RESULTS_DB_QUERY_FIELDS:
+                self.log("ERROR", f"查询条件格式错误: {item} (可用字段: {', '.join(RESULTS_DB_QUERY_FIELDS)})")
+                return False
+            filters[key.strip()] = value.strip()
+        try:
+            rows = ResultStore(self.db_path).query(filters)
+        except sqlite3.Error as e:
+            self.log("ERROR", f"查询结果库失败: {str(e)}")
+            return False
+
+        print(f"\n{Colors.BOLD}🗄  结果库 {self.db_path}: {len(rows)} 条结果{Colors.END}")
+        print(f"  {'时间':<19} {'序列号':<20} {'型号':<24} {'固件':<10} {'阶段':<16} {'块大小':>6} {'模式':>6} "
+              f"{'QD':>4} {'Job':>4} {'均值':>12} {'CV':>6} {'P99(us)':>10} 状态")
+        for row in rows:
+            unit = "MB/s" if row["test_type"] == "sequential" else "IOPS"
+            p99 = f"{row['p99']:,.1f}" if row["p99"] is not None else "-"
+            print(f"  {row['created']:<19} {row['serial'] or '-':<20} {row['model'] or '-':<24} {row['firmware'] or '-':<10} "
+                  f"{row['stage'] or '-':<16} {row['block_size']:>6} {row['rw_pattern']:>6} "
+                  f"{row['queue_depth'] if row['queue_depth'] is not None else '-':>4} "
+                  f"{row['numjobs'] if row['numjobs'] is not None else '-':>4} "
+                  f"{row['mean'] or 0:>7,.0f} {unit:<4} {row['cv'] or 0:>6.3f} {p99:>10} {row['status']}")
+        return True
+
+    def _load_compare_run(self, source: str) -> List[Dict[str, Any]]:
+        """读取对比用的一次运行: 结果库run_id, 结果目录或performance_report.json"""
+        if source.isdigit():
+            if sqlite3 is None:
+                raise ValueError("当前Python不含sqlite3模块, 无法读取结果库")
+            results = ResultStore(self.db_path or DEFAULT_RESULTS_DB).load_run(int(source))
+            if not results:
+                raise ValueError(f"结果库中没有run_id={source}的结果")
+            return results
+        report_file = os.path.join(source, "performance_report.json") if os.path.isdir(source) else source
+        try:
+            with open(report_file, "r") as f:
+                return json.load(f)["test_results"]
+        except (OSError, ValueError, KeyError) as e:
+            raise ValueError(f"无法读取测试报告 {report_file}: {str(e)}")
+
+    def _compare_key(self, result: Dict[str, Any]) -> str:
+        """对比时匹配阶段的键: 优先使用阶段名"""
+        if result.get("stage"):
+            return result["stage"]
+        return (f"{result['test_type']}_{result['block_size']}_{result['rw_pattern']}"
+                f"_QD{result.get('queue_depth')}_J{result.get('numjobs')}")
+
+    def _bootstrap_relative_diff(self, baseline: List[float], candidate: List[float],
+                                 rng: random.Random) -> Optional[Dict[str, float]]:
+        """自助法估计 (候选均值-基线均值)/基线均值 的置信区间"""
+        if not baseline or not candidate or statistics.mean(baseline) <= 0:
+            return None
+        diffs = []
+        for _ in range(COMPARE_BOOTSTRAP_ITERATIONS):
+            base_mean = sum(rng.choice(baseline) for _ in baseline) / len(baseline)
+            cand_mean = sum(rng.choice(candidate) for _ in candidate) / len(candidate)
+            if base_mean > 0:
+                diffs.append((cand_mean - base_mean) / base_mean)
+        diffs.sort()
+        alpha = (1 - self.compare_confidence) / 2
+        return {
+            "diff": (statistics.mean(candidate) - statistics.mean(baseline)) / statistics.mean(baseline),
+            "ci_low": diffs[int(alpha * (len(diffs) - 1))],
+            "ci_high": diffs[int((1 - alpha) * (len(diffs) - 1))]
+        }
+
+    @staticmethod
+    def _t_two_sided_probability(t: float, df: int) -> float:
+        """自由度为整数df的t分布 P(|T| < t) (Abramowitz & Stegun 26.7.3/26.7.4)"""
+        theta = math.atan(t / math.sqrt(df))
+        cos2 = math.cos(theta) ** 2
+        if df % 2 == 1:
+            term, total = 1.0, 1.0 if df > 1 else 0.0
+            for k in range(2, df - 1, 2):
+                term *= k / (k + 1) * cos2
+                total += term
+            return 2 / math.pi * (theta + math.sin(theta) * math.cos(theta) * total)
+        term, total = 1.0, 1.0
+        for k in range(2, df, 2):
+            term *= (k - 1) / k * cos2
+            total += term
+        return math.sin(theta) * total
+
+    def _t_critical(self, confidence: float, df: int) -> float:
+        """双侧t临界值: 对P(|T| < t) = confidence二分求解"""
+        low, high = 0.0, 1.0
+        while self._t_two_sided_probability(high, df) < confidence:
+            high *= 2
+        for _ in range(60):
+            middle = (low + high) / 2
+            if self._t_two_sided_probability(middle, df) < confidence:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def _welch_relative_diff(self, baseline: List[float], candidate: List[float]) -> Optional[Dict[str, float]]:
+        """Welch t区间估计 (候选均值-基线均值)/基线均值 的置信区间, 比值的方差按delta方法近似"""
+        base_mean, cand_mean = statistics.mean(baseline), statistics.mean(candidate)
+        if base_mean <= 0 or cand_mean <= 0:
+            return None
+        base_var = statistics.variance(baseline) / len(baseline)
+        cand_var = statistics.variance(candidate) / len(candidate)
+        ratio = cand_mean / base_mean
+        se = ratio * math.sqrt(base_var / base_mean ** 2 + cand_var / cand_mean ** 2)
+        if se == 0:
+            return {"diff": ratio - 1, "ci_low": ratio - 1, "ci_high": ratio - 1}
+        # Welch–Satterthwaite自由度, 向下取整偏保守
+        df = (base_var + cand_var) ** 2 / (base_var ** 2 / (len(baseline) - 1) + cand_var ** 2 / (len(candidate) - 1))
+        half_width = self._t_critical(self.compare_confidence, max(1, int(df))) * se
+        return {"diff": ratio - 1, "ci_low": ratio - 1 - half_width, "ci_high": ratio - 1 + half_width}
+
+    def _compare_metric(self, baseline: List[float], candidate: List[float], higher_is_better: bool,
+                        rng: random.Random) -> Dict[str, Any]:
+        """对比单个指标并给出结论: regressed / improved / inconclusive"""
+        comparison = {"baseline": statistics.mean(baseline) if baseline else None,
+                      "candidate": statistics.mean(candidate) if candidate else None,
+                      "verdict": "inconclusive"}
+        interval = None
+        if min(len(baseline), len(candidate)) >= COMPARE_BOOTSTRAP_MIN_SAMPLES:
+            interval = self._bootstrap_relative_diff(baseline, candidate, rng)
+            comparison["method"] = "bootstrap"
+        elif len(baseline) > 1 and len(candidate) > 1:
+            interval = self._welch_relative_diff(baseline, candidate)
+            comparison["method"] = "welch"
+        if interval is None:
+            comparison["note"] = "采样不足, 无法估计置信区间"
+            return comparison
+
+        comparison.update(interval)
+        # 统一换算为"变好"方向为正
+        sign = 1 if higher_is_better else -1
+        better_low, better_high = sorted((sign * interval["ci_low"], sign * interval["ci_high"]))
+        if better_high < 0 and sign * interval["diff"] <= -self.compare_min_effect:
+            comparison["verdict"] = "regressed"
+        elif better_low > 0 and sign * interval["diff"] >= self.compare_min_effect:
+            comparison["verdict"] = "improved"
+        return comparison
+
+    def run_compare(self) -> bool:
+        """基线/候选两次运行的统计回归对比, 检测到显著回归时返回False并设置退出码"""
+        try:
+            baseline_run = {self._compare_key(r): r for r in self._load_compare_run(self.compare_runs[0])}
+            candidate_run = {self._compare_key(r): r for r in self._load_compare_run(self.compare_runs[1])}
+        except ValueError as e:
+            self.log("ERROR", str(e))
+            return False
+
+        rng = random.Random(0)  # 固定种子, 同样输入得到同样结论
+        stages = []
+        for key, baseline in baseline_run.items():
+            candidate = candidate_run.get(key)
+            if candidate is None:
+                self.log("WARNING", f"候选运行中没有阶段 {key}, 跳过")
+                continue
+            failed = [r for r in (baseline, candidate) if r.get("evaluation", {}).get("status") == "FAILED"]
+            base_stats, cand_stats = baseline["statistics"], candidate["statistics"]
+            stage = {"stage": key, "test_type": baseline["test_type"],
+                     "unit": "MB/s" if baseline["test_type"] == "sequential" else "IOPS", "metrics": {}}
+            if failed:
+                stage.update({"verdict": "inconclusive", "note": "存在失败的测试"})
+                stages.append(stage)
+                continue
+
+            stage["metrics"]["mean"] = self._compare_metric(
+                base_stats.get("sample_values") or [base_stats.get("mean", 0)],
+                cand_stats.get("sample_values") or [cand_stats.get("mean", 0)], True, rng)
+            for p in COMPARE_PERCENTILES:
+                name = f"p{p:g}"
+                base_tail = [s.get(name, 0) for s in base_stats.get("sample_latency", []) if s.get(name)]
+                cand_tail = [s.get(name, 0) for s in cand_stats.get("sample_latency", []) if s.get(name)]
+                if base_tail and cand_tail:
+                    stage["metrics"][name] = self._compare_metric(base_tail, cand_tail, False, rng)
+
+            verdicts = [metric["verdict"] for metric in stage["metrics"].values()]
+            if "regressed" in verdicts:
+                stage["verdict"] = "regressed"
+            elif "improved" in verdicts:
+                stage["verdict"] = "improved"
+            else:
+                stage["verdict"] = "inconclusive"
+            stages.append(stage)
+        for key in candidate_run:
+            if key not in baseline_run:
+                self.log("WARNING", f"基线运行中没有阶段 {key}, 跳过")
+
+        report = {
+            "baseline": self.compare_runs[0],
+            "candidate": self.compare_runs[1],
+            "confidence": self.compare_confidence,
+            "min_effect": self.compare_min_effect,
+            "bootstrap_iterations": COMPARE_BOOTSTRAP_ITERATIONS,
+            "stages": stages
+        }
+        self._display_compare_summary(report)
+        self.result_dir = f"results_compare_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        os.makedirs(self.result_dir, exist_ok=True)
+        with open(os.path.join(self.result_dir, "compare_report.json"), "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        self.log("INFO", f"对比报告已保存到目录: {self.result_dir}")
+
+        regressed = [stage["stage"] for stage in stages if stage["verdict"] == "regressed"]
+        if regressed:
+            self.log("ERROR", f"检测到显著回归: {', '.join(regressed)}")
+            self.exit_code = COMPARE_REGRESSION_EXIT_CODE
+            return False
+        if not stages:
+            self.log("ERROR", "两次运行没有可对比的阶段")
             return False
+        return True
+
+    def _display_compare_summary(self, report: Dict[str, Any]):
+        """显示回归对比结果"""
+        colors = {"regressed": Colors.RED, "improved": Colors.GREEN, "inconclusive": Colors.YELLOW}
+        labels = {"regressed": "回归", "improved": "提升", "inconclusive": "无定论"}
+        print(f"\n{Colors.BOLD}⚖  回归对比: {report['baseline']} → {report['candidate']} "
+              f"({report['confidence']:.0%}置信区间, 最小效应{report['min_effect']:.0%}){Colors.END}")
+        for stage in report["stages"]:
+            verdict = stage["verdict"]
+            print(f"  {stage['stage']}: {colors[verdict]}{labels[verdict]}{Colors.END}"
+                  f"{' (' + stage['note'] + ')' if stage.get('note') else ''}")
+            for name, metric in stage["metrics"].items():
+                unit = stage["unit"] if name == "mean" else "us"
+                line = f"     {name:<6} {metric['baseline']:>12,.1f} → {metric['candidate']:>12,.1f} {unit:<4}"
+                if "diff" in metric:
+                    line += (f" {metric['diff']:>+7.1%} [{metric['ci_low']:+.1%}, {metric['ci_high']:+.1%}] "
+                             f"{colors[metric['verdict']]}{labels[metric['verdict']]}{Colors.END}")
+                else:
+                    line += f" {metric.get('note', '')}"
+                print(line)
+
+    def save_aggregate_report(self, base_dir: str, testers: Dict[str, "SSDPerformanceTester"],
+                              outcomes: Dict[str, bool]):
+        """保存多设备汇总报告"""
+        csv_file = os.path.join(base_dir, "aggregate_report.csv")
+        with open(csv_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["设备", "型号", "阶段", "测试类型", "块大小", "读写模式", "主要指标", "均值", "变异系数",
+                             "P99延迟(us)", "状态"])
+            for device in self.devices:
+                tester = testers[device]
+                for result in tester.results:
+                    writer.writerow([
+                        device,
+                        tester.system_info.get("device_model", "Unknown"),
+                        result.stage or "",
+                        result.test_type,
+                        result.block_size,
+                        result.rw_pattern,
+                        "MB/s" if result.test_type == "sequential" else "IOPS",
+                        f"{result.statistics.get('mean', 0):.2f}",
+                        f"{result.statistics.get('cv', 0):.3f}",
+                        f"{result.statistics.get('latency', {}).get('all', {}).get('p99', 0):.1f}",
+                        result.evaluation.get("status", "UNKNOWN")
+                    ])
+
+        report_data = {
+            "version": SCRIPT_VERSION,
+            "timestamp": datetime.now().isoformat(),
+            "scheduler": {
+                "max_parallel": self.max_parallel,
+                "group_by": self.group_by,
+                "per_group": self.per_group_limit
+            },
+            "devices": {
+                device: {
+                    "success": outcomes.get(device, False),
+                    "result_dir": testers[device].result_dir,
+                    "system_info": testers[device].system_info,
+                    "test_results": [
+                        {
+                            "stage": r.stage,
+                            "test_type": r.test_type,
+                            "block_size": r.block_size,
+                            "rw_pattern": r.rw_pattern,
+                            "mean": r.statistics.get("mean", 0),
+                            "cv": r.statistics.get("cv", 0),
+                            "latency": r.statistics.get("latency", {}).get("all", {}),
+                            "status": r.evaluation.get("status", "UNKNOWN")
+                        } for r in testers[device].results
+                    ]
+                } for device in self.devices
+            }
+        }
+        with open(os.path.join(base_dir, "aggregate_report.json"), "w") as f:
+            json.dump(report_data, f, indent=2, ensure_ascii=False)
+
+        self.log("INFO", f"汇总报告已保存到目录: {base_dir}")
+
+    def _display_aggregate_summary(self, testers: Dict[str, "SSDPerformanceTester"], outcomes: Dict[str, bool]):
+        """显示多设备汇总"""
+        print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*60}{Colors.END}")
+        print(f"{Colors.BOLD}{Colors.CYAN}多设备测试汇总{Colors.END}")
+        print(f"{Colors.BOLD}{Colors.CYAN}{'='*60}{Colors.END}")
+        for device in self.devices:
+            tester = testers[device]
+            status = f"{Colors.GREEN}完成{Colors.END}" if outcomes.get(device) else f"{Colors.RED}失败{Colors.END}"
+            print(f"\n{Colors.BOLD}💾 {device}{Colors.END} ({tester.system_info.get('device_model', 'Unknown')}) - {status}")
+            for result in tester.results:
+                name = result.stage or f"{result.test_type} {result.block_size} {result.rw_pattern}"
+                if result.evaluation.get("status") == "FAILED":
+                    print(f"  {name}: {Colors.RED}{result.evaluation.get('error', 'Unknown error')}{Colors.END}")
+                    continue
+                mean_value = result.statistics.get("mean", 0)
+                mean_str = f"{mean_value:.2f} MB/s" if result.test_type == "sequential" else f"{mean_value:,.0f} IOPS"
+                print(f"  {name}: {mean_str} (CV {result.statistics.get('cv', 0):.3f})")
+        print(f"\n{Colors.BOLD}{Colors.CYAN}{'='*60}{Colors.END}")
 
 def main():
     tester = SSDPerformanceTester()
     success = tester.run()
-    sys.exit(0 if success else 1)
+    sys.exit(0 if success else tester.exit_code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file